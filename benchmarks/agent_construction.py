@@ -0,0 +1,86 @@
+"""Cost of constructing an agent with a response_schema and tools, like the orchestrator does per chunk.
+
+"cold" clears the compiled-schema cache before every construction, so JSON schemas are
+generated again each time, as before the cache existed. "warm" reuses the process-wide cache.
+"clone" copies an agent configured once, changing only its name, as sub-agents are spawned.
+
+Run with:
+    python benchmarks/agent_construction.py
+"""
+import timeit
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import tool
+from agnostic_agent.utils.core.compiled_schema import clear_compiled_schemas
+
+N_OF_AGENTS = 500
+N_OF_TOOLS = 8
+
+
+class Address(BaseModel):
+    street: str = Field(..., description="Street and number")
+    city: str
+    postal_code: Optional[str] = None
+
+
+class Entity(BaseModel):
+    name: str = Field(..., description="Name of the entity")
+    kind: str = Field(..., description="Person, organization or place")
+    addresses: List[Address] = []
+    confidence: float = Field(..., ge=0, le=1)
+
+
+class ExtractionSchema(BaseModel):
+    entities: List[Entity]
+    summary: str = Field(..., description="One sentence summary of the chunk")
+
+
+def register_tools() -> List[str]:
+    names = []
+    for i in range(N_OF_TOOLS):
+        schema = type(f"LookupSchema{i}", (BaseModel,), {"__annotations__": {"query": str, "limit": int, "address": Address},
+                                                          "limit": Field(10, description="Maximum results")})
+
+        def lookup(query: str, limit: int, address: Address) -> str:
+            """Looks up records"""
+            return query
+        lookup.__name__ = f"lookup_{i}"
+        tool(schema=schema)(lookup)
+        names.append(lookup.__name__)
+    return names
+
+
+def build_agent(tools: List[str]) -> OpenAIProvider:
+    return OpenAIProvider(agent_name="Chunker", model_name="fake", api_key="fake", base_url="http://localhost",
+                          response_schema=ExtractionSchema, tools=tools)
+
+
+def main():
+    tools = register_tools()
+
+    def cold():
+        clear_compiled_schemas()
+        build_agent(tools).toolkit.schematize()
+
+    def warm():
+        build_agent(tools).toolkit.schematize()
+
+    template = build_agent(tools)
+
+    def clone():
+        template.clone(agent_name="Chunk").toolkit.schematize()
+
+    cold_time = timeit.timeit(cold, number=N_OF_AGENTS) / N_OF_AGENTS
+    warm_time = timeit.timeit(warm, number=N_OF_AGENTS) / N_OF_AGENTS
+    clone_time = timeit.timeit(clone, number=N_OF_AGENTS) / N_OF_AGENTS
+    print(f"Agent with a nested response_schema and {N_OF_TOOLS} tools, {N_OF_AGENTS} constructions\n")
+    print(f"cold (schemas generated per agent): {cold_time * 1000:7.3f} ms/agent")
+    print(f"warm (compiled-schema cache):       {warm_time * 1000:7.3f} ms/agent  ({cold_time / warm_time:.1f}x)")
+    print(f"clone of a configured agent:        {clone_time * 1000:7.3f} ms/agent  ({cold_time / clone_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""N concurrent agents whose tool-calling round runs a slow sync tool.
+
+"before" waits on the tool futures like the previous provider did (concurrent.futures.as_completed
+and future.result() inside the coroutine), which freezes the event loop until the tool
+returns, so agents run one after another. "after" goes through OpenAIProvider, where sync
+tools are bridged into asyncio: the agents' tools overlap and the loop keeps ticking.
+
+Run with:
+    python benchmarks/concurrent_sync_tools.py
+"""
+import asyncio
+import concurrent.futures
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import tool, tool_executor_instance
+
+N_OF_AGENTS = 8
+TOOL_SECONDS = 0.5
+
+
+class SleepSchema(BaseModel):
+    seconds: float
+
+@tool(schema=SleepSchema, execution="thread")
+def slow_sync_tool(seconds: float) -> str:
+    """Blocks its thread for the given number of seconds"""
+    time.sleep(seconds)
+    return "done"
+
+
+def completion(message: dict) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}})
+
+
+def make_agent() -> OpenAIProvider:
+    tool_call = {"id": "call_0", "type": "function",
+                 "function": {"name": "slow_sync_tool", "arguments": json.dumps({"seconds": TOOL_SECONDS})}}
+    agent = OpenAIProvider(agent_name="Sleeper", model_name="fake", api_key="fake", base_url="http://localhost",
+                           tools=["slow_sync_tool"])
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(side_effect=[
+        completion({"role": "assistant", "content": None, "tool_calls": [tool_call]}),
+        completion({"role": "assistant", "content": "Done"}),
+    ]))))
+    return agent
+
+
+async def blocking_round() -> None:
+    """The previous way of waiting for sync tools."""
+    futures = [tool_executor_instance.submit(slow_sync_tool, kwargs={"seconds": TOOL_SECONDS}, execution_mode="thread")]
+    for future in concurrent.futures.as_completed(futures):
+        future.result()
+
+
+async def measure(agents_coroutines) -> tuple:
+    """Returns the wall time and the longest event loop stall (ms) while the coroutines run."""
+    ticks = []
+
+    async def heartbeat():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*agents_coroutines)
+    elapsed = time.perf_counter() - start
+    heartbeat_task.cancel()
+    ticks.append(time.perf_counter())
+    return elapsed, max(later - earlier for earlier, later in zip(ticks, ticks[1:])) * 1000
+
+
+async def main():
+    tool_executor_instance.warm_up("thread")
+    print(f"{N_OF_AGENTS} agents, each running a {TOOL_SECONDS}s sync tool\n")
+    before = await measure([blocking_round() for _ in range(N_OF_AGENTS)])
+    after = await measure([make_agent().get_model_response(message="Sleep") for _ in range(N_OF_AGENTS)])
+    for name, (elapsed, max_stall) in (("before", before), ("after", after)):
+        print(f"{name:<7} wall time: {elapsed:6.2f}s  longest event loop stall: {max_stall:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""Import time of the package entry points, from `python -X importtime` totals.
+
+Each statement runs in a fresh interpreter several times and the median cumulative time of
+the imported modules is reported, so cold start regressions (an SDK imported eagerly,
+work done on import...) show up as a jump in these numbers.
+
+Run with:
+    python benchmarks/import_time.py
+"""
+import re
+import statistics
+import subprocess
+import sys
+
+N_OF_RUNS = 7
+STATEMENTS = [
+    "import agnostic_agent",
+    "import agnostic_agent; agnostic_agent.init_logging()",
+    "from agnostic_agent.utils import Session",
+    "from agnostic_agent import LLMAgent",
+]
+IMPORTTIME_LINE = re.compile(r"^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \| (?P<indent>\s*)(?P<module>\S+)$")
+
+
+def import_time_ms(statement: str) -> float:
+    """Sums the cumulative time of the top-level imports triggered by the statement, in ms."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and not match.group("indent") and match.group("module") not in ("site", "encodings"):
+            total_us += int(match.group("cumulative"))
+    return total_us / 1000
+
+
+def main():
+    for statement in STATEMENTS:
+        runs = [import_time_ms(statement) for _ in range(N_OF_RUNS)]
+        print(f"{statement:<55} {statistics.median(runs):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
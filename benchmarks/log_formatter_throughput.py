@@ -0,0 +1,63 @@
+"""Records per second of the log formatters run by the QueueListener thread.
+
+"before" is the previous ColoredJSONFormatter: python-json-logger serialization, json.loads,
+then the colored line (measured only if python-json-logger is installed). The JSON-lines
+formatter uses orjson when it is installed.
+
+Run with:
+    python benchmarks/log_formatter_throughput.py
+"""
+import importlib.util
+import json
+import logging
+import timeit
+
+from agnostic_agent.utils.logger.colorfulFormatter import ColoredJSONFormatter, JSONLinesFormatter
+
+N_OF_RECORDS = 50_000
+
+
+def build_record():
+    record = logging.LogRecord("agnostic_agent.llm_backends.providers.openai_provider", logging.INFO, __file__, 1,
+                               "(🔧) Completed tool call: get_weather with output: {'city': 'Madrid', 'celsius': 21}", None, None)
+    record.agent_name = "Weather agent"
+    record.model_name = "qwen3:8b"
+    record.interacion_number = 2
+    return record
+
+
+def build_previous_formatter():
+    from pythonjsonlogger import jsonlogger
+
+    class PreviousColoredJSONFormatter(jsonlogger.JsonFormatter):
+        def format(self, record):
+            log_dict = json.loads(super().format(record))
+            parts = [f"[{log_dict.get('time', '')}]", f"[{log_dict.get('level', ''):8}]",
+                     f"({log_dict.get('name', '')})", log_dict.get("message", "")]
+            context = [f"{key}={value}" for key, value in log_dict.items() if key not in ["time", "level", "name", "message"]]
+            if context:
+                parts.append(f"[{', '.join(context)}]")
+            return " ".join(parts)
+
+    return PreviousColoredJSONFormatter("%(asctime)s %(name)s %(levelname)s %(message)s",
+                                        rename_fields={"levelname": "level", "asctime": "time"})
+
+
+def records_per_second(formatter, record):
+    return N_OF_RECORDS / timeit.timeit(lambda: formatter.format(record), number=N_OF_RECORDS)
+
+
+def main():
+    record = build_record()
+    formatters = {}
+    if importlib.util.find_spec("pythonjsonlogger") is not None:
+        formatters["before: colored (JSON encode + decode)"] = build_previous_formatter()
+    formatters["after: colored"] = ColoredJSONFormatter()
+    json_lines_formatter = JSONLinesFormatter()
+    formatters[f"after: JSON lines ({'orjson' if json_lines_formatter.uses_orjson else 'json'})"] = json_lines_formatter
+    for name, formatter in formatters.items():
+        print(f"{name:<42} {records_per_second(formatter, record):>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-request logging overhead of the request hot path, before and after lazy, structurally redacted logging.
+
+"before" reproduces the previous behavior: f-strings of the full message list and response
+are always built, then a regex redacts base64 data from the rendered text. "after" uses
+%-style calls whose arguments are redacted structurally and capped only if emitted.
+
+Run with:
+    python benchmarks/logging_overhead.py
+"""
+import base64
+import io
+import logging
+import os
+import re
+import timeit
+
+from agnostic_agent.utils.logger.logger import FileUploadFilter
+
+FILE_SIZE_BYTES = 5 * 1024 * 1024
+N_OF_REQUESTS = 20
+
+FILE_DATA_REGEX = re.compile(r"('file_data':\s*')data:[^']+'")
+IMAGE_URL_REGEX = re.compile(r"('url':\s*')data:image[^']+'")
+
+
+class RegexRedactionFilter(logging.Filter):
+    """The previous filter: regexes over the rendered message."""
+    def filter(self, record):
+        message = record.getMessage()
+        redacted = FILE_DATA_REGEX.sub(r"\1[...FILE DATA REDACTED...]'", message)
+        redacted = IMAGE_URL_REGEX.sub(r"\1[...IMAGE DATA REDACTED...]'", redacted)
+        if redacted != message:
+            record.msg, record.args = redacted, ()
+        return True
+
+
+def build_request():
+    encoded = base64.b64encode(os.urandom(FILE_SIZE_BYTES)).decode("utf-8")
+    messages = [{"role": "system", "content": "You are a helpful assistant. " * 20},
+                {"role": "user", "content": [{"type": "text", "text": "Summarize the attached report"},
+                                             {"type": "file", "file": {"filename": "report.pdf",
+                                                                       "file_data": f"data:application/pdf;base64,{encoded}"}}]}]
+    response = {"id": "chatcmpl-1", "choices": [{"message": {"role": "assistant", "content": "The report says... " * 200}}],
+                "usage": {"prompt_tokens": 1_500_000, "completion_tokens": 800}}
+    return messages, response
+
+
+def build_logger(name, level, log_filter):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(level)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.addFilter(log_filter)
+    logger.addHandler(handler)
+    return logger
+
+
+def log_before(logger, messages, response):
+    logger.debug(f"Message is: {messages}")
+    logger.debug(f"(📦) Full response: {response}")
+    logger.debug(f"(✏️) Text response: {response['choices'][0]['message']['content']}")
+
+
+def log_after(logger, messages, response):
+    logger.debug("Message is: %s", messages)
+    logger.debug("(📦) Full response: %s", response)
+    logger.debug("(✏️) Text response: %s", response["choices"][0]["message"]["content"])
+
+
+def main():
+    messages, response = build_request()
+    print(f"Request with a {FILE_SIZE_BYTES // (1024 * 1024)} MB attachment, {N_OF_REQUESTS} requests per measure\n")
+    for level in (logging.INFO, logging.DEBUG):
+        before = build_logger(f"before.{level}", level, RegexRedactionFilter())
+        after = build_logger(f"after.{level}", level, FileUploadFilter())
+        before_time = timeit.timeit(lambda: log_before(before, messages, response), number=N_OF_REQUESTS) / N_OF_REQUESTS
+        after_time = timeit.timeit(lambda: log_after(after, messages, response), number=N_OF_REQUESTS) / N_OF_REQUESTS
+        print(f"Level {logging.getLevelName(level):<5}  before: {before_time * 1000:9.3f} ms/request  "
+              f"after: {after_time * 1000:9.3f} ms/request  ({before_time / after_time:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Wall time of a fan-out/fan-in pipeline of simulated LLM calls, chained by hand vs run as a Workflow.
+
+Each call sleeps for a fixed latency, like a remote model would. The pipeline summarizes a
+text, analyzes it along N_OF_BRANCHES independent dimensions and merges the analyses. The
+second workflow run is served from the step cache.
+
+Run with:
+    python benchmarks/workflow_parallelism.py
+"""
+import asyncio
+import time
+
+from agnostic_agent import Workflow
+from agnostic_agent.utils import TTLCache
+from agnostic_agent.utils.core.schemas import LLMResponse
+
+LATENCY = 0.2 # Seconds per simulated LLM call
+N_OF_BRANCHES = 6
+
+
+class SimulatedAgent():
+    async def prompt(self, message: str) -> LLMResponse:
+        await asyncio.sleep(LATENCY)
+        return LLMResponse(final_text_response=f"answer to {message[:20]}")
+
+
+async def chained(agent: SimulatedAgent, text: str) -> str:
+    summary = (await agent.prompt(message=f"Summarize: {text}")).final_text_response
+    analyses = [(await agent.prompt(message=f"Analyze dimension {i}: {summary}")).final_text_response
+                for i in range(N_OF_BRANCHES)]
+    return (await agent.prompt(message=f"Merge: {analyses}")).final_text_response
+
+
+def build_workflow(agent: SimulatedAgent) -> Workflow:
+    workflow = Workflow(name="analysis", inputs=["text"], max_concurrency=8, cache=TTLCache(ttl=60))
+    workflow.add_step("summary", agent=agent, message="Summarize: {text}", depends_on=["text"])
+    branches = [f"analysis_{i}" for i in range(N_OF_BRANCHES)]
+    for i, branch in enumerate(branches):
+        workflow.add_step(branch, agent=agent, message=f"Analyze dimension {i}: {{summary}}", depends_on=["summary"])
+    workflow.add_step("merged", agent=agent, depends_on=branches,
+                      message=lambda **analyses: f"Merge: {list(analyses.values())}")
+    return workflow
+
+
+async def main():
+    agent = SimulatedAgent()
+    text = "Some long text " * 50
+
+    starting_time = time.perf_counter()
+    await chained(agent, text)
+    chained_time = time.perf_counter() - starting_time
+
+    workflow = build_workflow(agent)
+    cold = await workflow.run(text=text)
+    warm = await workflow.run(text=text)
+
+    print(f"{N_OF_BRANCHES + 2} simulated LLM calls of {LATENCY}s, {N_OF_BRANCHES} of them independent\n")
+    print(f"chained by hand:       {chained_time:6.2f} s")
+    print(f"workflow:              {cold.wall_time:6.2f} s  ({chained_time / cold.wall_time:.1f}x)")
+    print(f"workflow, step cache:  {warm.wall_time:6.3f} s")
+    print(f"critical path:         {' -> '.join(cold.critical_path)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,7 +2,7 @@ import argparse
 import asyncio
 import logging
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, init_logging
 
 from ..config import inline_args
 from .utils.schemas import Word
@@ -37,5 +37,6 @@ async def run_example(backend:str, model:str):
             print("Word choice was incorrect")
 
 if __name__ == "__main__":
+    init_logging()
     asyncio.run(run_example(backend=inline_args.backend, 
                             model=inline_args.model))
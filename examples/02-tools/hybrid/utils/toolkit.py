@@ -4,7 +4,7 @@ import logging
 from pydantic import BaseModel, Field
 
 from agnostic_agent import ToolkitBase
-from agnostic_agent.utils import tool
+from agnostic_agent.utils import TTLCache, tool
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ class ChefToolkit(ToolkitBase):
     class GetPriceForIngredientSchema(BaseModel):
         ingredient: str = Field(..., description="The name of the ingredient. E.g., cheese")
 
-    @tool(schema=GetPriceForIngredientSchema)
+    @tool(schema=GetPriceForIngredientSchema, cache=TTLCache(ttl=600)) # Prices of repeated ingredients are looked up once
     def get_ingredient_price(ingredient: str) -> dict:
         """Returns the price for a given ingredient"""
         print(f"Executing get_price_for_ingredient for {ingredient}")
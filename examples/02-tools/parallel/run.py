@@ -4,7 +4,7 @@ import argparse
 import asyncio
 import logging
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, init_logging
 
 from ...config import inline_args
 from .utils.toolkit import WeatherToolkit
@@ -26,5 +26,6 @@ async def run_example(backend:str, model:str):
       response = await agent.prompt(f"What is the weather like in San Francisco (temperature and humidity)?")
 
 if __name__ == "__main__":
+    init_logging()
     asyncio.run(run_example(backend=inline_args.backend, 
                             model=inline_args.model))
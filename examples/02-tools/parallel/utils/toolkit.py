@@ -13,7 +13,7 @@ class WeatherToolkit(ToolkitBase):
         location: str = Field(..., description="The city and state. E.g., SFO")
         unit: str = Field("fahrenheit", description="The unit to use")
 
-    @tool(schema=GetCurrentTemperatureSchema)
+    @tool(schema=GetCurrentTemperatureSchema, execution="thread")
     def get_current_temperature(location: str, unit: str = "fahrenheit") -> dict:
         """ Returns the given temperature for a given location"""
         print(f"Executing get_current_weather for {location} with unit {unit}")
@@ -23,7 +23,7 @@ class WeatherToolkit(ToolkitBase):
     class GetCurrentHumiditySchema(BaseModel):
         location: str = Field(..., description="The city and state. E.g., SFO")
 
-    @tool(schema=GetCurrentHumiditySchema)
+    @tool(schema=GetCurrentHumiditySchema, execution="thread")
     def get_current_humidity(location: str) -> dict:
         """ Returns the current humidity for a given location"""
         print(f"Executing get_current_humidity for {location}")
@@ -4,7 +4,7 @@ import logging
 
 from pydantic import BaseModel
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, init_logging
 from agnostic_agent.utils import ExtraResponseSettings
 
 from ...config import inline_args
@@ -32,5 +32,6 @@ async def run_example(backend:str, model:str):
       response = await agent.prompt(message=message)
 
 if __name__ == "__main__":
+    init_logging()
     asyncio.run(run_example(backend=inline_args.backend, 
                             model=inline_args.model))
@@ -2,7 +2,7 @@ import asyncio
 import logging
 import warnings
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, init_logging
 
 from ..config import inline_args
 
@@ -29,5 +29,6 @@ async def run_example(backend:str, model:str):
       logger.info(f"FINAL RESPONSE is {response}")
 
 if __name__ == "__main__":
+    init_logging()
     asyncio.run(run_example(backend=inline_args.backend,
                              model=inline_args.model))
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, Workflow, init_logging
 
 from ..config import inline_args
 from .utils.schemas import LanguageSchema
@@ -11,47 +11,48 @@ logger = logging.getLogger(__name__)
 file_path = []
 PREFERRED_LANGUAGE = "English"
 
-# 1) Make summarry of some text, 2) If not in english, translate to spanish
-async def run_example(text: str, backend: str, model:str):
-      SumamarizerAgent = LLMAgent(
+# 1) Make summary of some text and detect its language, in parallel. 2) If not in english, translate the summary
+def build_workflow(backend: str, model: str) -> Workflow:
+      SummarizerAgent = LLMAgent(
                         llm_backend=backend,
                         agent_name="TextSummarizer",
                         model_name=model,
                         sys_instructions="Summarize any text you receive",
                         tools=[]
       )
-
-      summarizer_response = await SumamarizerAgent.prompt(message=f"Summarize this text in its original language: {text}")
-
-      LanguageDetectorAgent = LLMAgent( # This could have been done in parallel but we are going for sequential for simplicity
-                        llm_backend=backend,
+      LanguageDetectorAgent = SummarizerAgent.clone(
                         agent_name="LanguageDetectorAgent",
-                        model_name=model,
                         sys_instructions="Detect the language of the text you receive",
-                        response_schema=LanguageSchema,
-                        tools=[]
+                        response_schema=LanguageSchema
+      )
+      TranslatorAgent = SummarizerAgent.clone(
+                        agent_name="TextTranslator",
+                        sys_instructions=f"Translate any text to {PREFERRED_LANGUAGE}"
       )
 
-      languageDetector_response = await LanguageDetectorAgent.prompt(message=f"What language is this in?: {summarizer_response.final_response}")
-
-      logger.info(f"Language of summary is {languageDetector_response.parsed_response.language}")
-      if languageDetector_response.parsed_response.language.strip().upper() != PREFERRED_LANGUAGE.strip().upper():
+      async def translate_if_needed(summary: str, language: LanguageSchema) -> str:
+            logger.info(f"Language of text is {language.language}")
+            if language.language.strip().upper() == PREFERRED_LANGUAGE.strip().upper():
+                  logger.info(f"Text was IN {PREFERRED_LANGUAGE}")
+                  return summary
             logger.info(f"Text was NOT IN {PREFERRED_LANGUAGE}")
-            TranslatorAgent = LLMAgent(
-                              llm_backend=backend,
-                              agent_name="TextTranslator",
-                              model_name=model,
-                              sys_instructions=f"Translate any text to {PREFERRED_LANGUAGE}",
-                              tools=[]
-            )
+            translator_response = await TranslatorAgent.prompt(message=f"Translate this text: {summary}")
+            return translator_response.final_text_response
 
-            summarizer_response = await TranslatorAgent.prompt(message=f"Translatie this text: {text}")
-            logger.debug(f"Summarized output is: {summarizer_response}")
-      else:
-            logger.info(f"Text was IN {PREFERRED_LANGUAGE}")
-      logger.debug(f" Outline is: {summarizer_response}")
+      workflow = Workflow(name="SummarizeAndTranslate", inputs=["text"])
+      workflow.add_step("summary", agent=SummarizerAgent, depends_on=["text"],
+                        message="Summarize this text in its original language: {text}")
+      workflow.add_step("language", agent=LanguageDetectorAgent, depends_on=["text"], # Runs in parallel with the summary
+                        message="What language is this in?: {text}")
+      workflow.add_step("translated_summary", func=translate_if_needed, depends_on=["summary", "language"])
+      return workflow
+
+async def run_example(text: str, backend: str, model:str):
+      result = await build_workflow(backend=backend, model=model).run(text=text)
+      logger.debug(f" Outline is: {result['translated_summary']}")
 
 if __name__ == "__main__":
+    init_logging()
     text_spanish = """
             El viejo faro de Maspalomas parpadeaba, como un ojo cansado vigilando las dunas. Abajo, en la orilla, una niña llamada Sofía encontró una caracola que no era como las demás. Era lisa y de un azul tan profundo como el mar al atardecer.
 
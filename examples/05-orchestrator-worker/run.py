@@ -4,7 +4,7 @@ import asyncio
 import logging
 from typing import List
 
-from agnostic_agent import LLMAgent
+from agnostic_agent import LLMAgent, client_registry, init_logging
 from agnostic_agent.utils import ExtraResponseSettings
 
 from ..config import inline_args
@@ -48,7 +48,10 @@ async def run_example(file_path: str, backend: str, model: str):
             message=f"This is the text: {ORM_extracted_text}. Spawn subagents for a given section pass the given text and chunk name and wait for the processing of it."
       )
 
+      await client_registry.aclose() # Every agent (and subagent) shared the same pooled client
+
 if __name__ == "__main__":
+    init_logging()
     #path = "examples/05-orchestrator-worker/media/Untitled document (1).pdf"
     path = "examples/05-orchestrator-worker/media/Letter - Javier Domínguez Segura.pdf"
     asyncio.run(run_example(file_path=path, backend=inline_args.backend, model=inline_args.model))
@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from pydantic import BaseModel, Field
@@ -8,6 +9,18 @@ from agnostic_agent.utils import add_context_to_log, tool
 from .schemas import ChunkNotNamed
 
 logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def chunk_processor_template() -> LLMAgent:
+      """Configured once, then cloned per chunk: resolving the backend and toolkit isn't repeated."""
+      return LLMAgent(
+            llm_backend="OpenRouter",
+            agent_name="ChunkProcessor",
+            sys_instructions="Given some text return a summary of it and a single keyword",
+            response_schema=ChunkNotNamed,
+            tools=[]
+            )
+
 class OrchestratorToolkit(ToolkitBase):
       class ProcessChunkSchema(BaseModel):
             chunk_name: str = Field(..., description="Name of the logical chunk")
@@ -17,13 +30,7 @@ class OrchestratorToolkit(ToolkitBase):
       async def process_chunk(chunk_name: str, chunk_text: str):
             """Process a given text from a chunk"""
             logger.debug("Im inside 'proces_chunk'")
-            chunkProcessor = LLMAgent(
-                  llm_backend="OpenRouter",
-                  agent_name=chunk_name,
-                  sys_instructions="Given some text return a summary of it and a single keyword",
-                  response_schema=ChunkNotNamed,
-                  tools=[]
-                  )
+            chunkProcessor = chunk_processor_template().clone(agent_name=chunk_name)
             response = await chunkProcessor.prompt(message=f"This is the chunk of text: {chunk_text}")
             logger.debug("I can leave 'process_chunk' now")
             return response
\ No newline at end of file
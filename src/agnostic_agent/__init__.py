@@ -1,7 +1,66 @@
-"""Top-level imports."""
-from .config.config import CONFIG_DICT
-from .llm_backends import BaseLLMProvider, OllamaClient, OpenRouterClient
-from .llm_strategy import LLMAgent
-from .utils import Logger, ToolkitBase
+"""Top-level imports.
 
-logger_instance = Logger(colorful_output=True) # Initiating logger
+Attributes are imported on first access, so `import agnostic_agent` doesn't load the LLM SDKs
+or read the config. Logging isn't set up on import either: call init_logging() once at startup.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from .config.config import CONFIG_DICT
+    from .llm_backends import BaseLLMProvider, OllamaClient, OpenRouterClient, client_registry
+    from .llm_strategy import LLMAgent
+    from .utils import Logger, Session, ToolkitBase
+    from .workflow import StepResult, Workflow, WorkflowEvent, WorkflowEventType, WorkflowResult
+
+_LAZY_ATTRIBUTES = {
+    "CONFIG_DICT": ".config.config",
+    "BaseLLMProvider": ".llm_backends",
+    "OllamaClient": ".llm_backends",
+    "OpenRouterClient": ".llm_backends",
+    "client_registry": ".llm_backends",
+    "LLMAgent": ".llm_strategy",
+    "Logger": ".utils.logger",
+    "Session": ".utils",
+    "ToolkitBase": ".utils",
+    "StepResult": ".workflow",
+    "Workflow": ".workflow",
+    "WorkflowEvent": ".workflow",
+    "WorkflowEventType": ".workflow",
+    "WorkflowResult": ".workflow",
+}
+
+__all__ = [*_LAZY_ATTRIBUTES, "init_logging"]
+
+_logger_instance = None
+
+
+def init_logging(logging_config: Optional[Dict[str, Any]] = None) -> "Logger":
+    """Starts the process' logging: the queue listener thread and the sinks. Safe to call more than once.
+
+    Args:
+        logging_config (dict, optional): Settings like the logging section of config.yaml, which is used by default.
+
+    Returns:
+        Logger: The process' logger.
+    """
+    global _logger_instance
+    if _logger_instance is None:
+        from .config.config import CONFIG_DICT
+        from .utils.logger import Logger
+        _logger_instance = Logger.from_config(logging_config if logging_config is not None else CONFIG_DICT.get("logging"))
+    return _logger_instance
+
+
+def __getattr__(name: str) -> Any:
+    if name == "logger_instance": # Kept for code that relied on logging being set up on import
+        return init_logging()
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
@@ -1,6 +1,7 @@
 
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
@@ -20,3 +21,10 @@ def get_config(path: str) -> Dict[str, Any]:
 current_dir = Path(__file__).parent
 config_path = current_dir / "config.yaml"
 CONFIG_DICT = get_config(path=str(config_path))
+
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+      """Loads the .env file into the environment. Done once, when the first agent is built instead of on import."""
+      from dotenv import load_dotenv
+      load_dotenv()
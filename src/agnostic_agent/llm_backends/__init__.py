@@ -1,2 +1,3 @@
 from .clients import OllamaClient, OpenRouterClient
-from .providers import BaseLLMProvider, OpenAIProvider
+from .providers import (AsyncClientRegistry, BaseLLMProvider, OpenAIProvider,
+                        client_registry)
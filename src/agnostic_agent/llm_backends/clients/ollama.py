@@ -2,6 +2,8 @@ from ..providers.openai_provider import OpenAIProvider
 
 
 class OllamaClient(OpenAIProvider):
+    backend_name = "ollama"
+
     def __init__(self,
                 agent_name: str,
                 model_name: str = "qwen3:8b",
@@ -9,6 +11,9 @@ class OllamaClient(OpenAIProvider):
                 response_schema: None = None,
                 tools: list[str] = [],
                 extra_response_settings: None = None,
+                response_cache: None = None,
+                context_window: None = None,
+                attachment_mode: None = None,
                 ) -> None:
         """Initializes the agent for use with Ollama.
 
@@ -19,6 +24,9 @@ class OllamaClient(OpenAIProvider):
             response_schema (Type[BaseModel], optional): A Pydantic model to structure the LLM's JSON output. Defaults to None.
             tools (List[str], optional): A list of tool names to use. Defaults to [].
             extra_response_settings (Type[ExtraResponseSettings], optional): Additional parameters for the OpenAI API call (e.g., temperature, max_tokens). Defaults to ExtraResponseSettings().
+            response_cache (ResponseCache, optional): Cache of final responses keyed on the full request payload. Defaults to None.
+            context_window (ContextWindowManager, optional): Token budget and compaction of long prompts. Defaults to the context_window section of config.yaml.
+            attachment_mode (AttachmentMode, optional): How PDFs are sent: "upload", "extract_text" or "auto". Defaults to attachments.pdf.mode in config.yaml.
         """
         super().__init__(
             agent_name=agent_name,
@@ -28,5 +36,8 @@ class OllamaClient(OpenAIProvider):
             sys_instructions=sys_instructions,
             response_schema=response_schema,
             tools=tools,
-            extra_response_settings=extra_response_settings
+            extra_response_settings=extra_response_settings,
+            response_cache=response_cache,
+            context_window=context_window,
+            attachment_mode=attachment_mode
         )
\ No newline at end of file
@@ -1,9 +1,13 @@
 import os
 
+from agnostic_agent.config.config import load_environment
+
 from ..providers.openai_provider import OpenAIProvider
 
 
 class OpenRouterClient(OpenAIProvider):
+    backend_name = "openrouter"
+
     def __init__(self, 
                 agent_name: str,
                 model_name: str = "google/gemini-2.5-pro",
@@ -11,6 +15,9 @@ class OpenRouterClient(OpenAIProvider):
                 response_schema: None = None,
                 tools: list[str] = [],
                 extra_response_settings: None = None,
+                response_cache: None = None,
+                context_window: None = None,
+                attachment_mode: None = None,
                 ) -> None:
         """Initializes the agent for use with OpenRouter.
 
@@ -21,10 +28,14 @@ class OpenRouterClient(OpenAIProvider):
             response_schema (Type[BaseModel], optional): A Pydantic model to structure the LLM's JSON output. Defaults to None.
             tools (List[str], optional): A list of tool names to use. Defaults to [].
             extra_response_settings (Type[ExtraResponseSettings], optional): Additional parameters for the OpenAI API call (e.g., temperature, max_tokens). Defaults to ExtraResponseSettings().
+            response_cache (ResponseCache, optional): Cache of final responses keyed on the full request payload. Defaults to None.
+            context_window (ContextWindowManager, optional): Token budget and compaction of long prompts. Defaults to the context_window section of config.yaml.
+            attachment_mode (AttachmentMode, optional): How PDFs are sent: "upload", "extract_text" or "auto". Defaults to attachments.pdf.mode in config.yaml.
 
         Raises:
             ValueError: If the OpenRouter API key is not found in the environment variables.
         """
+        load_environment()
         api_key = os.getenv("OPEN_ROUTER_API_KEY")
         if not api_key:
             raise ValueError("Couldn't find OpenRouter's API key in OPEN_ROUTER_API_KEY environment variable.")
@@ -37,5 +48,8 @@ class OpenRouterClient(OpenAIProvider):
             sys_instructions=sys_instructions,
             response_schema=response_schema,
             tools=tools,
-            extra_response_settings=extra_response_settings
+            extra_response_settings=extra_response_settings,
+            response_cache=response_cache,
+            context_window=context_window,
+            attachment_mode=attachment_mode
         )
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .base_llm_provider import BaseLLMProvider
+from .client_registry import AsyncClientRegistry, client_registry
 from .openai_provider import OpenAIProvider
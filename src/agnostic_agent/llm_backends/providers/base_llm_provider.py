@@ -1,15 +1,20 @@
 
 import json
 import logging
-import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
 
 from pydantic import BaseModel
 
-from agnostic_agent.utils import exception_controller_executor_instance
+from agnostic_agent.utils import (
+      circuit_breaker_registry,
+      exception_controller_executor_instance,
+)
 
-from ...utils.core.schemas import LLMResponse
+from ...utils.core.compiled_schema import compile_schema
+from ...utils.core.schemas import LLMResponse, StreamEvent, TokenUsage
+from ...utils.core.session import Session
+from ...utils.core.usage import UsageLedger, usage_aggregator_instance
 
 logger = logging.getLogger(__name__)
 
@@ -23,87 +28,104 @@ class BaseLLMProvider(ABC):
                   - Tool calling (multi-turn)
                   - Structured output
                   - Summary (usage, time to execute, nº interactions, etc) + LLM response logging (raw response, text response, reasoning)
+                  - Streaming (text/reasoning deltas + incremental tool calls)
+                  - Cloning with some constructor arguments replaced
             - Encouraged support 
                   - File upload
       
       """
-      number_of_interactions = 0
       interactions_limit = 10 
-      cumulative_token_usage = {
-            'prompt_tokens': 0,
-            'completion_tokens': 0,
-            'total_tokens': 0
-      }
+      backend_name = "" # Key for backend-level settings (e.g. rate_limits in config.yaml)
       agent_name = ""
       model_name = ""
       sys_instructions = ""
       response_schema : Optional[Type[BaseModel]]= None
       tools = []
+      cumulative_token_usage: Optional[TokenUsage] = None # Per instance, set on first finished prompt
       
       async def prompt(self,
                    message: str, 
-                   files_path: Optional[List[str]] = None
+                   files_path: Optional[List[str]] = None,
+                   session: Optional[Session] = None
                    ) -> LLMResponse:
             output = await exception_controller_executor_instance.execute_with_retries(func=self.get_model_response,
                                                                                        message=message,
-                                                                                       files_path=files_path)
+                                                                                       files_path=files_path,
+                                                                                       session=session,
+                                                                                       circuit_breaker=circuit_breaker_registry.get(self.backend_name))
             return output
 
       @abstractmethod
       async def get_model_response(self,
                    message: str, 
-                   files_path: Optional[List[str]] = None) -> LLMResponse:
+                   files_path: Optional[List[str]] = None,
+                   session: Optional[Session] = None) -> LLMResponse:
             pass
 
       @abstractmethod
-      async def _generate_completition(self, messages: List[Dict], tools: Optional[Any] = None):
+      def stream_model_response(self,
+                   message: str,
+                   files_path: Optional[List[str]] = None,
+                   session: Optional[Session] = None) -> AsyncIterator[StreamEvent]:
             pass
 
       @abstractmethod
-      async def _complete_tool_calling_cycle(self, response, messages: List[dict[str, str]]):
+      def clone(self, share_usage: bool = False, **overrides) -> "BaseLLMProvider":
             pass
 
       @abstractmethod
-      def _log_response(self, response) -> None:
+      async def _generate_completition(self, messages: List[Dict], tools: Optional[Any] = None, stream: bool = False):
+            pass
+
+      @abstractmethod
+      async def _complete_tool_calling_cycle(self, response, messages: List[dict[str, str]], ledger: UsageLedger):
+            pass
+
+      @abstractmethod
+      def _log_response(self, response, ledger: UsageLedger) -> None:
             pass
 
       @abstractmethod
       async def _process_files(self, files_paths: List[str]) -> List[Dict]:
             pass
 
-      def _update_cumulative_token_usage(self, token_usage) -> None:
-            """Updates the cumulative token usage statistics from the model response.
+      def _new_usage_ledger(self) -> UsageLedger:
+            """Creates the ledger tracking token usage and interactions of a single prompt."""
+            return UsageLedger(agent_name=self.agent_name, model_name=self.model_name)
 
-            Args:
-                response (ChatCompletion): The model response containing usage information.
-            """
-            if token_usage:
-                self.cumulative_token_usage['prompt_tokens'] += getattr(token_usage, 'prompt_tokens', 0)
-                self.cumulative_token_usage['completion_tokens'] += getattr(token_usage, 'completion_tokens', 0)
-                self.cumulative_token_usage['total_tokens'] += getattr(token_usage, 'total_tokens', 0)
+      def _close_usage_ledger(self, ledger: UsageLedger) -> None:
+            """Adds a finished prompt's usage to the agent's and to the process-wide totals."""
+            if getattr(self, 'cumulative_token_usage', None) is None:
+                self.cumulative_token_usage = TokenUsage()
+            self.cumulative_token_usage.add(ledger.token_usage)
+            usage_aggregator_instance.merge(ledger)
 
-      def _summary_log(self, starting_time: int) -> None:
-            """Logs a summary of cumulative token usage, number of interactions, and elapsed time.
+      def _summary_log(self, ledger: UsageLedger) -> None:
+            """Logs a summary of token usage, number of interactions, and elapsed time.
 
             Args:
-                starting_time (int): The time when the prompt started.
+                ledger (UsageLedger): The usage ledger of the prompt that just finished.
             """
-            logger.info(f"(💰) Cumulative token usage: prompt={self.cumulative_token_usage['prompt_tokens']}, completion={self.cumulative_token_usage['completion_tokens']}, total={self.cumulative_token_usage['total_tokens']}")
-            logger.info(f"(🛠️) {self.number_of_interactions} interactions occured in function calling")
-            if self.number_of_interactions == 0 and self.tools:
+            process_usage = usage_aggregator_instance.total()
+            logger.info(f"(💰) Token usage: prompt={ledger.token_usage.prompt_tokens}, completion={ledger.token_usage.completion_tokens}, total={ledger.token_usage.total_tokens}")
+            logger.info(f"(💰) Cumulative token usage (process): prompt={process_usage.prompt_tokens}, completion={process_usage.completion_tokens}, total={process_usage.total_tokens}")
+            logger.info(f"(🛠️) {ledger.number_of_interactions} interactions occured in function calling")
+            if ledger.number_of_interactions == 0 and self.tools:
                 logger.warning("The LLM hasnt invoked any function/tool, even tho u passed some tool definitions")
-            logger.info(f"(⏱️) Took {round(time.time() - starting_time,2)} seconds to fullfill the given prompt")
+            logger.info(f"(⏱️) Took {round(ledger.elapsed_time(),2)} seconds to fullfill the given prompt "
+                        f"(model: {round(ledger.model_time,2)}s, tools: {round(ledger.tool_time,2)}s)")
       
-      def _process_response(self, prompt_response: str) -> LLMResponse:
+      def _process_response(self, prompt_response: str, ledger: Optional[UsageLedger] = None) -> LLMResponse:
             """Processes the final ChatCompletion object to extract relevant data and log interactions.
 
             Args:
                 response (ChatCompletion): The final model response.
+                ledger (UsageLedger, optional): Usage of the prompt, attached to the response.
 
             Returns:
                 LLMResponse: The processed response containing the final and parsed responses.
             """
-            logger.debug(f"Response is: {prompt_response}")
+            logger.debug("Response is: %s", prompt_response)
 
             final_text_response = prompt_response.content
             reasoning = getattr(prompt_response, 'reasoning', None)
@@ -112,12 +134,16 @@ class BaseLLMProvider(ABC):
             
             if self.response_schema:
                 json_dict = json.loads(final_text_response)
-                parsed_data = self.response_schema.model_validate(json_dict)
+                parsed_data = compile_schema(self.response_schema).validator.validate_python(json_dict)
             
             return LLMResponse(
                 final_text_response=final_text_response,
                 parsed_response=parsed_data if self.response_schema else None,
-                reasoning=reasoning
+                reasoning=reasoning,
+                usage=ledger.token_usage if ledger else None,
+                number_of_interactions=ledger.number_of_interactions if ledger else 0,
+                model_time=ledger.model_time if ledger else 0.0,
+                tool_time=ledger.tool_time if ledger else 0.0
             )
 
 
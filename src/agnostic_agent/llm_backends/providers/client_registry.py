@@ -0,0 +1,102 @@
+"""Process-wide pool of AsyncOpenAI clients, shared by every agent talking to the same endpoint."""
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientRegistry():
+    """Hands out one shared AsyncOpenAI client per (base_url, api_key).
+
+    Clients wrap a tuned httpx connection pool (HTTP/2 when the `h2` package is installed)
+    so sub-agents reuse warm, keep-alive connections instead of opening new ones. httpx
+    connections belong to the event loop they were opened on, so clients are additionally
+    scoped to the running loop: a new `asyncio.run()` gets fresh clients, and clients of
+    loops that have been closed are dropped.
+
+    Attributes:
+        max_connections: maximum concurrent connections per client
+        max_keepalive_connections: idle connections kept open per client
+        keepalive_expiry: seconds an idle connection is kept open
+        http2: whether HTTP/2 is negotiated
+        timeout: default request timeout in seconds
+    """
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 http2: bool = True,
+                 timeout: float = 600.0) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.debug("HTTP/2 requested but the 'h2' package is not installed. Falling back to HTTP/1.1")
+        self._clients: Dict[Tuple[str, str, int], Tuple[Optional[asyncio.AbstractEventLoop], AsyncOpenAI]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(api_key: str) -> str:
+        """Keeps raw API keys out of the registry keys."""
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    def _build_client(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        http_client = DefaultAsyncHttpxClient(
+            http2=self.http2,
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive_connections,
+                                keepalive_expiry=self.keepalive_expiry),
+        )
+        logger.debug(f"(🔌) Created shared client for {base_url} (http2={self.http2})")
+        return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+    def get_client(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        """Returns the shared client for an endpoint and API key, creating it if needed."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = (base_url, self._fingerprint(api_key), id(loop))
+        with self._lock:
+            self._drop_clients_of_closed_loops()
+            entry = self._clients.get(key)
+            if entry is None or entry[0] is not loop:
+                entry = (loop, self._build_client(base_url=base_url, api_key=api_key))
+                self._clients[key] = entry
+            return entry[1]
+
+    def _drop_clients_of_closed_loops(self) -> None:
+        closed_keys = [key for key, (loop, _) in self._clients.items() if loop is not None and loop.is_closed()]
+        for key in closed_keys:
+            del self._clients[key] # Their connections died with the loop, nothing left to close
+
+    async def aclose(self) -> None:
+        """Closes every client bound to the running event loop (or to no loop at all)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key, (client_loop, _) in self._clients.items() if client_loop in (loop, None)]
+            clients = [self._clients.pop(key)[1] for key in keys]
+        for client in clients:
+            await client.close()
+        if clients:
+            logger.debug(f"(🔌) Closed {len(clients)} shared client(s)")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+http_client_config: Dict[str, Any] = CONFIG_DICT.get("http_client", {})
+
+client_registry = AsyncClientRegistry(**http_client_config)
@@ -1,31 +1,68 @@
-
 """
 TO BE DONE:
     - Break class into: Configuration manager, File processing, Tool execution, Logging 
 """
 
 import asyncio
-import base64
-import concurrent.futures
+import copy
+import functools
 import json
 import logging
 import os
 import time
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Type
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-import aiofiles
-from dotenv import load_dotenv
 from openai import AsyncOpenAI
-from openai.types.chat import ChatCompletion
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
 from pydantic import BaseModel
 
-from agnostic_agent.utils import add_context_to_log
-
-from ...utils.core.function_calling.openai import FunctionalToolkit, tool_registry
-from ...utils.core.schemas import ExtraResponseSettings, LLMResponse, ToolSpec
+from agnostic_agent.config.config import CONFIG_DICT, load_environment
+from agnostic_agent.utils import (
+    RateLimiter,
+    add_context_to_log,
+    circuit_breaker_registry,
+    exception_controller_executor_instance,
+    image_preprocessor_instance,
+    rate_limiter_registry,
+    tool_executor_instance,
+)
+
+from ...utils.caching import ResponseCache, encoded_file_cache_instance
+from ...utils.core.compiled_schema import compile_schema
+from ...utils.core.context_window import ContextWindowManager
+from ...utils.core.function_calling.openai import (
+    FunctionalToolkit,
+    RegisteredTool,
+    tool_registry,
+)
+from ...utils.core.schemas import (
+    AttachmentMode,
+    ExecutionMode,
+    ExtraResponseSettings,
+    LLMResponse,
+    StreamEvent,
+    StreamEventType,
+    TokenUsage,
+    ToolSpec,
+)
+from ...utils.core.session import Session
+from ...utils.core.streaming import ToolCallAssembler
+from ...utils.core.tokens import estimate_prompt_tokens
+from ...utils.core.usage import UsageLedger
+from ...utils.files.mime import read_mime_type
+from ...utils.files.pdf import pdf_text_extractor_instance, split_page_selection
 from .base_llm_provider import BaseLLMProvider
-
-load_dotenv()
+from .client_registry import client_registry
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +76,9 @@ DEV_INSTRUCTIONS = """
             """
 
 class OpenAIProvider(BaseLLMProvider):
+    backend_name = "openai"
+    tool_round_timeout: Optional[float] = CONFIG_DICT.get("tool_execution", {}).get("round_timeout") # None waits for every tool
+
     def __init__(self,
                 agent_name: str,
                 model_name: str,
@@ -48,6 +88,9 @@ class OpenAIProvider(BaseLLMProvider):
                 response_schema: Optional[Type[BaseModel]] = None,
                 tools: Optional[List[str]] = [],
                 extra_response_settings: Optional[Type[ExtraResponseSettings]] = ExtraResponseSettings(),
+                response_cache: Optional[ResponseCache] = None,
+                context_window: Optional[ContextWindowManager] = None,
+                attachment_mode: Optional[Union[AttachmentMode, str]] = None,
                 ) -> None:
         """Initializes the OpenAI-compatible provider.
 
@@ -60,19 +103,84 @@ class OpenAIProvider(BaseLLMProvider):
             response_schema (Type[BaseModel], optional): A Pydantic model to structure the LLM's JSON output. Defaults to None.
             tools (List[str], optional): A list of tool names to use. Defaults to [].
             extra_response_settings (Type[ExtraResponseSettings], optional): Additional parameters for the OpenAI API call. Defaults to ExtraResponseSettings().
+            response_cache (ResponseCache, optional): Cache of final responses keyed on the full request payload. Defaults to None (no caching).
+            context_window (ContextWindowManager, optional): Token budget and compaction of long prompts. Defaults to the context_window section of config.yaml.
+            attachment_mode (AttachmentMode, optional): How PDFs are sent: "upload", "extract_text" or "auto". Defaults to attachments.pdf.mode in config.yaml.
         """
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url
-        )
+        load_environment()
+        self.base_url = base_url
+        self._api_key = api_key
+        self._client: Optional[AsyncOpenAI] = None
         self.agent_name = agent_name
         self.model_name = model_name
         self.sys_instructions = sys_instructions
         self.response_schema = response_schema
         self.tools = tools
+        self.extra_response_settings = extra_response_settings
         self.settings = self._set_up_settings(extra_response_settings)
         self.tools_to_use = self._set_up_toolkit(tools=tools) if tools else {}
         self.toolkit = FunctionalToolkit(self.tools_to_use)
+        self.response_cache = response_cache
+        self.image_preprocessor = image_preprocessor_instance
+        self.attachment_mode = AttachmentMode(attachment_mode or CONFIG_DICT.get("attachments", {}).get("pdf", {}).get("mode", AttachmentMode.UPLOAD))
+        self.context_window = context_window or ContextWindowManager.from_config(model_name=model_name,
+                                                                                 context_window_config=CONFIG_DICT.get("context_window"))
+
+    CLONE_OVERRIDES = frozenset({"agent_name", "model_name", "sys_instructions", "response_schema", "tools",
+                                 "extra_response_settings", "response_cache", "context_window", "attachment_mode"})
+
+    def clone(self, share_usage: bool = False, **overrides) -> "OpenAIProvider":
+        """Returns a copy of this provider with some constructor arguments replaced.
+
+        Nothing is looked up again: the API key, client, toolkit, settings and context window
+        are reused, and only what an override affects is recomputed (settings for a new
+        response_schema or extra_response_settings, the toolkit for new tools, the context
+        window for a new model_name). This makes spawning sub-agents from a configured one cheap.
+
+        Args:
+            share_usage (bool, optional): If True, the clone adds its token usage to this provider's
+                cumulative_token_usage. Otherwise it starts its own. Defaults to False.
+            **overrides: Any of the constructor arguments in CLONE_OVERRIDES.
+
+        Raises:
+            TypeError: If an override isn't a constructor argument that can be replaced.
+        """
+        unknown = set(overrides) - self.CLONE_OVERRIDES
+        if unknown:
+            raise TypeError(f"Can't override {sorted(unknown)} when cloning. Valid overrides: {sorted(self.CLONE_OVERRIDES)}")
+
+        clone = copy.copy(self)
+        for name, value in overrides.items():
+            setattr(clone, name, value)
+        if "response_schema" in overrides or "extra_response_settings" in overrides:
+            clone.settings = clone._set_up_settings(clone.extra_response_settings)
+        if "tools" in overrides:
+            clone.tools_to_use = clone._set_up_toolkit(tools=clone.tools) if clone.tools else {}
+            clone.toolkit = FunctionalToolkit(clone.tools_to_use)
+        if "attachment_mode" in overrides:
+            clone.attachment_mode = AttachmentMode(clone.attachment_mode or CONFIG_DICT.get("attachments", {}).get("pdf", {}).get("mode", AttachmentMode.UPLOAD))
+        if clone.context_window is None or ("model_name" in overrides and "context_window" not in overrides):
+            clone.context_window = ContextWindowManager.from_config(model_name=clone.model_name,
+                                                                    context_window_config=CONFIG_DICT.get("context_window"))
+        if share_usage:
+            if self.cumulative_token_usage is None:
+                self.cumulative_token_usage = TokenUsage()
+            clone.cumulative_token_usage = self.cumulative_token_usage
+        else:
+            clone.cumulative_token_usage = None
+        return clone
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The AsyncOpenAI client, shared with every agent using the same base_url and API key."""
+        if self._client is not None:
+            return self._client
+        return client_registry.get_client(base_url=self.base_url, api_key=self._api_key)
+
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        """Pins a dedicated client to this provider instead of the shared one."""
+        self._client = client
 
     def _set_up_toolkit(self, tools: Optional[List[Callable]] = None) -> dict[str, ToolSpec]:
         """Sets up the toolkit by filtering the global tool registry for the specified tools."""
@@ -90,238 +198,550 @@ class OpenAIProvider(BaseLLMProvider):
             exclude_none=True
         )
         if self.response_schema:
-            params["response_format"] = {
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": self.response_schema.__name__,
-                        "strict": True,
-                        "schema": self.response_schema.model_json_schema()
-                    }
-                }
+            params["response_format"] = compile_schema(self.response_schema).response_format()
         return params
 
-    def _extract_structure(self, file_extension:str, base_64_string: str, file_path:str) -> Dict:
-        """Extracts the structure for file or image input to be sent to the API."""
-        if file_extension in ['.png', '.jpg', '.jpeg', '.webp']:
-            content_type = 'image/png' if file_extension == '.png' else 'image/jpeg' if file_extension in ['.jpg', '.jpeg'] else 'image/webp'
+    def _extract_structure(self, file_extension:str, data_uri: str, file_path:str, mime_type: Optional[str] = None) -> Dict:
+        """Extracts the structure for file or image input to be sent to the API.
+
+        The MIME type detected from the file's bytes wins over the one guessed from its extension.
+        The data URI is sent as is, unless the bytes weren't recognized: it's then rebuilt
+        (copying the payload) to declare the type guessed from the extension.
+        """
+        if not (mime_type and (mime_type.startswith("image/") or mime_type == "application/pdf")):
+            if file_extension in ['.png', '.jpg', '.jpeg', '.webp']:
+                mime_type = 'image/png' if file_extension == '.png' else 'image/jpeg' if file_extension in ['.jpg', '.jpeg'] else 'image/webp'
+            else:
+                if file_extension != '.pdf':
+                    logger.warning(f"Unknown file type {file_extension}, treating as PDF")
+                mime_type = "application/pdf"
+            data_uri = f"data:{mime_type};base64,{data_uri.partition(',')[2]}"
+
+        if mime_type.startswith("image/"):
             structure = {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:{content_type};base64,{base_64_string}"
-                }
-            }
-        elif file_extension == '.pdf':
-            structure = {
-                "type": "file",
-                "file": {
-                    "filename": os.path.basename(file_path),
-                    "file_data": f"data:application/pdf;base64,{base_64_string}"
+                    "url": data_uri
                 }
             }
         else:
-            logger.warning(f"Unknown file type {file_extension}, treating as PDF")
             structure = {
                 "type": "file",
                 "file": {
                     "filename": os.path.basename(file_path),
-                    "file_data": f"data:application/pdf;base64,{base_64_string}"
+                    "file_data": data_uri
                 }
             }
         return structure
 
-    async def _process_single_file(self, file_path: str) -> Dict:
-        """Processes a single local file into the API format."""
-        async with aiofiles.open(file_path, "rb") as f:
-            with add_context_to_log(file_name=f.name):
-                file_size_bytes = os.path.getsize(file_path)
-                file_size_mb = file_size_bytes / (1024 * 1024)
-                logger.debug(f"File size is: {round(file_size_mb,2)} MB")
-
-                content = await f.read()
-                base_64_string = base64.b64encode(content).decode("utf-8")
-                file_extension = os.path.splitext(file_path)[1].lower()
+    async def _process_single_file(self, file_path: str) -> List[Dict]:
+        """Processes a single local file into the API format.
 
-                structure = self._extract_structure(file_extension=file_extension,
-                                                    base_64_string=base_64_string,
-                                                    file_path=file_path)
+        Encodings are cached by content, so attaching an unchanged file again only costs a stat call.
+        Every blocking access to the file (MIME sniffing, stat) runs in the tool executor's threads.
+        Images go through the agent's image_preprocessor first, if any. Depending on the
+        agent's attachment_mode, PDFs are sent as their locally extracted text instead; a
+        page selection can then be appended to the path ("report.pdf#pages=1-3,7").
 
-                return structure
+        Returns:
+            The content parts of the file
+        """
+        file_path, pages = split_page_selection(file_path)
+        with add_context_to_log(file_name=file_path):
+            if (self.attachment_mode != AttachmentMode.UPLOAD
+                    and await self._run_blocking(read_mime_type, file_path=file_path) == "application/pdf"):
+                text_parts = await self._extract_pdf_text(file_path=file_path, pages=pages)
+                if text_parts is not None:
+                    return text_parts
+            elif pages:
+                logger.warning(f"Page selection '{pages}' is only applied when PDF text is extracted. Sending the whole file")
+
+            file_size_bytes = await self._run_blocking(os.path.getsize, filename=file_path)
+            file_size_mb = file_size_bytes / (1024 * 1024)
+            logger.debug(f"File size is: {round(file_size_mb,2)} MB")
+
+            data_uri, mime_type = await encoded_file_cache_instance.get_data_uri(file_path,
+                                                                                 preprocessor=self.image_preprocessor)
+            file_extension = os.path.splitext(file_path)[1].lower()
+
+            structure = self._extract_structure(file_extension=file_extension,
+                                                data_uri=data_uri,
+                                                file_path=file_path,
+                                                mime_type=mime_type)
+
+            return [structure]
+
+    @staticmethod
+    async def _run_blocking(func: Callable, **kwargs) -> Any:
+        """Runs a blocking file access in the tool executor's threads, off the event loop."""
+        return await tool_executor_instance.run(func, kwargs=kwargs, execution_mode=ExecutionMode.THREAD)
+
+    async def _extract_pdf_text(self, file_path: str, pages: Optional[str] = None) -> Optional[List[Dict]]:
+        """Extracts a PDF's text locally. Returns None when the PDF should be uploaded instead (auto mode only).
+
+        Pages are appended to the message content as each batch is extracted, without an
+        intermediate list of every page.
+        """
+        text_parts = []
+        try:
+            async for text_part in pdf_text_extractor_instance.iter_text_parts(file_path=file_path,
+                                                                               file_name=os.path.basename(file_path),
+                                                                               pages=pages):
+                text_parts.append(text_part)
+        except ImportError as e:
+            if self.attachment_mode == AttachmentMode.EXTRACT_TEXT:
+                raise e
+            logger.warning(f"{e}. Uploading the PDF instead")
+            return None
+        if not text_parts and self.attachment_mode == AttachmentMode.AUTO:
+            logger.info("(📎) PDF has no text layer. Uploading it instead")
+            return None
+        return text_parts
 
     async def _process_files(self, files_paths: List[str]) -> List[Dict]:
         """Processes multiple files asynchronously into the API format."""
         tasks = [self._process_single_file(file_path) for file_path in files_paths]
         processed_files = await asyncio.gather(*tasks)
-        return processed_files
-
-    async def _extract_results_tools(
-        self,
-        messages: List[Dict[str, str]],
-        tool_call_info_map: Dict[Any, Tuple[str, int]],
-        sync_futures: List[concurrent.futures.Future],
-        async_tasks: List[Coroutine[Any, Any, Any]]
-    ) -> List[Dict[str, str]]:
-        """Extracts results from tool calls and appends them to the messages list."""
-        if async_tasks:
-            completed_tasks = await asyncio.gather(*async_tasks, return_exceptions=True)
-            for i, result in enumerate(completed_tasks):
-                original_task = async_tasks[i]
-                function_name_completed, original_tool_call_id = tool_call_info_map[original_task]
-
-                if isinstance(result, Exception):
-                    logger.error(f"(🔧) Async tool call {function_name_completed} failed: {result}")
-                    content = f"Error: {str(result)}"
-                    raise result
-                else:
-                    logger.debug(f"(🔧) Completed async task: {function_name_completed} with data: {result}")
-                    content = str(result)
-
-                messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": original_tool_call_id,
-                        "name": function_name_completed,
-                        "content": content
-                    }
-                )
-        if sync_futures:
-            for future in concurrent.futures.as_completed(sync_futures):
-                function_name_completed, original_tool_call_id = tool_call_info_map[future]
-                try:
-                    output = future.result()
-                    logger.debug(f"(🔧) Completed sync future: {function_name_completed} with output: {output}")
-                    content = str(output)
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": original_tool_call_id,
-                        "name": function_name_completed,
-                        "content": json.dumps(output) if isinstance(output, (dict, list)) else str(output),
-                    })
-                except Exception as exc:
-                    logger.error(f"(🔧) Sync tool call {function_name_completed} failed: {exc}")
-                    raise exc
+        return [content_part for file_parts in processed_files for content_part in file_parts]
 
-        return messages
+    def _dispatch_tool_call(self,
+                            function_name: str,
+                            function_args: Dict[str, Any]) -> Optional[asyncio.Future]:
+        """Starts executing a tool call requested by the LLM.
 
-    async def _complete_tool_calling_cycle(self, response: ChatCompletion, messages: List[dict[str, str]]) -> ChatCompletion:
-        """Handles the tool calling cycle."""
-        assistant_message_dict = response.choices[0].message.model_dump()
+        Async tools are scheduled as tasks on the running loop, sync tools are submitted to
+        the shared tool executor and bridged into the loop, so both are awaited together
+        without ever blocking it. Tools declared with a cache go through it first.
+
+        Returns:
+            The running task or future, or None if the tool is not part of the toolkit
+        """
+        procedure = self.toolkit.tools.get(function_name)
+        if not procedure:
+            logger.warning(f"Tool '{function_name}' requested by LLM but not found in toolkit.")
+            return None
+
+        executable_method = procedure.get_executable()
+        if procedure.is_coroutine:
+            run = functools.partial(executable_method, **function_args)
+        else:
+            run = functools.partial(tool_executor_instance.submit_async,
+                                    executable_method,
+                                    kwargs=function_args,
+                                    execution_mode=procedure.execution_mode)
+        if procedure.cache is not None:
+            return asyncio.create_task(self._run_cached_tool(procedure, function_args=function_args, run=run))
+        return asyncio.ensure_future(run())
+
+    @staticmethod
+    async def _run_cached_tool(procedure: RegisteredTool, function_args: Dict[str, Any], run: Callable) -> Any:
+        """Serves a tool call from the tool's cache, or runs it once for every identical call in flight."""
+        return await procedure.cache.get_or_run(procedure.name, procedure.cache_key(function_args), run)
+
+    @staticmethod
+    def _tool_message(function_name: str, tool_call_id: str, content: str) -> Dict[str, str]:
+        return {"role": "tool", "tool_call_id": tool_call_id, "name": function_name, "content": content}
+
+    def _start_tool_call(self,
+                         function_name: str,
+                         tool_call_id: str,
+                         function_args: Dict[str, Any],
+                         running_tools: Dict[asyncio.Future, Tuple[str, str]]) -> Optional[Dict[str, str]]:
+        """Dispatches a tool call and registers it in running_tools as an awaitable future.
+
+        Returns:
+            The tool message to append right away if the tool doesn't exist, None otherwise
+        """
+        execution = self._dispatch_tool_call(function_name=function_name, function_args=function_args)
+        if execution is None:
+            return self._tool_message(function_name, tool_call_id, f"Error: Tool '{function_name}' not found.")
+        running_tools[execution] = (function_name, tool_call_id)
+        return None
+
+    async def _iter_tool_results(self,
+                                 running_tools: Dict[asyncio.Future, Tuple[str, str]],
+                                 timeout: Optional[float] = None) -> AsyncIterator[Dict[str, str]]:
+        """Yields the tool message of every running tool in the order they finish.
+
+        Tools still running after timeout seconds, or cancelled by someone else, are answered
+        with an error message, so the model can go on without them. If a tool raises, or the
+        caller is cancelled, the remaining tools are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        pending = set(running_tools)
+        try:
+            while pending:
+                remaining_time = max(0.0, deadline - loop.time()) if deadline is not None else None
+                done, pending = await asyncio.wait(pending, timeout=remaining_time, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    for timed_out in pending:
+                        function_name, tool_call_id = running_tools[timed_out]
+                        timed_out.cancel() # Process/thread tools that already started run to completion in the background
+                        logger.warning(f"(🔧) Tool call {function_name} timed out after {timeout}s. Cancelled")
+                        yield self._tool_message(function_name, tool_call_id, f"Error: Tool '{function_name}' timed out after {timeout} seconds.")
+                    pending = set()
+                    return
+                for finished in done:
+                    function_name, tool_call_id = running_tools[finished]
+                    if finished.cancelled(): # Cancelled from outside, e.g. the executor was shut down
+                        logger.warning(f"(🔧) Tool call {function_name} was cancelled")
+                        yield self._tool_message(function_name, tool_call_id, f"Error: Tool '{function_name}' was cancelled before returning.")
+                        continue
+                    if finished.exception() is not None:
+                        logger.error(f"(🔧) Tool call {function_name} failed: {finished.exception()}")
+                        raise finished.exception()
+                    output = finished.result()
+                    logger.debug("(🔧) Completed tool call: %s with output: %s", function_name, output)
+                    content = json.dumps(output) if isinstance(output, (dict, list)) else str(output)
+                    yield self._tool_message(function_name, tool_call_id, content)
+        finally:
+            for still_running in pending:
+                still_running.cancel()
+
+    async def _run_tool_round(self, tool_calls: List[Any], messages: List[Dict]) -> None:
+        """Runs the tool calls of a round in parallel, appending each result to messages as soon as it is ready."""
+        running_tools: Dict[asyncio.Future, Tuple[str, str]] = {}
+        function_args = [json.loads(tool_call.function.arguments) for tool_call in tool_calls] # Fail before anything starts
+        for tool_call, args in zip(tool_calls, function_args):
+            not_found_message = self._start_tool_call(function_name=tool_call.function.name,
+                                                      tool_call_id=tool_call.id,
+                                                      function_args=args,
+                                                      running_tools=running_tools)
+            if not_found_message:
+                messages.append(not_found_message)
+        async for tool_message in self._iter_tool_results(running_tools, timeout=self.tool_round_timeout):
+            messages.append(tool_message)
+
+    @staticmethod
+    def _assistant_message_dict(message: ChatCompletionMessage) -> Dict[str, Any]:
+        """Turns an assistant message into the dict sent back in the conversation."""
+        assistant_message_dict = message.model_dump()
 
         # Filter out unnecessary fields
         for field in ['reasoning', 'reasoning_details', 'refusal', 'annotations', 'audio']:
             if field in assistant_message_dict:
                 del assistant_message_dict[field]
+        return assistant_message_dict
 
-        messages.append(assistant_message_dict)
-        tool_calls = response.choices[0].message.tool_calls
-
-        logger.debug(f"(🔧) Tool calls ({len(tool_calls) if tool_calls else 0} tools requested): {tool_calls}")
-
-        under_max_limit_of_interactions_reached = self.number_of_interactions < self.interactions_limit
-        if tool_calls and under_max_limit_of_interactions_reached:
-            self.number_of_interactions += 1
-
-            with add_context_to_log(interacion_number=self.number_of_interactions):
-                sync_futures = []
-                async_tasks = []
-                tool_call_info_map = {}
-                with concurrent.futures.ProcessPoolExecutor() as executor:
-                    for tool_call in tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        tool_call_id = tool_call.id
-
-                        procedure = self.toolkit.tools.get(function_name)
-                        if not procedure:
-                            logger.warning(f"Tool '{function_name}' requested by LLM but not found in toolkit.")
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": function_name,
-                                "content": f"Error: Tool '{function_name}' not found."
-                            })
-                            continue
-
-                        executable_method = procedure.get_executable()
-                        if procedure.is_coroutine:
-                            task = asyncio.create_task(executable_method(**function_args))
-                            async_tasks.append(task)
-                            tool_call_info_map[task] = (function_name, tool_call_id)
-                        else:
-                            future = executor.submit(executable_method, **function_args)
-                            sync_futures.append(future)
-                            tool_call_info_map[future] = (function_name, tool_call.id)
-
-                messages_with_tool_results = await self._extract_results_tools(messages=messages,
-                                                                            tool_call_info_map=tool_call_info_map,
-                                                                            sync_futures=sync_futures,
-                                                                            async_tasks=async_tasks)
-                response = await self._generate_completition(
-                                        messages=messages_with_tool_results,
-                                        tools=self.toolkit.schematize() if self.toolkit else None,
-                                        )
-                self._log_response(response)
-                return await self._complete_tool_calling_cycle(response=response, messages=messages)
-        else:
-            if not under_max_limit_of_interactions_reached:
-                logger.warning(f"Exiting tool calling cycle prematurely after reaching {self.number_of_interactions} number of interactions")
-            return response
+    async def _complete_tool_calling_cycle(self, response: ChatCompletion, messages: List[dict[str, str]], ledger: UsageLedger) -> ChatCompletion:
+        """Handles the tool calling cycle.
 
-    def _log_response(self, response: ChatCompletion) -> None:
+        Every round runs the requested tools and sends their results back in a new
+        completion, until the model answers without tool calls or the interactions limit is
+        reached. The split of each round between tool and model time is recorded in the ledger.
+        """
+        tools = self.toolkit.schematize() if self.toolkit else None
+        while True:
+            messages.append(self._assistant_message_dict(response.choices[0].message))
+            tool_calls = response.choices[0].message.tool_calls
+            logger.debug("(🔧) Tool calls (%d tools requested): %s", len(tool_calls) if tool_calls else 0, tool_calls)
+            if not tool_calls:
+                return response
+            if ledger.number_of_interactions >= self.interactions_limit:
+                logger.warning(f"Exiting tool calling cycle prematurely after reaching {ledger.number_of_interactions} number of interactions")
+                return response
+
+            ledger.record_interaction()
+            with add_context_to_log(interacion_number=ledger.number_of_interactions):
+                round_start = time.perf_counter()
+                await self._run_tool_round(tool_calls=tool_calls, messages=messages)
+                tool_time = time.perf_counter() - round_start
+
+                completion_start = time.perf_counter()
+                response = await self._generate_completition(messages=messages, tools=tools)
+                model_time = time.perf_counter() - completion_start
+
+                ledger.record_round(model_time=model_time, tool_time=tool_time)
+                logger.debug("(⏱️) Round %d: tools %.2fs, model %.2fs", ledger.number_of_interactions, tool_time, model_time)
+                self._log_response(response, ledger=ledger)
+
+    def _log_response(self, response: ChatCompletion, ledger: UsageLedger) -> None:
         """Logs the full response, text response, reasoning, and updates token usage."""
-        logger.debug(f"(📦) Full response: {response}")
-        logger.debug(f"(✏️) Text response: {response.choices[0].message.content}")
+        logger.debug("(📦) Full response: %s", response)
+        logger.debug("(✏️) Text response: %s", response.choices[0].message.content)
         token_usage = getattr(response, 'usage', None)
-        self._update_cumulative_token_usage(token_usage)
+        ledger.record_completion(token_usage)
         reasoning = getattr(response.choices[0].message, 'reasoning', None)
         if reasoning:
-            logger.debug(f"(🧠) Reasoning response: {reasoning}")
+            logger.debug("(🧠) Reasoning response: %s", reasoning)
         else:
             logger.debug("(🧠) No reasoning provided in the message.")
 
-    async def _generate_completition(self, messages: List[Dict], tools: Optional[Any] = None) -> ChatCompletion:
-        """Generates a model completion using the provided messages and tools."""
-        logger.debug(f"Adding the following settings: {self.settings}")
-        logger.debug(f"Message is: {messages}")
-        response = await self.client.chat.completions.create(
-                    model = self.model_name,
-                    messages = messages,
-                    tools = tools if tools else None,
-                    **self.settings
-                )
+    async def _generate_completition(self, messages: List[Dict], tools: Optional[Any] = None, stream: bool = False) -> ChatCompletion:
+        """Generates a model completion using the provided messages and tools.
+
+        With stream=True an async iterator of ChatCompletionChunk is returned instead, with
+        token usage reported in the last chunk.
+        """
+        if self.context_window:
+            messages = await self.context_window.fit(messages=messages, tools=tools)
+        logger.debug("Adding the following settings: %s", self.settings)
+        logger.debug("Message is: %s", messages) # Attachments are redacted structurally by the logging filter
+        rate_limiter = rate_limiter_registry.get(backend=self.backend_name, model=self.model_name)
+        if rate_limiter:
+            estimated_tokens = estimate_prompt_tokens(messages=messages, tools=tools)
+            await rate_limiter.acquire(estimated_tokens=estimated_tokens)
+
+        stream_settings = {"stream": True, "stream_options": {"include_usage": True}} if stream else {}
+        try:
+            response = await self.client.chat.completions.create(
+                        model = self.model_name,
+                        messages = messages,
+                        tools = tools if tools else None,
+                        **self.settings,
+                        **stream_settings
+                    )
+        except BaseException:
+            if rate_limiter: # The request may be retried, which reserves its tokens again
+                rate_limiter.release(estimated_tokens=estimated_tokens)
+            raise
+
+        if rate_limiter:
+            if stream:
+                return self._reconcile_rate_limit_after_stream(response, rate_limiter, estimated_tokens)
+            rate_limiter.reconcile(estimated_tokens=estimated_tokens,
+                                   actual_tokens=getattr(response.usage, 'total_tokens', None))
         return response
 
-    async def get_model_response(self,
-                message: str,
-                files_path: Optional[List[str]] = None) -> LLMResponse:
-        """Sends a prompt to the LLM and returns the final response."""
-        starting_time = time.time()
-        self.number_of_interactions = 0
-        logger.info(f"Starting prompt. {'Files included' if files_path else 'No files included.'} with model {self.model_name}")
+    async def _reconcile_rate_limit_after_stream(self, stream, rate_limiter: RateLimiter, estimated_tokens: int):
+        """Passes chunks through and corrects the reserved token budget once usage is reported.
+
+        If the stream ends without reporting usage (failed, or closed early by its consumer),
+        the reservation is given back.
+        """
+        actual_tokens = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    actual_tokens = chunk.usage.total_tokens
+                yield chunk
+        finally:
+            if actual_tokens is None:
+                rate_limiter.release(estimated_tokens=estimated_tokens)
+            else:
+                rate_limiter.reconcile(estimated_tokens=estimated_tokens, actual_tokens=actual_tokens)
+
+    def _build_prefix(self) -> List[Dict]:
+        """Instructions a session starts with. They never change, so they form a cacheable prefix."""
+        prefix = []
+        if self.sys_instructions:
+            prefix.append({"role": "developer", "content": self.sys_instructions})
+        prefix.append({"role": "developer", "content": DEV_INSTRUCTIONS})
+        return prefix
+
+    async def _build_messages(self,
+                              message: str,
+                              files_path: Optional[List[str]] = None,
+                              session: Optional[Session] = None) -> List[Dict]:
+        """Builds the conversation sent to the model.
+
+        Without a session: system instructions, user content (+files) and developer instructions.
+        With a session: its history (starting with the instructions prefix) followed by the
+        new user content.
+        """
         messages = []
         user_content = [{"type": "text", "text": message}]
         if files_path:
             processed_files = await self._process_files(files_paths=files_path)
             user_content.extend(processed_files)
 
+        if session is not None:
+            if not len(session):
+                session.set_prefix(self._build_prefix())
+            messages = session.messages
+            messages.append({"role": "user", "content": user_content})
+            return messages
+
         # Appending context
         if self.sys_instructions:
             messages.append({"role": "developer", "content": self.sys_instructions})
         messages.append({"role": "user", "content": user_content})
         messages.append({"role": "developer", "content": DEV_INSTRUCTIONS})
+        return messages
+
+    def _commit_turn(self,
+                     session: Session,
+                     messages: List[Dict],
+                     turn_start: int,
+                     final_message: Dict[str, Any]) -> None:
+        """Appends the messages of a successful prompt, ending with final_message, to its session."""
+        turn_messages = messages[turn_start:]
+        if turn_messages and turn_messages[-1].get("role") == "assistant":
+            turn_messages = turn_messages[:-1] # Replaced by final_message
+        # Tool calls left unanswered (interactions limit) would make the history invalid
+        final_message = {key: value for key, value in final_message.items() if key != "tool_calls"}
+        session.extend(turn_messages + [final_message], expected_length=turn_start)
+
+    async def get_model_response(self,
+                message: str,
+                files_path: Optional[List[str]] = None,
+                session: Optional[Session] = None) -> LLMResponse:
+        """Sends a prompt to the LLM and returns the final response.
 
+        With a session, the prompt continues its conversation and the new messages are
+        appended to it once the response is complete.
+        """
+        ledger = self._new_usage_ledger()
+        logger.info(f"Starting prompt. {'Files included' if files_path else 'No files included.'} with model {self.model_name}")
+        messages = await self._build_messages(message=message, files_path=files_path, session=session)
+        turn_start = len(messages) - 1
+        tools = self.toolkit.schematize() if self.toolkit else None
+
+        cache_key = None
+        if self.response_cache:
+            cache_key = self.response_cache.build_key({"model": self.model_name,
+                                                       "messages": messages,
+                                                       "tools": tools,
+                                                       "settings": self.settings})
+            cached_response = await self.response_cache.get(cache_key, response_schema=self.response_schema)
+            if cached_response:
+                logger.info(f"(🗃️) Response cache hit ({cache_key[:12]}). Skipping LLM call")
+                if session is not None:
+                    self._commit_turn(session, messages, turn_start,
+                                      final_message={"role": "assistant", "content": cached_response.final_text_response})
+                return cached_response
+
+        completion_start = time.perf_counter()
         response = await self._generate_completition(
             messages=messages,
-            tools=self.toolkit.schematize() if self.toolkit else None,
+            tools=tools,
         )
+        ledger.record_model_time(time.perf_counter() - completion_start)
 
         # Logging initial response
-        self._log_response(response=response)
+        self._log_response(response=response, ledger=ledger)
 
         # Calling tools if needed
         if response.choices[0].message.tool_calls:
-            response = await self._complete_tool_calling_cycle(response=response, messages=messages)
+            response = await self._complete_tool_calling_cycle(response=response, messages=messages, ledger=ledger)
 
         # Loggin final metrics
-        self._summary_log(starting_time=starting_time)
-        processed_response =  self._process_response(response.choices[0].message)
-        return processed_response
\ No newline at end of file
+        self._close_usage_ledger(ledger)
+        self._summary_log(ledger=ledger)
+        processed_response =  self._process_response(response.choices[0].message, ledger=ledger)
+        if self.response_cache:
+            await self.response_cache.set(cache_key, processed_response)
+        if session is not None:
+            self._commit_turn(session, messages, turn_start,
+                              final_message=self._assistant_message_dict(response.choices[0].message))
+        return processed_response
+
+    async def stream_model_response(self,
+                message: str,
+                files_path: Optional[List[str]] = None,
+                session: Optional[Session] = None) -> AsyncIterator[StreamEvent]:
+        """Sends a prompt to the LLM and yields the response as it is generated.
+
+        Text and reasoning deltas are yielded as they arrive. Tool calls are rebuilt from the
+        streamed fragments and start executing as soon as their arguments are complete, while
+        the rest of the response is still being streamed. Once every tool has returned, a new
+        streamed completion is issued with the results. The last event carries the full
+        LLMResponse. With a session, the new messages are appended to it once the stream ends.
+        """
+        ledger = self._new_usage_ledger()
+        logger.info(f"Starting streamed prompt. {'Files included' if files_path else 'No files included.'} with model {self.model_name}")
+        messages = await self._build_messages(message=message, files_path=files_path, session=session)
+        turn_start = len(messages) - 1
+        tools = self.toolkit.schematize() if self.toolkit else None
+
+        while True:
+            stream = await exception_controller_executor_instance.execute_with_retries(func=self._generate_completition,
+                                                                                       messages=messages,
+                                                                                       tools=tools,
+                                                                                       stream=True,
+                                                                                       circuit_breaker=circuit_breaker_registry.get(self.backend_name))
+            assembler = ToolCallAssembler()
+            running_tools: Dict[asyncio.Future, Tuple[str, str]] = {}
+            text_parts, reasoning_parts = [], []
+            stream_usage = None
+
+            try:
+                async for chunk in stream:
+                    stream_usage = getattr(chunk, 'usage', None) or stream_usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        text_parts.append(delta.content)
+                        yield StreamEvent(type=StreamEventType.TEXT, content=delta.content)
+                    reasoning = getattr(delta, 'reasoning', None)
+                    if reasoning:
+                        reasoning_parts.append(reasoning)
+                        yield StreamEvent(type=StreamEventType.REASONING, content=reasoning)
+                    for fragment in delta.tool_calls or []:
+                        fragment_function = getattr(fragment, 'function', None)
+                        yield StreamEvent(type=StreamEventType.TOOL_CALL_DELTA,
+                                          content=getattr(fragment_function, 'arguments', None),
+                                          tool_call_id=getattr(fragment, 'id', None),
+                                          tool_name=getattr(fragment_function, 'name', None))
+                    for completed_call in assembler.add(delta.tool_calls):
+                        yield self._start_streamed_tool_call(completed_call, running_tools)
+            finally:
+                if hasattr(stream, "aclose"): # Settles the rate limit reservation now if we stopped early
+                    await stream.aclose()
+
+            for completed_call in assembler.flush():
+                yield self._start_streamed_tool_call(completed_call, running_tools)
+            ledger.record_completion(stream_usage)
+
+            assistant_message = ChatCompletionMessage(role="assistant",
+                                                      content="".join(text_parts) or None,
+                                                      tool_calls=assembler.to_message_dicts() or None)
+            if reasoning_parts:
+                assistant_message.reasoning = "".join(reasoning_parts)
+            logger.debug("(✏️) Streamed text response: %s", assistant_message.content)
+
+            under_max_limit_of_interactions_reached = ledger.number_of_interactions < self.interactions_limit
+            if not assembler.calls or not under_max_limit_of_interactions_reached:
+                if not under_max_limit_of_interactions_reached:
+                    logger.warning(f"Exiting tool calling cycle prematurely after reaching {ledger.number_of_interactions} number of interactions")
+                    for running_tool in running_tools:
+                        running_tool.cancel()
+                break
+
+            ledger.record_interaction()
+            messages.append(assistant_message.model_dump(exclude_none=True, exclude={'reasoning'}))
+            async for tool_result_event, tool_message in self._collect_streamed_tool_results(running_tools):
+                messages.append(tool_message)
+                yield tool_result_event
+
+        self._close_usage_ledger(ledger)
+        self._summary_log(ledger=ledger)
+        if session is not None:
+            self._commit_turn(session, messages, turn_start,
+                              final_message=assistant_message.model_dump(exclude_none=True, exclude={'reasoning'}))
+        yield StreamEvent(type=StreamEventType.FINAL, response=self._process_response(assistant_message, ledger=ledger))
+
+    def _start_streamed_tool_call(self, tool_call, running_tools: Dict[asyncio.Future, Tuple[str, str]]) -> StreamEvent:
+        """Starts a fully streamed tool call and registers it in running_tools."""
+        tool_call_id = tool_call.to_message_dict()["id"]
+        logger.debug("(🔧) Streamed tool call complete: %s with arguments %s", tool_call.name, tool_call.arguments)
+        try:
+            function_args = json.loads(tool_call.arguments or "{}")
+        except json.JSONDecodeError as e:
+            execution = asyncio.get_running_loop().create_future()
+            execution.set_exception(ValueError(f"Invalid JSON arguments for tool '{tool_call.name}': {e}"))
+            running_tools[execution] = (tool_call.name, tool_call_id)
+        else:
+            not_found_message = self._start_tool_call(function_name=tool_call.name,
+                                                      tool_call_id=tool_call_id,
+                                                      function_args=function_args,
+                                                      running_tools=running_tools)
+            if not_found_message:
+                execution = asyncio.get_running_loop().create_future()
+                execution.set_result(not_found_message["content"])
+                running_tools[execution] = (tool_call.name, tool_call_id)
+        return StreamEvent(type=StreamEventType.TOOL_CALL,
+                           content=tool_call.arguments,
+                           tool_call_id=tool_call_id,
+                           tool_name=tool_call.name)
+
+    async def _collect_streamed_tool_results(self, running_tools: Dict[asyncio.Future, Tuple[str, str]]):
+        """Yields (event, tool message) pairs in the order the running tools finish."""
+        async for tool_message in self._iter_tool_results(running_tools, timeout=self.tool_round_timeout):
+            yield (StreamEvent(type=StreamEventType.TOOL_RESULT,
+                               content=tool_message["content"],
+                               tool_call_id=tool_message["tool_call_id"],
+                               tool_name=tool_message["name"]),
+                   tool_message)
@@ -1,15 +1,32 @@
+import copy
+import functools
 import logging
-from typing import Any, List, Optional, Type
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple, Type, Union
 
 from pydantic import BaseModel
 
 from agnostic_agent import BaseLLMProvider, OllamaClient, OpenRouterClient
-from agnostic_agent.utils import add_context_to_log
+from agnostic_agent.utils import (
+      ContextWindowManager,
+      PromptBatch,
+      ResponseCache,
+      Session,
+      add_context_to_log,
+)
 
-from .utils.core.schemas import ExtraResponseSettings, LLMResponse
+from .utils.core.schemas import (
+      AttachmentMode,
+      ExtraResponseSettings,
+      LLMResponse,
+      StreamEvent,
+      StreamEventType,
+)
 
 logger = logging.getLogger(__name__)
 
+MAX_CALL_BACKENDS = 16 # Distinct per-call overrides whose provider copies are kept
+
 class LLMAgent():
       def __init__(self, 
                   llm_backend: str,
@@ -19,6 +36,9 @@ class LLMAgent():
                   response_schema: Optional[Type[BaseModel]] = None,
                   tools: Optional[List[Any]] = [],
                   extra_response_settings: Optional[Type[ExtraResponseSettings]] = ExtraResponseSettings(),
+                  response_cache: Optional[ResponseCache] = None,
+                  context_window: Optional[ContextWindowManager] = None,
+                  attachment_mode: Optional[Union[AttachmentMode, str]] = None,
                   ) -> None:
             
             self.agent_name = agent_name
@@ -31,13 +51,18 @@ class LLMAgent():
                   sys_instructions=sys_instructions,
                   response_schema=response_schema,
                   tools=tools,
-                  extra_response_settings=extra_response_settings
+                  extra_response_settings=extra_response_settings,
+                  response_cache=response_cache,
+                  context_window=context_window,
+                  attachment_mode=attachment_mode
             )
+            # (sys_instructions, settings JSON) -> (backend copied, copy with those overrides)
+            self._call_backends: "OrderedDict[Tuple, Tuple[BaseLLMProvider, BaseLLMProvider]]" = OrderedDict()
 
       def _resolve_llm_backend_object(self, 
                                     llm_backend: str,
                                     **kwargs) -> BaseLLMProvider: # simple factory pattern
-            logger.debug(f"KWARGS IS: {kwargs}")
+            logger.debug("KWARGS IS: %s", kwargs)
             llm_provider = llm_backend.strip().lower()
             if llm_provider == "openrouter":
                   return OpenRouterClient(**kwargs)
@@ -47,14 +72,136 @@ class LLMAgent():
                   raise ValueError(f"Unknown LLM backend: {llm_backend}")
 
       
+      def clone(self, **overrides) -> "LLMAgent":
+            """Returns a new agent configured like this one, except for the given overrides.
+
+            The backend isn't resolved again and its API key, client, toolkit and settings are
+            reused, so configuring an agent once and cloning it is much cheaper than
+            constructing a new agent for every sub-task. The clone tracks its own token usage.
+
+            Usage:
+                  chunk_agent = template_agent.clone(agent_name=chunk_name)
+
+            Args:
+                  **overrides: Any constructor argument but llm_backend (e.g. agent_name, sys_instructions, tools).
+
+            Raises:
+                  TypeError: If an override can't be applied to a clone.
+            """
+            new_agent = copy.copy(self)
+            new_agent.llm_backend = self.llm_backend.clone(**overrides)
+            new_agent.agent_name = new_agent.llm_backend.agent_name
+            new_agent.model_name = new_agent.llm_backend.model_name
+            new_agent._call_backends = OrderedDict()
+            return new_agent
+
+      def _backend_for_call(self,
+                           sys_instructions: Optional[str] = None,
+                           extra_response_settings: Optional[ExtraResponseSettings] = None) -> BaseLLMProvider:
+            """Returns the provider serving one call: this agent's, or a copy of it with the per-call overrides.
+
+            Copies are kept per distinct overrides (the MAX_CALL_BACKENDS most recently used), so
+            a batch or a loop repeating the same overrides clones the provider only once.
+            """
+            overrides = {}
+            if sys_instructions is not None:
+                  overrides["sys_instructions"] = sys_instructions
+            if extra_response_settings is not None:
+                  overrides["extra_response_settings"] = extra_response_settings
+            if not overrides:
+                  return self.llm_backend
+
+            key = (sys_instructions, extra_response_settings.model_dump_json() if extra_response_settings is not None else None)
+            source_backend, llm_backend = self._call_backends.get(key, (None, None))
+            if source_backend is self.llm_backend: # Copies of a replaced backend are never reused
+                  self._call_backends.move_to_end(key)
+                  return llm_backend
+            llm_backend = self.llm_backend.clone(share_usage=True, **overrides)
+            self._call_backends[key] = (self.llm_backend, llm_backend)
+            if len(self._call_backends) > MAX_CALL_BACKENDS:
+                  self._call_backends.popitem(last=False)
+            return llm_backend
+
       async def prompt(self,
                     message: str,  
-                    files_path: Optional[List[str]] = None) -> LLMResponse:  # strategy pattern
+                    files_path: Optional[List[str]] = None,
+                    session: Optional[Session] = None,
+                    sys_instructions: Optional[str] = None,
+                    extra_response_settings: Optional[ExtraResponseSettings] = None) -> LLMResponse:  # strategy pattern
+            """Prompts the agent. With a session, the prompt continues (and extends) its conversation.
+
+            sys_instructions and extra_response_settings replace the agent's for this call only,
+            without constructing a new agent. The agent's token usage still includes the call.
+            Sessions keep the system instructions they started with.
+            """
+            llm_backend = self._backend_for_call(sys_instructions=sys_instructions, extra_response_settings=extra_response_settings)
             with add_context_to_log(agent_name=self.agent_name, model_name=self.model_name, llm_backend=self.llm_backend):
-                  result = await self.llm_backend.prompt(message=message,
-                                                files_path=files_path)
-                  logger.debug(f"Final text response is: {result.final_text_response}")
-                  logger.debug(f"Final parsed response is: {result.parsed_response}")
-                  logger.debug(f"Reasoning: {result.reasoning}")
+                  result = await llm_backend.prompt(message=message,
+                                                files_path=files_path,
+                                                session=session)
+                  logger.debug("Final text response is: %s", result.final_text_response)
+                  logger.debug("Final parsed response is: %s", result.parsed_response)
+                  logger.debug("Reasoning: %s", result.reasoning)
             return result
-      
\ No newline at end of file
+
+      def prompt_many(self,
+                    messages: Iterable[str],
+                    files_path: Optional[List[str]] = None,
+                    max_concurrency: int = 8,
+                    return_exceptions: bool = False,
+                    ordered: bool = False,
+                    retries: int = 0,
+                    sys_instructions: Optional[str] = None,
+                    extra_response_settings: Optional[ExtraResponseSettings] = None) -> PromptBatch:
+            """Prompts this agent once per message, with at most max_concurrency prompts in flight.
+
+            Every prompt reuses this agent's provider and HTTP client. Iterate over the returned
+            batch to get BatchItemResult objects as they complete (or in input order if ordered=True);
+            batch.summary holds aggregated token usage and per-item latencies afterwards.
+
+            Args:
+                messages: the messages to send, one prompt each. Consumed lazily
+                files_path: files attached to every prompt
+                max_concurrency: maximum number of prompts in flight
+                return_exceptions: if True, failed items are yielded with their error instead of raising
+                ordered: if True, results are yielded in input order
+                retries: extra attempts per item when its prompt raises
+                sys_instructions: replaces the agent's system instructions for this batch
+                extra_response_settings: replaces the agent's response settings for this batch
+            """
+            return PromptBatch(prompt_func=functools.partial(self.prompt,
+                                                             sys_instructions=sys_instructions,
+                                                             extra_response_settings=extra_response_settings),
+                               messages=messages,
+                               files_path=files_path,
+                               max_concurrency=max_concurrency,
+                               return_exceptions=return_exceptions,
+                               ordered=ordered,
+                               retries=retries)
+
+      async def stream(self,
+                    message: str,
+                    files_path: Optional[List[str]] = None,
+                    session: Optional[Session] = None,
+                    sys_instructions: Optional[str] = None,
+                    extra_response_settings: Optional[ExtraResponseSettings] = None) -> AsyncIterator[StreamEvent]:
+            """Same as prompt, but yields text/reasoning deltas and tool call events as they arrive.
+
+            The last event is of type StreamEventType.FINAL and carries the full LLMResponse.
+            """
+            llm_backend = self._backend_for_call(sys_instructions=sys_instructions, extra_response_settings=extra_response_settings)
+            events = llm_backend.stream_model_response(message=message, files_path=files_path, session=session)
+            try:
+                  while True:
+                        # Log context is entered per step so it never spans a yield to the caller
+                        with add_context_to_log(agent_name=self.agent_name, model_name=self.model_name, llm_backend=self.llm_backend):
+                              try:
+                                    event = await events.__anext__()
+                              except StopAsyncIteration:
+                                    return
+                              if event.type == StreamEventType.FINAL:
+                                    logger.debug("Final text response is: %s", event.response.final_text_response)
+                                    logger.debug("Final parsed response is: %s", event.response.parsed_response)
+                        yield event
+            finally:
+                  await events.aclose()
@@ -1,3 +1,49 @@
-from .core import ExtraResponseSettings, ToolkitBase, tool, tool_registry
-from .fault_tolerance import exception_controller_executor_instance
-from .logger import Logger, add_context_to_log
+"""Utilities of the agents. Subpackages are imported on first access of one of their attributes."""
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core import (AttachmentMode, BatchItemResult, BatchSummary, CompiledSchema, ContextWindowManager,
+                       ExecutionMode, ExtraResponseSettings, PromptBatch, Session, StreamEvent,
+                       StreamEventType, TokenUsage, ToolkitBase, UsageLedger, compile_schema, tool,
+                       tool_cache_stats, tool_registry, usage_aggregator_instance)
+    from .caching import (EncodedFileCache, InMemoryLRUBackend, ResponseCache,
+                          ResponseCacheBackend, SQLiteBackend, TTLCache, encoded_file_cache_instance)
+    from .execution import ToolExecutor, tool_executor_instance
+    from .files import (AttachmentMemoryBudget, ImagePreprocessor, PDFTextExtractor,
+                        attachment_memory_budget, image_preprocessor_instance,
+                        pdf_text_extractor_instance)
+    from .fault_tolerance import (CircuitOpenError, RateLimiter, circuit_breaker_registry,
+                                  exception_controller_executor_instance, rate_limiter_registry)
+    from .logger import Logger, add_context_to_log
+
+_SUBPACKAGE_ATTRIBUTES = {
+    ".core": ["AttachmentMode", "BatchItemResult", "BatchSummary", "CompiledSchema", "ContextWindowManager",
+              "ExecutionMode", "ExtraResponseSettings", "PromptBatch", "Session", "StreamEvent",
+              "StreamEventType", "TokenUsage", "ToolkitBase", "UsageLedger", "compile_schema", "tool",
+              "tool_cache_stats", "tool_registry", "usage_aggregator_instance"],
+    ".caching": ["EncodedFileCache", "InMemoryLRUBackend", "ResponseCache",
+                 "ResponseCacheBackend", "SQLiteBackend", "TTLCache", "encoded_file_cache_instance"],
+    ".execution": ["ToolExecutor", "tool_executor_instance"],
+    ".files": ["AttachmentMemoryBudget", "ImagePreprocessor", "PDFTextExtractor",
+               "attachment_memory_budget", "image_preprocessor_instance",
+               "pdf_text_extractor_instance"],
+    ".fault_tolerance": ["CircuitOpenError", "RateLimiter", "circuit_breaker_registry",
+                         "exception_controller_executor_instance", "rate_limiter_registry"],
+    ".logger": ["Logger", "add_context_to_log"],
+}
+_LAZY_ATTRIBUTES = {name: subpackage for subpackage, names in _SUBPACKAGE_ATTRIBUTES.items() for name in names}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
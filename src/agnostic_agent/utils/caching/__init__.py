@@ -0,0 +1,4 @@
+from .file_cache import EncodedFileCache, encoded_file_cache_instance
+from .response_cache import (InMemoryLRUBackend, ResponseCache, ResponseCacheBackend,
+                             SQLiteBackend)
+from .tool_cache import TTLCache
@@ -0,0 +1,175 @@
+"""Content-addressed cache of base64-encoded attachments."""
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import aiofiles
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+from ..files.encoding import (
+    DEFAULT_CHUNK_SIZE,
+    attachment_memory_budget,
+    data_uri_mime_type,
+    data_uri_prefix,
+    encode_bytes_base64,
+    encode_file_base64,
+    encoded_length,
+)
+from ..files.images import ImagePreprocessor
+from ..files.mime import read_mime_type
+from .response_cache import InMemoryLRUBackend, ResponseCacheBackend, SQLiteBackend
+
+logger = logging.getLogger(__name__)
+
+
+class EncodedFileCache():
+    """Keeps the base64 encoding of attached files so repeated attachments skip the read and the encode.
+
+    Two kinds of entries are stored:
+        - "path:<hash of path, size and mtime>" -> content hash. A file whose stat didn't
+          change is found with a single stat call
+        - "data_uri:<sha256 of the bytes>" -> base64 data URI ("data:<mime>;base64,..."),
+          ready to be sent as is. Identical files under different paths (or touched without
+          changes) share a single encoding
+
+    Lookups go to the memory backend first, then to the optional disk backend (whose hits
+    are copied back to memory).
+
+    Attributes:
+        memory_backend: in-process LRU of entries
+        disk_backend: optional persistent storage (e.g. SQLiteBackend), shared across restarts
+        enabled: if False, files are read and encoded on every call
+        hits: files served without encoding them again
+        misses: files that had to be encoded
+    """
+    def __init__(self,
+                 memory_backend: Optional[ResponseCacheBackend] = None,
+                 disk_backend: Optional[ResponseCacheBackend] = None,
+                 enabled: bool = True) -> None:
+        self.memory_backend = memory_backend or InMemoryLRUBackend(max_entries=256, max_bytes=512 * 1024 * 1024)
+        self.disk_backend = disk_backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, file_cache_config: Optional[Dict[str, Any]]) -> "EncodedFileCache":
+        config = file_cache_config or {}
+        disk_path = config.get("disk_path")
+        return cls(memory_backend=InMemoryLRUBackend(max_entries=config.get("max_entries", 256),
+                                                     max_bytes=config.get("max_bytes")),
+                   disk_backend=SQLiteBackend(path=disk_path) if disk_path else None,
+                   enabled=config.get("enabled", True))
+
+    @staticmethod
+    def _path_key(file_path: str, stat_result: os.stat_result) -> str:
+        fingerprint = f"{os.path.abspath(file_path)}|{stat_result.st_size}|{stat_result.st_mtime_ns}"
+        return "path:" + hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    async def get_data_uri(self, file_path: str, preprocessor: Optional[ImagePreprocessor] = None) -> Tuple[str, Optional[str]]:
+        """Returns a file as a base64 data URI and its MIME type, from the cache when possible.
+
+        Args:
+            file_path: the file to encode
+            preprocessor: if given, images are downscaled/recompressed before being encoded.
+                Its results are cached separately from the original encodings
+
+        Returns:
+            The data URI, declaring the MIME type detected from the file's bytes, and that
+            MIME type (None if unknown, in which case the URI declares application/octet-stream)
+        """
+        variant = preprocessor.variant if preprocessor else "original"
+        if not self.enabled:
+            _, data_uri = await self._read_and_encode(file_path, preprocessor)
+            return data_uri, data_uri_mime_type(data_uri)
+
+        path_key = self._path_key(file_path, await self._run_blocking(os.stat, file_path))
+        content_hash = await self._get(path_key)
+        if content_hash:
+            data_uri = await self._get(f"data_uri:{variant}:{content_hash}")
+            if data_uri is not None:
+                self.hits += 1
+                logger.debug(f"(🗃️) Attachment cache hit for {file_path}")
+                return data_uri, data_uri_mime_type(data_uri)
+
+        content_hash, data_uri = await self._read_and_encode(file_path, preprocessor)
+        cached_data_uri = await self._get(f"data_uri:{variant}:{content_hash}")
+        if cached_data_uri is not None:
+            self.hits += 1 # Same bytes seen under another path or mtime
+            data_uri = cached_data_uri
+        else:
+            self.misses += 1
+            await self._set(f"data_uri:{variant}:{content_hash}", data_uri)
+        await self._set(path_key, content_hash)
+        return data_uri, data_uri_mime_type(data_uri)
+
+    async def _read_and_encode(self, file_path: str, preprocessor: Optional[ImagePreprocessor] = None):
+        """Returns the sha256 of a file's bytes and their base64 data URI.
+
+        Files are encoded in chunks, unless they are images to preprocess (which need their
+        whole bytes). The memory used meanwhile is reserved in the attachment memory budget
+        until the data URI string is built.
+        """
+        file_size = await self._run_blocking(os.path.getsize, file_path)
+        mime_type = await self._run_blocking(read_mime_type, file_path)
+        if not (preprocessor and preprocessor.can_process(mime_type)):
+            peak_memory = 2 * encoded_length(file_size) + DEFAULT_CHUNK_SIZE
+            async with attachment_memory_budget.reserve(peak_memory):
+                return await encode_file_base64(file_path, prefix=data_uri_prefix(mime_type))
+
+        peak_memory = 2 * file_size + 2 * encoded_length(file_size) # Original + processed bytes, then the encoding
+        async with attachment_memory_budget.reserve(peak_memory):
+            async with aiofiles.open(file_path, "rb") as f:
+                content = await f.read()
+            content_hash = hashlib.sha256(content).hexdigest()
+            processed, mime_type = await preprocessor.process(content, mime_type)
+            return content_hash, encode_bytes_base64(processed, prefix=data_uri_prefix(mime_type))
+
+    async def _get(self, key: str) -> Optional[str]:
+        value = self.memory_backend.get(key)
+        if value is None and self.disk_backend is not None:
+            value = await self._call_backend(self.disk_backend, self.disk_backend.get, key)
+            if value is not None:
+                self.memory_backend.set(key, value)
+        return value
+
+    async def _set(self, key: str, value: str) -> None:
+        self.memory_backend.set(key, value)
+        if self.disk_backend is not None:
+            await self._call_backend(self.disk_backend, self.disk_backend.set, key, value)
+
+    @staticmethod
+    async def _run_blocking(func, *args):
+        """Runs a blocking call (stat, file or SQLite access) in the loop's default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    @classmethod
+    async def _call_backend(cls, backend: ResponseCacheBackend, method, *args):
+        if backend.blocking_io:
+            return await cls._run_blocking(method, *args)
+        return method(*args)
+
+    async def invalidate(self, file_path: str) -> None:
+        """Forgets the current version of a file (its content entry is left for other paths sharing it)."""
+        if await self._run_blocking(os.path.exists, file_path):
+            path_key = self._path_key(file_path, await self._run_blocking(os.stat, file_path))
+            self.memory_backend.delete(path_key)
+            if self.disk_backend is not None:
+                await self._call_backend(self.disk_backend, self.disk_backend.delete, path_key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters, hit ratio and memory entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.memory_backend.evictions,
+            "entries": len(self.memory_backend),
+        }
+
+
+encoded_file_cache_instance = EncodedFileCache.from_config(CONFIG_DICT.get("attachments", {}).get("cache"))
@@ -0,0 +1,249 @@
+"""Content-addressed cache of final LLM responses."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from ..core.compiled_schema import compile_schema
+from ..core.schemas import LLMResponse, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheBackend(ABC):
+    """Storage for serialized responses. Keys are hex digests, values are JSON strings.
+
+    Attributes:
+        blocking_io: if True, calls are moved off the event loop
+        evictions: number of entries evicted because of their TTL or the size limit
+    """
+    blocking_io = False
+
+    def __init__(self) -> None:
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class InMemoryLRUBackend(ResponseCacheBackend):
+    """Least-recently-used cache living in the process memory.
+
+    Attributes:
+        max_entries: maximum number of responses kept
+        max_bytes: maximum total size of the stored values. None means unbounded
+        ttl: seconds a response stays valid. None means forever
+    """
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                self._remove(key)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time(), value)
+            self._size_bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or (self.max_bytes is not None and self._size_bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size_bytes -= len(value)
+
+
+class SQLiteBackend(ResponseCacheBackend):
+    """On-disk cache stored in a single SQLite file. Survives restarts and is shareable across processes.
+
+    Attributes:
+        path: location of the SQLite database
+        max_entries: maximum number of responses kept, least recently used are evicted first
+        ttl: seconds a response stays valid. None means forever
+    """
+    blocking_io = True
+
+    def __init__(self, path: str, max_entries: Optional[int] = 10_000, ttl: Optional[float] = None) -> None:
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.ttl is not None:
+                self.evictions += self._connection.execute("DELETE FROM responses WHERE stored_at < ?",
+                                                           (now - self.ttl,)).rowcount
+            if self.max_entries is not None:
+                self.evictions += self._connection.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache():
+    """Opt-in cache of final LLM responses, keyed on a stable hash of the full request payload.
+
+    A hit skips every completion (and tool call) of the prompt. The structured output is
+    re-validated against the agent's response_schema, so hits return the same parsed
+    response as the original call.
+
+    Attributes:
+        backend: where serialized responses are stored
+        hits: number of prompts answered from the cache
+        misses: number of prompts that had to reach the LLM
+    """
+    def __init__(self, backend: Optional[ResponseCacheBackend] = None) -> None:
+        self.backend = backend or InMemoryLRUBackend()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(payload: Dict[str, Any]) -> str:
+        """Hashes a request payload (model, messages, tools, settings) into a stable key."""
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str, response_schema: Optional[Type[BaseModel]] = None) -> Optional[LLMResponse]:
+        """Returns the cached response for key, or None on a miss.
+
+        Args:
+            key: the payload hash returned by build_key
+            response_schema: the agent's structured output schema, used to rebuild parsed_response
+        """
+        value = await self._call_backend(self.backend.get, key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        response = LLMResponse.model_validate_json(value)
+        if response_schema:
+            response.parsed_response = compile_schema(response_schema).validator.validate_python(json.loads(response.final_text_response))
+        response.usage = TokenUsage() # Nothing was consumed to answer this prompt
+        response.cached = True
+        return response
+
+    async def set(self, key: str, response: LLMResponse) -> None:
+        """Stores a response. The parsed output is dropped and rebuilt from the text on hits."""
+        value = response.model_dump_json(exclude={"parsed_response", "cached"})
+        await self._call_backend(self.backend.set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters, hit ratio, evictions and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "entries": len(self.backend),
+        }
+
+    async def _call_backend(self, method, *args):
+        if self.backend.blocking_io:
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+        return method(*args)
@@ -0,0 +1,128 @@
+"""Memoization of tool results, declared with @tool(schema=..., cache=TTLCache(...))."""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LEADER_CANCELLED = object() # Wakes followers of a cancelled call, so they run the tool themselves
+
+
+class TTLCache():
+    """Least-recently-used cache of tool results that expire after ttl seconds.
+
+    Entries are namespaced by tool name, so one cache can be shared by several tools.
+    Concurrent identical calls are single-flighted: the first one runs the tool and the
+    others await its result, which also deduplicates identical calls of the same round.
+    If the first call is cancelled, the others run the tool themselves instead.
+    Failed calls are never cached.
+
+    Attributes:
+        ttl: seconds a result stays valid. None means forever
+        max_entries: maximum number of results kept
+        hits: results served from the cache, per tool
+        misses: calls that ran the tool, per tool
+        coalesced: calls that awaited an identical call already running, per tool
+        evictions: entries removed because of their TTL or the size limit
+    """
+    def __init__(self,
+                 ttl: Optional[float] = 300,
+                 max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.coalesced: Counter = Counter()
+        self.evictions = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[bool, Any]:
+        """Returns (True, result) if a valid result is cached, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return False, None
+            stored_at, value = entry
+            if self.ttl is not None and self._clock() - stored_at > self.ttl:
+                del self._entries[(namespace, key)]
+                self.evictions += 1
+                return False, None
+            self._entries.move_to_end((namespace, key))
+            return True, value
+
+    def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (self._clock(), value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_run(self, namespace: str, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached result, or awaits run() once for all concurrent identical calls.
+
+        Args:
+            namespace: the tool name
+            key: the canonical form of the validated arguments
+            run: starts the tool call and returns an awaitable of its result
+        """
+        found, value = self.get(namespace, key)
+        if found:
+            self.hits[namespace] += 1
+            logger.debug("(🗃️) Tool cache hit for %s", namespace)
+            return value
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get((namespace, key))
+        while in_flight is not None and in_flight.get_loop() is loop:
+            value = await asyncio.shield(in_flight)
+            if value is not _LEADER_CANCELLED:
+                self.coalesced[namespace] += 1
+                return value
+            in_flight = self._in_flight.get((namespace, key)) # Another follower may have taken over
+
+        self.misses[namespace] += 1
+        future = loop.create_future()
+        future.add_done_callback(lambda finished: finished.cancelled() or finished.exception()) # Nobody may be waiting
+        self._in_flight[(namespace, key)] = future
+        try:
+            value = await run()
+        except asyncio.CancelledError:
+            future.set_result(_LEADER_CANCELLED) # Only the leader was cancelled, not its followers
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._in_flight.get((namespace, key)) is future:
+                del self._in_flight[(namespace, key)]
+        self.set(namespace, key, value)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Returns hit/miss/coalesced counters and hit ratio of one tool, or of every tool if namespace is None."""
+        if namespace is None:
+            hits, misses, coalesced = sum(self.hits.values()), sum(self.misses.values()), sum(self.coalesced.values())
+        else:
+            hits, misses, coalesced = self.hits[namespace], self.misses[namespace], self.coalesced[namespace]
+        lookups = hits + misses + coalesced
+        return {
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_ratio": (hits + coalesced) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
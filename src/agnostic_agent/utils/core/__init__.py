@@ -1,3 +1,9 @@
+from .batching import BatchItemResult, BatchSummary, PromptBatch
+from .compiled_schema import CompiledSchema, compile_schema
+from .context_window import ContextWindowManager
 
-from .function_calling.openai import ToolkitBase, tool, tool_registry
-from .schemas import ExtraResponseSettings
+from .function_calling.openai import ToolkitBase, tool, tool_cache_stats, tool_registry
+from .schemas import (AttachmentMode, ExecutionMode, ExtraResponseSettings, StreamEvent,
+                      StreamEventType, TokenUsage)
+from .session import Session
+from .usage import UsageAggregator, UsageLedger, usage_aggregator_instance
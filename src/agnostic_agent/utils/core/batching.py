@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+from pydantic import BaseModel, ConfigDict
+
+from ..logger import add_context_to_log
+from .schemas import LLMResponse, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItemResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: int
+    message: str
+    response: Optional[LLMResponse] = None
+    error: Optional[BaseException] = None
+    latency: float = 0.0 # Seconds, including retries
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchSummary(BaseModel):
+    n_items: int = 0
+    n_succeeded: int = 0
+    n_failed: int = 0
+    token_usage: TokenUsage = TokenUsage()
+    wall_time: float = 0.0
+    mean_latency: float = 0.0
+    p50_latency: float = 0.0
+    p95_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+class PromptBatch():
+    """Runs the same agent over many messages with bounded concurrency.
+
+    Iterate over it (`async for result in batch`) to receive BatchItemResult objects as
+    they complete, or in input order if ordered=True. At most max_concurrency prompts are
+    in flight at any time, so arbitrarily large inputs never create more than that number
+    of tasks. With ordered=True, results waiting for an earlier item also take a slot, so
+    a slow item holds back at most max_concurrency results. Once iteration finishes, `summary` holds aggregated token usage and latencies.
+
+    Attributes:
+        max_concurrency: maximum number of prompts in flight
+        return_exceptions: if True, failed items are yielded with their error instead of raising
+        ordered: if True, results are yielded in input order instead of completion order
+        retries: extra attempts per item when its prompt raises
+        retry_delay: seconds to wait before the first retry, doubled on every subsequent one
+        summary: aggregated metrics, filled in while iterating
+    """
+    def __init__(self,
+                 prompt_func: Callable[..., Awaitable[LLMResponse]],
+                 messages: Iterable[str],
+                 files_path: Optional[List[str]] = None,
+                 max_concurrency: int = 8,
+                 return_exceptions: bool = False,
+                 ordered: bool = False,
+                 retries: int = 0,
+                 retry_delay: float = 1.0) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._prompt_func = prompt_func
+        self._messages = messages
+        self._files_path = files_path
+        self.max_concurrency = max_concurrency
+        self.return_exceptions = return_exceptions
+        self.ordered = ordered
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.summary = BatchSummary()
+        self._latencies: List[float] = []
+        self._started = False
+
+    def __aiter__(self) -> AsyncIterator[BatchItemResult]:
+        if self._started:
+            raise RuntimeError("A PromptBatch can only be iterated once")
+        self._started = True
+        return self._run()
+
+    async def collect(self) -> List[BatchItemResult]:
+        """Runs the whole batch and returns the results in input order."""
+        results = [result async for result in self]
+        return sorted(results, key=lambda result: result.index)
+
+    async def _run_item(self, index: int, message: str) -> BatchItemResult:
+        result = BatchItemResult(index=index, message=message)
+        starting_time = time.time()
+        with add_context_to_log(batch_index=index):
+            while True:
+                result.attempts += 1
+                try:
+                    result.response = await self._prompt_func(message=message, files_path=self._files_path)
+                    result.error = None
+                    break
+                except Exception as e:
+                    result.error = e
+                    if result.attempts > self.retries:
+                        logger.error(f"(📚) Batch item {index} failed after {result.attempts} attempts: {e}")
+                        break
+                    delay = self.retry_delay * 2 ** (result.attempts - 1)
+                    logger.warning(f"(📚) Batch item {index} failed ({e}). Retrying in {delay}s")
+                    await asyncio.sleep(delay)
+        result.latency = time.time() - starting_time
+        return result
+
+    def _record(self, result: BatchItemResult) -> None:
+        self.summary.n_items += 1
+        if result.ok:
+            self.summary.n_succeeded += 1
+            if result.response.usage:
+                self.summary.token_usage.add(result.response.usage)
+        else:
+            self.summary.n_failed += 1
+        self._latencies.append(result.latency)
+
+    def _finalize_summary(self, starting_time: float) -> None:
+        latencies = sorted(self._latencies)
+        self.summary.wall_time = time.time() - starting_time
+        if latencies:
+            self.summary.mean_latency = sum(latencies) / len(latencies)
+            self.summary.p50_latency = _percentile(latencies, 50)
+            self.summary.p95_latency = _percentile(latencies, 95)
+            self.summary.max_latency = latencies[-1]
+        logger.info(f"(📚) Batch finished: {self.summary.n_succeeded}/{self.summary.n_items} succeeded in "
+                    f"{round(self.summary.wall_time, 2)}s. Tokens: {self.summary.token_usage.total_tokens}. "
+                    f"Latency p50={round(self.summary.p50_latency, 2)}s p95={round(self.summary.p95_latency, 2)}s")
+
+    async def _run(self) -> AsyncIterator[BatchItemResult]:
+        starting_time = time.time()
+        messages = iter(enumerate(self._messages))
+        in_flight: Set[asyncio.Task] = set()
+        buffered: Dict[int, BatchItemResult] = {} # Out-of-order results when ordered=True
+        next_index_to_yield = 0
+        exhausted = False
+        try:
+            while True:
+                # Top up the window of in-flight prompts, without materializing the whole input.
+                # Results buffered behind a slow item count towards the window, which bounds memory
+                while not exhausted and len(in_flight) + len(buffered) < self.max_concurrency:
+                    try:
+                        index, message = next(messages)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight.add(asyncio.create_task(self._run_item(index, message)))
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda finished: finished.result().index):
+                    result = task.result()
+                    self._record(result)
+                    if not result.ok and not self.return_exceptions:
+                        raise result.error
+                    if not self.ordered:
+                        yield result
+                    else:
+                        buffered[result.index] = result
+                while next_index_to_yield in buffered:
+                    yield buffered.pop(next_index_to_yield)
+                    next_index_to_yield += 1
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            self._finalize_summary(starting_time)
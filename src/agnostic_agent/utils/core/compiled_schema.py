@@ -0,0 +1,112 @@
+"""Process-wide cache of the JSON schemas, tool specs and validators derived from pydantic models."""
+import copy
+import threading
+import weakref
+from functools import cached_property
+from typing import Any, Dict, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+
+def to_strict_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a copy of a JSON schema that follows the rules of OpenAI's strict mode.
+
+    Every object (including the ones in $defs) forbids additional properties and lists all its
+    properties as required.
+    """
+    strict_schema = copy.deepcopy(schema)
+    _make_objects_strict(strict_schema)
+    return strict_schema
+
+
+def _make_objects_strict(node: Any) -> None:
+    if isinstance(node, dict):
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            _make_objects_strict(value)
+    elif isinstance(node, list):
+        for item in node:
+            _make_objects_strict(item)
+
+
+class CompiledSchema():
+    """Everything derived from a pydantic model that agents need, computed once per model class.
+
+    The returned dicts are shared by every agent using the model: they must not be mutated.
+
+    Attributes:
+        model: the pydantic model class
+        json_schema: the model's JSON schema (tool parameters)
+        strict_json_schema: the JSON schema normalized for strict mode (structured outputs)
+        validator: a TypeAdapter validating python objects or JSON strings into the model
+    """
+    def __init__(self, model: Type[BaseModel]) -> None:
+        self.model = model
+        self.json_schema = model.model_json_schema()
+        self._tool_specs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    @cached_property
+    def strict_json_schema(self) -> Dict[str, Any]:
+        return to_strict_json_schema(self.json_schema)
+
+    @cached_property
+    def validator(self) -> TypeAdapter:
+        return TypeAdapter(self.model)
+
+    def tool_spec(self, name: str, description: str) -> Dict[str, Any]:
+        """Returns the OpenAI tool definition of a function taking this model as parameters."""
+        spec = self._tool_specs.get((name, description))
+        if spec is None:
+            spec = {
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": description,
+                    "parameters": self.json_schema # contains args type, descriptions and defaults
+                }
+            }
+            self._tool_specs[(name, description)] = spec
+        return spec
+
+    def response_format(self) -> Dict[str, Any]:
+        """Returns the strict json_schema response_format enforcing this model as structured output."""
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": self.model.__name__,
+                "strict": True,
+                "schema": self.strict_json_schema
+            }
+        }
+
+
+COMPILED_SCHEMA_ATTRIBUTE = "__agnostic_agent_compiled_schema__"
+_compiled_models: "weakref.WeakSet[Type[BaseModel]]" = weakref.WeakSet()
+_compiled_schemas_lock = threading.Lock()
+
+
+def compile_schema(model: Type[BaseModel]) -> CompiledSchema:
+    """Returns the CompiledSchema of a model class, building it on first use.
+
+    It is stored on the class itself (subclasses get their own), so models created on the
+    fly don't pile up: their compiled schema goes away with them.
+    """
+    compiled = model.__dict__.get(COMPILED_SCHEMA_ATTRIBUTE)
+    if compiled is None:
+        with _compiled_schemas_lock:
+            compiled = model.__dict__.get(COMPILED_SCHEMA_ATTRIBUTE)
+            if compiled is None:
+                compiled = CompiledSchema(model)
+                type.__setattr__(model, COMPILED_SCHEMA_ATTRIBUTE, compiled)
+                _compiled_models.add(model)
+    return compiled
+
+
+def clear_compiled_schemas() -> None:
+    """Forgets every compiled schema, e.g. after a model class was modified in place."""
+    with _compiled_schemas_lock:
+        for model in list(_compiled_models):
+            type.__delattr__(model, COMPILED_SCHEMA_ATTRIBUTE)
+        _compiled_models.clear()
@@ -0,0 +1,232 @@
+"""Keeps the prompt of long conversations and tool loops within a per-model token budget."""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .tokens import CHARS_PER_TOKEN, estimate_message_tokens, estimate_text_tokens
+
+logger = logging.getLogger(__name__)
+
+TRUNCATE_TOOL_OUTPUTS = "truncate_tool_outputs"
+SUMMARIZE = "summarize"
+DROP_OLD_TURNS = "drop_old_turns"
+STRATEGIES = (TRUNCATE_TOOL_OUTPUTS, SUMMARIZE, DROP_OLD_TURNS)
+
+INSTRUCTION_ROLES = ("system", "developer") # Never compacted
+
+SUMMARY_PROMPT = """
+            Summarize the following conversation between a user, an assistant and its tools.
+            Keep every fact, decision, number and tool result the assistant may still need. Be concise.
+            {previous_summary}
+            Conversation:
+            {conversation}
+            """
+
+
+class ContextWindowManager():
+    """Compacts the messages of a request when their estimated size exceeds a token budget.
+
+    Strategies run in the configured order until the request fits:
+        - truncate_tool_outputs: cuts tool results longer than max_tool_output_tokens, oldest first
+        - summarize: replaces the oldest turns with a summary written by summarizer_agent
+        - drop_old_turns: removes the oldest turns
+
+    Instructions (system/developer messages), the last user message and the latest tool
+    calling round are always kept. An assistant message and its tool results are kept or
+    removed together, so the history stays valid. The caller's messages are never modified:
+    fit returns the compacted copy to send.
+
+    Attributes:
+        max_prompt_tokens: budget of a request (messages + tool schemas)
+        strategies: strategy names, in the order they are applied
+        max_tool_output_tokens: size tool results are truncated to
+        summarizer_agent: anything with an async prompt(message) returning an LLMResponse (e.g. an LLMAgent on a cheap model)
+        max_cached_summaries: summaries kept to be extended incrementally instead of rewritten
+    """
+    def __init__(self,
+                 max_prompt_tokens: int,
+                 strategies: Sequence[str] = (TRUNCATE_TOOL_OUTPUTS, DROP_OLD_TURNS),
+                 max_tool_output_tokens: int = 2_000,
+                 summarizer_agent: Optional[Any] = None,
+                 max_cached_summaries: int = 32) -> None:
+        unknown_strategies = set(strategies) - set(STRATEGIES)
+        if unknown_strategies:
+            raise ValueError(f"Unknown context window strategies: {sorted(unknown_strategies)}")
+        self.max_prompt_tokens = max_prompt_tokens
+        self.strategies = list(strategies)
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.summarizer_agent = summarizer_agent
+        self.max_cached_summaries = max_cached_summaries
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self.n_of_compactions = 0
+        self.n_of_truncated_tool_outputs = 0
+        self.n_of_dropped_messages = 0
+        self.n_of_summaries = 0
+
+    @classmethod
+    def from_config(cls,
+                    model_name: str,
+                    context_window_config: Optional[Dict[str, Any]],
+                    summarizer_agent: Optional[Any] = None) -> Optional["ContextWindowManager"]:
+        """Builds the manager of a model from the context_window section of config.yaml, or None if disabled."""
+        config = context_window_config or {}
+        if not config.get("enabled", False):
+            return None
+        max_prompt_tokens = (config.get("models") or {}).get(model_name) or config.get("default_max_prompt_tokens")
+        if not max_prompt_tokens:
+            return None
+        return cls(max_prompt_tokens=max_prompt_tokens,
+                   strategies=config.get("strategies") or (TRUNCATE_TOOL_OUTPUTS, DROP_OLD_TURNS),
+                   max_tool_output_tokens=config.get("max_tool_output_tokens", 2_000),
+                   summarizer_agent=summarizer_agent)
+
+    async def fit(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Returns messages, compacted if needed to fit max_prompt_tokens."""
+        budget = self.max_prompt_tokens - (estimate_text_tokens(json.dumps(tools)) if tools else 0)
+        token_counts = [estimate_message_tokens(message) for message in messages]
+        total_tokens = sum(token_counts)
+        if total_tokens <= budget:
+            return messages
+
+        logger.info(f"(🗜️) Prompt estimated at {total_tokens} tokens, over the {budget} token budget. Compacting")
+        self.n_of_compactions += 1
+        messages, token_counts = list(messages), list(token_counts)
+        for strategy in self.strategies:
+            if strategy == TRUNCATE_TOOL_OUTPUTS:
+                self._truncate_tool_outputs(messages, token_counts, budget)
+            elif strategy == SUMMARIZE:
+                messages, token_counts = await self._summarize_old_turns(messages, token_counts, budget)
+            elif strategy == DROP_OLD_TURNS:
+                messages, token_counts = self._drop_old_turns(messages, token_counts, budget)
+            if sum(token_counts) <= budget:
+                break
+        else:
+            logger.warning(f"(🗜️) Prompt still estimated at {sum(token_counts)} tokens after compaction (budget: {budget})")
+        logger.debug(f"(🗜️) Prompt compacted from {total_tokens} to {sum(token_counts)} tokens")
+        return messages
+
+    def _truncate_tool_outputs(self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int) -> None:
+        max_chars = self.max_tool_output_tokens * CHARS_PER_TOKEN
+        for i, message in enumerate(messages):
+            if sum(token_counts) <= budget:
+                return
+            content = message.get("content")
+            if message.get("role") != "tool" or not isinstance(content, str) or len(content) <= max_chars:
+                continue
+            truncated_content = f"{content[:max_chars]}\n[... {len(content) - max_chars} characters truncated]"
+            messages[i] = {**message, "content": truncated_content}
+            token_counts[i] = estimate_message_tokens(messages[i])
+            self.n_of_truncated_tool_outputs += 1
+
+    @staticmethod
+    def _compactable_units(messages: List[Dict[str, Any]]) -> List[List[int]]:
+        """Indexes of the messages that can be compacted, grouped in units removed together, oldest first.
+
+        Turns before the last user message are a unit each (user message + answer + tool
+        rounds). After it, each tool calling round (assistant message + tool results) is a
+        unit, except the latest one.
+        """
+        last_user_index = max((i for i, message in enumerate(messages) if message.get("role") == "user"), default=-1)
+        units, current_unit = [], None
+        for i, message in enumerate(messages):
+            role = message.get("role")
+            if role in INSTRUCTION_ROLES or i == last_user_index:
+                current_unit = None if i == last_user_index else current_unit
+                continue
+            starts_unit = role == "user" if i < last_user_index else role == "assistant"
+            if starts_unit or current_unit is None:
+                current_unit = []
+                units.append(current_unit)
+            current_unit.append(i)
+        if units and units[-1][0] > last_user_index:
+            units.pop() # The round the model is answering to
+        return units
+
+    @staticmethod
+    def _units_to_fit(units: List[List[int]], token_counts: List[int], budget: int, replacement_tokens: int = 0) -> List[List[int]]:
+        """Oldest units whose removal (plus a replacement message) brings the request under budget."""
+        excess = sum(token_counts) + replacement_tokens - budget
+        selected = []
+        for unit in units:
+            if excess <= 0:
+                break
+            selected.append(unit)
+            excess -= sum(token_counts[i] for i in unit)
+        return selected
+
+    @staticmethod
+    def _replace(messages: List[Dict[str, Any]],
+                 token_counts: List[int],
+                 indexes: List[int],
+                 replacement: Optional[Dict[str, Any]]):
+        removed = set(indexes)
+        new_messages, new_token_counts = [], []
+        for i, message in enumerate(messages):
+            if i == indexes[0] and replacement:
+                new_messages.append(replacement)
+                new_token_counts.append(estimate_message_tokens(replacement))
+            if i not in removed:
+                new_messages.append(message)
+                new_token_counts.append(token_counts[i])
+        return new_messages, new_token_counts
+
+    def _drop_old_turns(self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int):
+        notice = {"role": "developer", "content": "[Earlier messages were omitted to fit the context window]"}
+        units = self._units_to_fit(self._compactable_units(messages), token_counts, budget,
+                                   replacement_tokens=estimate_message_tokens(notice))
+        if not units:
+            return messages, token_counts
+        indexes = [i for unit in units for i in unit]
+        self.n_of_dropped_messages += len(indexes)
+        logger.debug(f"(🗜️) Dropping {len(indexes)} old messages")
+        return self._replace(messages, token_counts, indexes, replacement=notice)
+
+    async def _summarize_old_turns(self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int):
+        if self.summarizer_agent is None:
+            logger.debug("(🗜️) No summarizer_agent configured, skipping the summarize strategy")
+            return messages, token_counts
+        expected_summary_tokens = self.max_tool_output_tokens # Rough upper bound of a summary
+        units = self._units_to_fit(self._compactable_units(messages), token_counts, budget,
+                                   replacement_tokens=expected_summary_tokens)
+        if not units:
+            return messages, token_counts
+        summary = await self._summary_of([[messages[i] for i in unit] for unit in units])
+        indexes = [i for unit in units for i in unit]
+        replacement = {"role": "developer", "content": f"Summary of the earlier conversation:\n{summary}"}
+        return self._replace(messages, token_counts, indexes, replacement=replacement)
+
+    @staticmethod
+    def _unit_keys(units: List[List[Dict[str, Any]]]) -> List[str]:
+        """Rolling hash identifying every prefix of a sequence of units."""
+        keys, digest = [], hashlib.sha256()
+        for unit in units:
+            digest.update(json.dumps(unit, sort_keys=True, default=str).encode("utf-8"))
+            keys.append(digest.copy().hexdigest())
+        return keys
+
+    async def _summary_of(self, units: List[List[Dict[str, Any]]]) -> str:
+        """Summarizes units, extending the summary of the longest already summarized prefix if any."""
+        keys = self._unit_keys(units)
+        if keys[-1] in self._summaries:
+            self._summaries.move_to_end(keys[-1])
+            return self._summaries[keys[-1]]
+
+        previous_summary, start = None, 0
+        for n_of_units in range(len(keys) - 1, 0, -1):
+            if keys[n_of_units - 1] in self._summaries:
+                previous_summary, start = self._summaries[keys[n_of_units - 1]], n_of_units
+                break
+
+        conversation = "\n".join(json.dumps(message, default=str) for unit in units[start:] for message in unit)
+        response = await self.summarizer_agent.prompt(
+            SUMMARY_PROMPT.format(previous_summary=f"Summary of what came before:\n{previous_summary}" if previous_summary else "",
+                                  conversation=conversation)
+        )
+        summary = response.final_text_response
+        self.n_of_summaries += 1
+        self._summaries[keys[-1]] = summary
+        if len(self._summaries) > self.max_cached_summaries:
+            self._summaries.popitem(last=False)
+        return summary
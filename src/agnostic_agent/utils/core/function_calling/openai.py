@@ -1,8 +1,12 @@
 import inspect
 import logging
-from typing import Any, Dict, List, Type
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
 
-from ..schemas import ToolSpec
+from ..compiled_schema import compile_schema
+from ..schemas import ExecutionMode, ToolSpec
+
+if TYPE_CHECKING:
+    from ...caching.tool_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +20,9 @@ class RegisteredTool():
         name: name of the callable method
         description: docstring of the method
         is_coroutine: defines if the given callable is async or not
+        execution_mode: where a sync callable runs (process, thread, inline). None uses the executor's default
+        cache: TTLCache memoizing the results, or None
+        compiled_schema: JSON schema, tool spec and validator of func_schema, shared process-wide
         parameters_schema: extract the json schema out of the Pydantic model
     
     """
@@ -30,7 +37,20 @@ class RegisteredTool():
         self.name = function_as_tool.func.__name__
         self.description = function_as_tool.func.__doc__.strip() if function_as_tool.func.__doc__ else "No description provided."
         self.is_coroutine = function_as_tool.is_coroutine
-        self.parameters_schema = self.func_schema.model_json_schema()
+        self.execution_mode = function_as_tool.execution_mode
+        self.cache = function_as_tool.cache
+        self.compiled_schema = compile_schema(self.func_schema)
+        self.parameters_schema = self.compiled_schema.json_schema
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["cache"] = None # Sync tools are pickled to worker processes, the cache stays in this one
+        state["compiled_schema"] = None # Workers validate through func_schema
+        return state
+
+    def cache_key(self, kwargs: Dict[str, Any]) -> str:
+        """Canonical form of the validated arguments, so equivalent calls share their cached result."""
+        return self.func_schema.model_validate(kwargs).model_dump_json()
      
     def schematize(self) -> Dict:
          """Automatically fills in the expected schema for OpenAI tool calling
@@ -41,14 +61,7 @@ class RegisteredTool():
          Returns:
             A dic mapping a function callable to its name, description and paramteres schema
          """
-         return {
-              "type": "function",
-              "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": self.parameters_schema # contains args type, descriptions and defaults
-              }
-         }
+         return self.compiled_schema.tool_spec(name=self.name, description=self.description)
     
     def _execute_sync(self, **kwargs) -> Any:
         """Executes a given method in synchronous manner.
@@ -140,23 +153,34 @@ class FunctionalToolkit:
             List of all the functions' schemas 
         """
         if not self._tools_schemas_cache:
-            for function_tool in self.tools.values():
+            # Sorted by name so the schemas (part of the cacheable prompt prefix) never change order
+            for _, function_tool in sorted(self.tools.items()):
                 self._tools_schemas_cache.append(function_tool.schematize())
         return self._tools_schemas_cache
     
 tool_registry: Dict[str, ToolSpec] = {}
-def tool(schema):
+def tool(schema, execution: Optional[Union[ExecutionMode, str]] = None, cache: Optional["TTLCache"] = None):
     """Decorator that write tos a variable for registering methods automatically.
 
     Args:
         schema: Pydantic model defining args with datatype, default and descriptions
+        execution: where a sync tool runs ("process", "thread" or "inline"). Ignored for
+            async tools. Defaults to the shared executor's default_mode
+        cache: memoizes results keyed on the validated arguments, e.g. cache=TTLCache(ttl=60).
+            Only for tools without side effects. Defaults to None (every call runs)
     """
     def decorator(func: callable):
         is_coroutine = inspect.iscoroutinefunction(func)
-        tool_registry[func.__name__] = ToolSpec(func=func, func_schema=schema, is_coroutine=is_coroutine)
+        execution_mode = ExecutionMode(execution) if execution else None
+        tool_registry[func.__name__] = ToolSpec(func=func, func_schema=schema, is_coroutine=is_coroutine,
+                                                execution_mode=execution_mode, cache=cache)
         return func
     return decorator
 
+def tool_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns the cache stats (hits, misses, coalesced calls...) of every registered tool declared with a cache."""
+    return {name: spec.cache.stats(name) for name, spec in tool_registry.items() if spec.cache is not None}
+
 class ToolkitBase():
     """Base class for toolkits. Provides utility to extract tool names from the class.
     """
@@ -7,15 +7,63 @@ from pydantic import BaseModel
 from agnostic_agent.config.config import CONFIG_DICT
 
 
+class ExecutionMode(str, Enum):
+    """Where a sync tool is run: a worker process, a worker thread or the caller itself.
+
+    Inline tools run on the event loop thread and block it while they run. Use it only for trivial tools.
+    """
+    PROCESS = "process"
+    THREAD = "thread"
+    INLINE = "inline"
+
+class AttachmentMode(str, Enum):
+    """How PDF attachments are sent: uploaded whole, as locally extracted text, or as text when they have a text layer."""
+    UPLOAD = "upload"
+    EXTRACT_TEXT = "extract_text"
+    AUTO = "auto"
+
 class ToolSpec(BaseModel):
       func: Callable
       func_schema: Type[BaseModel]
       is_coroutine: bool
+      execution_mode: Optional[ExecutionMode] = None # None falls back to config's default_mode
+      cache: Optional[Any] = None # TTLCache memoizing the results. None runs every call
+
+class TokenUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+    def add(self, token_usage: Any) -> None:
+        """Adds the counts of another TokenUsage or of an OpenAI CompletionUsage."""
+        self.prompt_tokens += getattr(token_usage, 'prompt_tokens', 0) or 0
+        self.completion_tokens += getattr(token_usage, 'completion_tokens', 0) or 0
+        self.total_tokens += getattr(token_usage, 'total_tokens', 0) or 0
 
 class LLMResponse(BaseModel):
     final_text_response: str
     parsed_response: Optional[Any] = None
     reasoning: Optional[Any] = None
+    usage: Optional[TokenUsage] = None
+    number_of_interactions: int = 0
+    model_time: float = 0.0 # Seconds waiting for completions
+    tool_time: float = 0.0 # Seconds waiting for tools
+    cached: bool = False
+
+class StreamEventType(str, Enum):
+    TEXT = "text" # Text delta
+    REASONING = "reasoning" # Reasoning delta
+    TOOL_CALL_DELTA = "tool_call_delta" # Fragment of a tool call's arguments
+    TOOL_CALL = "tool_call" # Tool call fully received, execution has started
+    TOOL_RESULT = "tool_result" # Output of an executed tool
+    FINAL = "final" # End of the stream, carries the full LLMResponse
+
+class StreamEvent(BaseModel):
+    type: StreamEventType
+    content: Optional[str] = None
+    tool_call_id: Optional[str] = None
+    tool_name: Optional[str] = None
+    response: Optional[LLMResponse] = None
 
 extra_response_config = CONFIG_DICT["AI_agent"]["extra_response_settings"]
 
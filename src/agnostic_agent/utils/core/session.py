@@ -0,0 +1,111 @@
+import json
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL_HINT = {"type": "ephemeral"} # Prompt caching breakpoint understood by OpenRouter (Anthropic, Gemini)
+
+
+class Session():
+    """Message history of a multi-turn conversation, kept across prompts.
+
+    The history is append-only: it starts with a stable prefix (system and developer
+    instructions) written once by the provider, followed by the user, assistant and tool
+    messages of every finished turn. Since earlier messages never change, every prompt
+    re-sends a byte-identical prefix, which backends with prefix caching serve from cache.
+
+    A prompt only commits its messages once it succeeds, so failed or retried prompts
+    leave the session untouched.
+
+    Attributes:
+        session_id: identifier of the conversation
+        prompt_caching_hints: if True, the prefix is marked with a cache_control breakpoint
+    """
+    def __init__(self,
+                 session_id: Optional[str] = None,
+                 messages: Optional[List[Dict[str, Any]]] = None,
+                 prefix_length: int = 0,
+                 prompt_caching_hints: bool = False) -> None:
+        self.session_id = session_id or uuid.uuid4().hex
+        self.prompt_caching_hints = prompt_caching_hints
+        self._messages: List[Dict[str, Any]] = list(messages or [])
+        self._prefix_length = prefix_length
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """A copy of the history, safe to extend with the messages of a new turn."""
+        return list(self._messages)
+
+    @property
+    def prefix(self) -> List[Dict[str, Any]]:
+        return self._messages[:self._prefix_length]
+
+    @property
+    def has_prefix(self) -> bool:
+        return self._prefix_length > 0
+
+    def set_prefix(self, messages: List[Dict[str, Any]]) -> None:
+        """Writes the stable instructions the conversation starts with. Only allowed once, on an empty session."""
+        if self._messages:
+            raise RuntimeError(f"Session {self.session_id} already has messages, its prefix can't change")
+        if self.prompt_caching_hints and messages:
+            messages = messages[:-1] + [self._with_cache_breakpoint(messages[-1])]
+        self._messages = list(messages)
+        self._prefix_length = len(messages)
+
+    @staticmethod
+    def _with_cache_breakpoint(message: Dict[str, Any]) -> Dict[str, Any]:
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        content = [dict(part) for part in content]
+        content[-1]["cache_control"] = CACHE_CONTROL_HINT
+        return {**message, "content": content}
+
+    def extend(self, messages: List[Dict[str, Any]], expected_length: Optional[int] = None) -> None:
+        """Appends the messages of a finished turn.
+
+        Args:
+            messages: new messages, in order
+            expected_length: length of the history the turn was built on. If another turn
+                was committed in between, a RuntimeError is raised instead of interleaving them
+        """
+        if expected_length is not None and expected_length != len(self._messages):
+            raise RuntimeError(f"Session {self.session_id} changed while a prompt was running. "
+                               "Concurrent prompts must use different sessions")
+        self._messages.extend(messages)
+        logger.debug(f"(💬) Session {self.session_id} has {len(self._messages)} messages")
+
+    def append(self, message: Dict[str, Any]) -> None:
+        self.extend([message])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "prompt_caching_hints": self.prompt_caching_hints,
+            "prefix_length": self._prefix_length,
+            "messages": self._messages,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Session":
+        return cls(session_id=data["session_id"],
+                   messages=data["messages"],
+                   prefix_length=data.get("prefix_length", 0),
+                   prompt_caching_hints=data.get("prompt_caching_hints", False))
+
+    def save(self, path: str) -> None:
+        """Writes the session to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "Session":
+        """Resumes a session previously written with save."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._messages)
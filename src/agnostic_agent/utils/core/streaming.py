@@ -0,0 +1,116 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PartialToolCall():
+    """Tool call being rebuilt from streamed fragments.
+
+    Attributes:
+        index: position of the tool call inside the assistant message
+        id: identifier assigned by the provider (sent in the first fragment)
+        name: name of the function to call (sent in the first fragment)
+        arguments: JSON-encoded arguments accumulated so far
+        is_complete: True once the arguments form a full JSON object or the stream moved on
+    """
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.id: Optional[str] = None
+        self.name: str = ""
+        self.arguments: str = ""
+        self.is_complete = False
+
+    def add_fragment(self, fragment: Any) -> None:
+        """Merges a ChoiceDeltaToolCall fragment into the partial call."""
+        if getattr(fragment, "id", None):
+            self.id = fragment.id
+        function = getattr(fragment, "function", None)
+        if function is not None:
+            if getattr(function, "name", None):
+                self.name += function.name
+            if getattr(function, "arguments", None):
+                self.arguments += function.arguments
+
+    def arguments_are_complete(self) -> bool:
+        """Checks whether the accumulated arguments already form a full JSON object.
+
+        Parsing is only attempted when the buffer ends with a closing brace, which keeps
+        the check cheap for long argument strings streamed in many fragments.
+        """
+        if not self.name or not self.arguments.rstrip().endswith("}"):
+            return False
+        try:
+            json.loads(self.arguments)
+            return True
+        except json.JSONDecodeError:
+            return False
+
+    def to_message_dict(self) -> Dict[str, Any]:
+        """Returns the tool call in the format expected inside an assistant message."""
+        return {
+            "id": self.id or f"call_{self.index}",
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "arguments": self.arguments or "{}"
+            }
+        }
+
+
+class ToolCallAssembler():
+    """Rebuilds tool calls from the fragments of a streamed chat completion.
+
+    A tool call is handed out as soon as its arguments are complete, so it can start
+    executing while the model is still streaming the rest of the response.
+
+    Attributes:
+        calls: partial tool calls indexed by their position in the assistant message
+    """
+    def __init__(self) -> None:
+        self.calls: Dict[int, PartialToolCall] = {}
+
+    def add(self, fragments: Optional[List[Any]]) -> List[PartialToolCall]:
+        """Merges the tool call fragments of a single chunk.
+
+        Args:
+            fragments: `delta.tool_calls` of a streamed chunk
+
+        Returns:
+            Tool calls that became complete with this chunk
+        """
+        completed = []
+        for fragment in fragments or []:
+            index = getattr(fragment, "index", None)
+            if index is None:
+                index = len(self.calls)
+            if index not in self.calls:
+                # A new tool call starting means every previous one has been fully sent
+                completed.extend(self._complete(call for call in self.calls.values() if call.index < index))
+                self.calls[index] = PartialToolCall(index=index)
+            call = self.calls[index]
+            call.add_fragment(fragment)
+            if not call.is_complete and call.arguments_are_complete():
+                completed.extend(self._complete([call]))
+        return completed
+
+    def flush(self) -> List[PartialToolCall]:
+        """Marks every remaining tool call as complete. To be called once the stream ends.
+
+        Returns:
+            Tool calls that weren't complete yet
+        """
+        return self._complete(self.calls.values())
+
+    def to_message_dicts(self) -> List[Dict[str, Any]]:
+        """Returns all assembled tool calls, ordered by index, in assistant message format."""
+        return [self.calls[index].to_message_dict() for index in sorted(self.calls)]
+
+    def _complete(self, calls) -> List[PartialToolCall]:
+        completed = []
+        for call in calls:
+            if not call.is_complete:
+                call.is_complete = True
+                completed.append(call)
+        return completed
@@ -0,0 +1,42 @@
+"""Cheap token estimates, used where an exact tokenizer isn't available or worth the cost."""
+import json
+from typing import Any, Dict, List, Optional
+
+CHARS_PER_TOKEN = 4
+ATTACHMENT_TOKEN_ESTIMATE = 1_000 # Flat estimate for an image or file part
+MESSAGE_OVERHEAD_TOKENS = 4 # Role, separators, etc.
+
+
+def estimate_text_tokens(text: Optional[str]) -> int:
+    """Estimates the number of tokens of a piece of text (~4 characters per token)."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Estimates the number of tokens a chat message adds to the prompt.
+
+    Text is estimated from its length. Image and file parts get a flat estimate, since
+    their base64 payload says little about what the provider bills for them.
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens += estimate_text_tokens(content)
+    elif isinstance(content, list):
+        for part in content:
+            if part.get("type") == "text":
+                tokens += estimate_text_tokens(part.get("text"))
+            else:
+                tokens += ATTACHMENT_TOKEN_ESTIMATE
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function", {})
+        tokens += estimate_text_tokens(function.get("name")) + estimate_text_tokens(function.get("arguments"))
+    return tokens
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Estimates the prompt tokens of a completion request (messages + tool schemas)."""
+    tokens = sum(estimate_message_tokens(message) for message in messages)
+    if tools:
+        tokens += estimate_text_tokens(json.dumps(tools))
+    return tokens
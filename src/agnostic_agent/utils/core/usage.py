@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+from .schemas import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+
+class UsageLedger():
+    """Token usage and tool-calling interactions of a single prompt.
+
+    A new ledger is created for every prompt, so concurrent prompts (even on the same
+    agent) never share counters.
+
+    Attributes:
+        agent_name: name of the agent issuing the prompt
+        model_name: model the prompt is sent to
+        token_usage: tokens consumed by every completion of the prompt
+        number_of_completions: completions requested to the LLM
+        number_of_interactions: tool-calling rounds executed
+        starting_time: time the prompt started
+        model_time: seconds spent waiting for completions
+        tool_time: seconds spent waiting for tools
+        round_timings: model and tool time of every tool-calling round
+    """
+    def __init__(self, agent_name: str, model_name: str) -> None:
+        self.agent_name = agent_name
+        self.model_name = model_name
+        self.token_usage = TokenUsage()
+        self.number_of_completions = 0
+        self.number_of_interactions = 0
+        self.starting_time = time.time()
+        self.model_time = 0.0
+        self.tool_time = 0.0
+        self.round_timings: List[Dict[str, float]] = []
+
+    def record_completion(self, token_usage: Any) -> None:
+        """Adds the usage reported by a completion (ChatCompletion.usage, may be None)."""
+        self.number_of_completions += 1
+        if token_usage:
+            self.token_usage.add(token_usage)
+
+    def record_interaction(self) -> int:
+        """Counts a new tool-calling round and returns the updated count."""
+        self.number_of_interactions += 1
+        return self.number_of_interactions
+
+    def record_model_time(self, seconds: float) -> None:
+        self.model_time += seconds
+
+    def record_round(self, model_time: float, tool_time: float) -> None:
+        """Records the split of a tool-calling round: tools first, then the completion using their results."""
+        self.model_time += model_time
+        self.tool_time += tool_time
+        self.round_timings.append({"model_time": model_time, "tool_time": tool_time})
+
+    def elapsed_time(self) -> float:
+        return time.time() - self.starting_time
+
+
+class UsageAggregator():
+    """Process-wide usage totals, broken down per agent.
+
+    Finished ledgers are merged under a lock, so it can be fed from any number of
+    concurrent prompts, event loops or threads.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._total = TokenUsage()
+        self._per_agent: Dict[str, TokenUsage] = {}
+        self._number_of_prompts = 0
+        self._number_of_interactions = 0
+
+    def merge(self, ledger: UsageLedger) -> None:
+        """Adds a finished prompt's ledger to the process-wide totals."""
+        with self._lock:
+            self._total.add(ledger.token_usage)
+            self._per_agent.setdefault(ledger.agent_name, TokenUsage()).add(ledger.token_usage)
+            self._number_of_prompts += 1
+            self._number_of_interactions += ledger.number_of_interactions
+
+    def total(self) -> TokenUsage:
+        """Returns a snapshot of the token usage of every prompt in the process."""
+        with self._lock:
+            return self._total.model_copy()
+
+    def per_agent(self) -> Dict[str, TokenUsage]:
+        """Returns a snapshot of the token usage per agent name."""
+        with self._lock:
+            return {agent_name: usage.model_copy() for agent_name, usage in self._per_agent.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns totals, number of prompts and number of tool-calling interactions."""
+        with self._lock:
+            return {
+                "token_usage": self._total.model_dump(),
+                "number_of_prompts": self._number_of_prompts,
+                "number_of_interactions": self._number_of_interactions,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._total = TokenUsage()
+            self._per_agent = {}
+            self._number_of_prompts = 0
+            self._number_of_interactions = 0
+
+
+usage_aggregator_instance = UsageAggregator()
@@ -0,0 +1 @@
+from .tool_executor import ToolExecutor, tool_executor_instance
@@ -0,0 +1,197 @@
+"""Long-lived executors shared by every agent for running sync tools."""
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Union
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+from ..core.schemas import ExecutionMode
+
+logger = logging.getLogger(__name__)
+
+
+def _noop() -> None:
+    """Trivial task used to force workers to spawn ahead of the first tool call."""
+    return None
+
+
+class ToolExecutor:
+    """Owns the process and thread pools used to run sync tools.
+
+    Pools are created lazily on first use and reused across agents and tool-calling
+    rounds, so a round only pays for pickling the arguments instead of spawning a
+    fresh set of interpreters.
+
+    Attributes:
+        default_mode: execution mode used by tools that don't declare one
+        process_pool_size: maximum number of worker processes
+        thread_pool_size: maximum number of worker threads
+        warm_up_on_start: if True, workers are spawned as soon as a pool is created
+    """
+    def __init__(self,
+                 default_mode: Union[ExecutionMode, str] = ExecutionMode.PROCESS,
+                 process_pool_size: Optional[int] = None,
+                 thread_pool_size: Optional[int] = None,
+                 warm_up_on_start: bool = False) -> None:
+        self.default_mode = ExecutionMode(default_mode)
+        self.process_pool_size = process_pool_size
+        self.thread_pool_size = thread_pool_size
+        self.warm_up_on_start = warm_up_on_start
+        self.max_workers: Dict[ExecutionMode, int] = {} # Resolved size of each running pool
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._thread_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._shutdown_registered = False
+
+    def configure(self,
+                  default_mode: Optional[Union[ExecutionMode, str]] = None,
+                  process_pool_size: Optional[int] = None,
+                  thread_pool_size: Optional[int] = None) -> None:
+        """Changes the executor settings. Running pools are shut down and rebuilt on next use.
+
+        Args:
+            default_mode: execution mode for tools that don't declare one
+            process_pool_size: maximum number of worker processes
+            thread_pool_size: maximum number of worker threads
+        """
+        if default_mode is not None:
+            self.default_mode = ExecutionMode(default_mode)
+        if process_pool_size is not None or thread_pool_size is not None:
+            self.shutdown(wait=True)
+            self.process_pool_size = process_pool_size or self.process_pool_size
+            self.thread_pool_size = thread_pool_size or self.thread_pool_size
+
+    def get_pool(self, mode: Union[ExecutionMode, str]) -> concurrent.futures.Executor:
+        """Returns the shared pool for the given mode, creating it if needed.
+
+        Args:
+            mode: either ExecutionMode.PROCESS or ExecutionMode.THREAD
+
+        Returns:
+            The long-lived executor for that mode
+
+        Raises:
+            ValueError: if mode is ExecutionMode.INLINE, which has no pool
+        """
+        mode = ExecutionMode(mode)
+        with self._lock:
+            if mode == ExecutionMode.PROCESS:
+                if self._process_pool is None:
+                    max_workers = self.process_pool_size or os.cpu_count() or 1
+                    self._process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+                    self._on_pool_created(mode, self._process_pool, max_workers)
+                return self._process_pool
+            elif mode == ExecutionMode.THREAD:
+                if self._thread_pool is None:
+                    max_workers = self.thread_pool_size or min(32, (os.cpu_count() or 1) + 4) # ThreadPoolExecutor's default
+                    self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                                              thread_name_prefix="agnostic_agent_tool")
+                    self._on_pool_created(mode, self._thread_pool, max_workers)
+                return self._thread_pool
+            else:
+                raise ValueError(f"Execution mode '{mode.value}' has no pool")
+
+    def _on_pool_created(self, mode: ExecutionMode, pool: concurrent.futures.Executor, n_workers: int) -> None:
+        """Registers the shutdown hook and optionally spawns all workers upfront."""
+        self.max_workers[mode] = n_workers
+        logger.debug(f"(🏭) Started {mode.value} pool with max_workers={n_workers}")
+        if not self._shutdown_registered:
+            atexit.register(self.shutdown)
+            self._shutdown_registered = True
+        if self.warm_up_on_start:
+            for _ in range(n_workers):
+                pool.submit(_noop)
+
+    def warm_up(self, mode: Optional[Union[ExecutionMode, str]] = None) -> None:
+        """Spawns every worker of a pool and blocks until they are ready. Don't call it from a coroutine.
+
+        Args:
+            mode: pool to warm up. Defaults to the executor's default_mode
+        """
+        mode = ExecutionMode(mode or self.default_mode)
+        if mode == ExecutionMode.INLINE:
+            return
+        pool = self.get_pool(mode)
+        concurrent.futures.wait([pool.submit(_noop) for _ in range(self.max_workers[mode])])
+
+    def submit(self,
+               func: Callable,
+               kwargs: Optional[Dict[str, Any]] = None,
+               execution_mode: Optional[Union[ExecutionMode, str]] = None) -> concurrent.futures.Future:
+        """Schedules func(**kwargs) according to its execution mode.
+
+        Args:
+            func: the callable to run. Must be picklable for ExecutionMode.PROCESS
+            kwargs: keyword arguments passed to func
+            execution_mode: where to run func. Defaults to the executor's default_mode
+
+        Returns:
+            A future holding the result. Inline calls return an already-resolved future
+        """
+        kwargs = kwargs or {}
+        mode = ExecutionMode(execution_mode or self.default_mode)
+        if mode == ExecutionMode.INLINE:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(func(**kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        try:
+            return self.get_pool(mode).submit(func, **kwargs)
+        except BrokenProcessPool:
+            logger.warning("(🏭) Process pool is broken (a worker died). Rebuilding it")
+            with self._lock:
+                broken_pool, self._process_pool = self._process_pool, None
+            if broken_pool is not None:
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+            return self.get_pool(mode).submit(func, **kwargs)
+
+    def submit_async(self,
+                     func: Callable,
+                     kwargs: Optional[Dict[str, Any]] = None,
+                     execution_mode: Optional[Union[ExecutionMode, str]] = None) -> asyncio.Future:
+        """Like submit, but returns a future of the running event loop.
+
+        Awaiting it suspends only the calling coroutine, so sync work in the pools overlaps
+        with every other coroutine of the loop. Cancelling it cancels the work if it hasn't
+        started yet.
+        """
+        return asyncio.wrap_future(self.submit(func, kwargs=kwargs, execution_mode=execution_mode))
+
+    async def run(self,
+                  func: Callable,
+                  kwargs: Optional[Dict[str, Any]] = None,
+                  execution_mode: Optional[Union[ExecutionMode, str]] = None) -> Any:
+        """Runs func(**kwargs) according to its execution mode and returns its result, without blocking the event loop."""
+        return await self.submit_async(func, kwargs=kwargs, execution_mode=execution_mode)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops all pools. They are recreated transparently if a tool runs afterwards.
+
+        Args:
+            wait: if True, block until running tools have finished
+        """
+        with self._lock:
+            process_pool, self._process_pool = self._process_pool, None
+            thread_pool, self._thread_pool = self._thread_pool, None
+            self.max_workers.clear()
+        for pool in (process_pool, thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+
+tool_execution_config = CONFIG_DICT.get("tool_execution", {})
+
+tool_executor_instance = ToolExecutor(
+    default_mode=tool_execution_config.get("default_mode", ExecutionMode.PROCESS),
+    process_pool_size=tool_execution_config.get("process_pool_size"),
+    thread_pool_size=tool_execution_config.get("thread_pool_size"),
+    warm_up_on_start=tool_execution_config.get("warm_up", False),
+)
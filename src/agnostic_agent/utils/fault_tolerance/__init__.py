@@ -1 +1,7 @@
-from .exception_retry_controller import exception_controller_executor_instance
\ No newline at end of file
+from .circuit_breaker import (CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError,
+                              CircuitState, circuit_breaker_registry)
+from .exception_retry_controller import (ExceptionRetryController, RetryMetrics,
+                                         exception_controller_executor_instance)
+from .rate_limiter import RateLimiter, RateLimiterRegistry, rate_limiter_registry
+from .retry_policies import (DecorrelatedJitterPolicy, ExponentialBackoffPolicy,
+                             FixedDelayPolicy, RetryAfterPolicy, RetryPolicy)
@@ -0,0 +1,136 @@
+"""Per-backend circuit breakers that shed load quickly during an outage and recover automatically."""
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed" # Calls go through
+    OPEN = "open" # Calls fail fast
+    HALF_OPEN = "half_open" # A few probe calls go through to check if the backend recovered
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"Circuit for '{name}' is open. Next probe allowed in {round(retry_in, 2)}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker():
+    """Tracks consecutive failures of a backend.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail fast with
+    CircuitOpenError. Once recovery_timeout has elapsed, up to half_open_max_calls probe
+    calls are let through: a success closes the circuit, a failure opens it again.
+
+    Attributes:
+        name: what the breaker protects (e.g. the backend name)
+        failure_threshold: consecutive failures that open the circuit
+        recovery_timeout: seconds the circuit stays open before probing
+        half_open_max_calls: probe calls allowed concurrently while half-open
+        n_of_rejected_calls: calls that failed fast because the circuit was open
+    """
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.n_of_rejected_calls = 0
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"(🔌) Circuit for '{self.name}' is half-open. Probing backend")
+        return self._state
+
+    def before_call(self) -> bool:
+        """Lets a call through or raises CircuitOpenError.
+
+        Returns:
+            True if the call is a half-open probe. Its slot is given back by record_success,
+            record_failure or, if the call ends without an outcome (e.g. cancelled), release_probe
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return False
+            if state == CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            self.n_of_rejected_calls += 1
+            retry_in = max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+            raise CircuitOpenError(name=self.name, retry_in=retry_in)
+
+    def record_success(self) -> None:
+        """The backend answered (even with a non-retryable error): the circuit closes."""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"(🔌) Circuit for '{self.name}' closed. Backend recovered")
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def release_probe(self) -> None:
+        """Gives back the slot of a probe call that ended without telling if the backend recovered."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_failure(self) -> None:
+        """The backend failed (5xx, timeout, connection error)."""
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if state != CircuitState.OPEN:
+                    logger.warning(f"(🔌) Circuit for '{self.name}' opened after {self._consecutive_failures} consecutive failures")
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._probes_in_flight = 0
+
+
+class CircuitBreakerRegistry():
+    """Hands out one CircuitBreaker per backend, configured from the circuit_breaker section of config.yaml."""
+    def __init__(self, circuit_breaker_config: Optional[Dict[str, Any]] = None) -> None:
+        config = dict(circuit_breaker_config or {})
+        self.enabled = config.pop("enabled", True)
+        self.settings = config
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[CircuitBreaker]:
+        """Returns the shared breaker for a backend, or None if circuit breaking is disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name=name, **self.settings)
+            return self._breakers[name]
+
+
+circuit_breaker_registry = CircuitBreakerRegistry(CONFIG_DICT.get("circuit_breaker"))
@@ -2,127 +2,221 @@
 import asyncio
 import json
 import logging
-from typing import Callable, Dict, Type
+import time
+from typing import Callable, Dict, Optional, Tuple, Type
 
-from openai import APIStatusError
+from openai import APIConnectionError, APIStatusError, APITimeoutError
 from pydantic import BaseModel
 
+from agnostic_agent.config.config import CONFIG_DICT
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .retry_policies import FixedDelayPolicy, RetryPolicy, build_retry_policy
+
 logger = logging.getLogger(__name__)
 
+RETRYABLE_STATUS_CODES = {408, 429} # Request timeout and provider-side throttling. Every 5xx is retryable too
+
 class ErrorAllowance(BaseModel):
     n_of_occurrences: int = 0
     n_of_allowances: int = 0
 
-    def increment_occurrence(self) -> None: 
+    def increment_occurrence(self) -> None:
         self.n_of_occurrences += 1
 
     def has_allowance_remaining(self) -> bool:
         return self.n_of_occurrences <= self.n_of_allowances
 
 
+class RetryMetrics(BaseModel):
+    n_of_calls: int = 0
+    n_of_failed_calls: int = 0 # Calls that raised after exhausting their retries (or without any)
+    n_of_retries: int = 0
+    total_backoff_time: float = 0.0 # Seconds spent sleeping between attempts
+    retries_by_reason: Dict[str, int] = {}
+    n_of_deadline_exceeded: int = 0
+    n_of_circuit_rejections: int = 0
+
+    def record_retry(self, reason: str, delay: float) -> None:
+        self.n_of_retries += 1
+        self.total_backoff_time += delay
+        self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+
+
+def is_retryable_status_code(status_code: int) -> bool:
+    return 500 <= status_code < 600 or status_code in RETRYABLE_STATUS_CODES
+
+def is_backend_failure(e: Exception) -> bool:
+    """Whether an error says the backend itself is unhealthy (as opposed to a bad request or throttling)."""
+    if isinstance(e, APIStatusError):
+        return 500 <= e.status_code < 600 or e.status_code == 408
+    return isinstance(e, APIConnectionError)
+
+
 class ExceptionRetryController:
     """
     Controls execution with retries based on allowed exception types and specific conditions.
+
+    Retry budgets are scoped to a single call: every execute_with_retries starts with the
+    full allowances, so transient failures never degrade later calls. Backend-wide health
+    is tracked separately by an optional CircuitBreaker.
+
+    Attributes:
+        error_allowances: max number of retries per exception type, granted to every call
+        retry_policy: computes the backoff before each retry. None waits time_to_wait_between_retries
+        deadline: maximum seconds a call may spend in total (attempts + backoff). None means no deadline
+        metrics: number of retries, time spent backing off and retries per reason
     """
-    def __init__(self, error_allowances: Dict[Type[Exception], int]) -> None:
-        self.error_record = {
-            err_type: ErrorAllowance(n_of_allowances=count)
-            for err_type, count in error_allowances.items()
-        }
+    def __init__(self,
+                 error_allowances: Dict[Type[Exception], int],
+                 retry_policy: Optional[RetryPolicy] = None,
+                 deadline: Optional[float] = None) -> None:
+        self.error_allowances = dict(error_allowances)
+        self.retry_policy = retry_policy
+        self.deadline = deadline
+        self.metrics = RetryMetrics()
         self.total_interactions = 0
 
-    async def _resolve_APIStatusError(self, e: APIStatusError, time_to_wait_between_retries: int) -> bool:
-        status_code = e.status_code
-        logger.debug(f"Caught APIStatusError with status code: {status_code}")
-
-        if 500 <= status_code < 600:
-            if APIStatusError in self.error_record:
-                api_error_allowance = self.error_record[APIStatusError]
-                api_error_allowance.increment_occurrence()
+    def _new_error_record(self) -> Dict[Type[Exception], ErrorAllowance]:
+        """Fresh allowances for a single call."""
+        return {
+            err_type: ErrorAllowance(n_of_allowances=count)
+            for err_type, count in self.error_allowances.items()
+        }
 
-                if api_error_allowance.has_allowance_remaining():
-                    logger.warning(
-                        f"Caught APIStatusError (5xx: {status_code}) and message: {e.message}. "
-                        f"Occurrences: {api_error_allowance.n_of_occurrences}, "
-                        f"Allowances: {api_error_allowance.n_of_allowances}. Retrying..."
-                    )
-                    await asyncio.sleep(time_to_wait_between_retries)
-                    return False
-                else:
-                    logger.exception(
-                        f"Caught APIStatusError (5xx: {status_code}). "
-                        f"Maximum allowances ({api_error_allowance.n_of_allowances}) exceeded. "
-                        "No more retries."
-                    )
-                    return True
-            else:
-                logger.critical(
-                    f"Caught APIStatusError (5xx: {status_code}) but no allowances. Message is: {e.message}"
-                    "defined for APIStatusError. Execution stopped."
-                )
-                return True
+    def _classify(self, e: Exception, error_record: Dict[Type[Exception], ErrorAllowance]) -> Tuple[Optional[ErrorAllowance], str]:
+        """Finds the allowance that applies to an exception and a short reason used for metrics.
+
+        APIStatusErrors are only retryable for 408, 429 and 5xx. Other exceptions match the
+        allowance of their closest configured base class (e.g. APITimeoutError falls back to
+        APIConnectionError).
+        """
+        if isinstance(e, APIStatusError):
+            if not is_retryable_status_code(e.status_code):
+                return None, f"http_{e.status_code}"
+            return error_record.get(APIStatusError), f"http_{e.status_code}"
+
+        if isinstance(e, APITimeoutError):
+            reason = "timeout"
+        elif isinstance(e, APIConnectionError):
+            reason = "connection"
         else:
-            logger.exception(
-                f"Caught APIStatusError (non-5xx: {status_code}). "
-                "Not configured for retry on this status code type. Re-raising."
-            )
-            return True
-
-
-    async def execute_with_retries(self, func: Callable, time_to_wait_between_retries: int = 3, *args, **kwargs):
+            reason = type(e).__name__
+        for err_type in type(e).__mro__:
+            if err_type in error_record:
+                return error_record[err_type], reason
+        return None, reason
+
+    async def execute_with_retries(self,
+                                   func: Callable,
+                                   time_to_wait_between_retries: int = 3,
+                                   *args,
+                                   circuit_breaker: Optional[CircuitBreaker] = None,
+                                   **kwargs):
+        retry_policy = self.retry_policy or FixedDelayPolicy(delay=time_to_wait_between_retries)
+        error_record = self._new_error_record()
+        starting_time = time.monotonic()
+        n_of_retries = 0
+        previous_delay = 0.0
+        self.metrics.n_of_calls += 1
         while True:
-            self.total_interactions += 1 
+            self.total_interactions += 1
             logger.info(f"Attempting execution. Total interactions: {self.total_interactions}")
 
+            is_probe = False
             try:
+                if circuit_breaker:
+                    is_probe = circuit_breaker.before_call()
                 result = await func(*args, **kwargs)
+                if circuit_breaker:
+                    circuit_breaker.record_success()
                 logger.info("Function executed successfully.")
                 return result
 
-            except Exception as e:
-                exception_type = type(e)
-                error_info = self.error_record.get(exception_type)
-                print(f"EXCEPTION TYPE IS: {exception_type}")
-                print(isinstance(e, APIStatusError))
-
-                if isinstance(e, APIStatusError):
-                    raise_APIStatusError_exception = await self._resolve_APIStatusError(e, time_to_wait_between_retries=time_to_wait_between_retries)
-                    if raise_APIStatusError_exception:
-                        raise e
-                    else: 
-                        continue
-
-                elif error_info: 
-                    error_info.increment_occurrence()
-                    logger.debug(f"Has allowance remaining: {error_info.has_allowance_remaining()}")
-                    if error_info.has_allowance_remaining():
-                        logger.warning(
-                            f"Caught {exception_type.__name__}. "
-                            f"Occurrences: {error_info.n_of_occurrences}, "
-                            f"Allowances: {error_info.n_of_allowances}. Retrying..."
-                        )
-                        await asyncio.sleep(time_to_wait_between_retries)
-                        continue
+            except CircuitOpenError as e:
+                self.metrics.n_of_circuit_rejections += 1
+                self.metrics.n_of_failed_calls += 1
+                logger.error(f"(🔌) {e}. Failing fast")
+                raise e
+
+            except BaseException as e:
+                if not isinstance(e, Exception): # Cancelled or interrupted: the probe has no outcome
+                    if is_probe:
+                        circuit_breaker.release_probe()
+                    raise
+                if circuit_breaker:
+                    if is_backend_failure(e):
+                        circuit_breaker.record_failure()
                     else:
-                        logger.error(
-                            f"Caught {exception_type.__name__}. "
-                            f"Maximum allowances ({error_info.n_of_allowances}) exceeded. "
-                            "No more retries."
-                        )
-                        raise e 
-                else:
+                        circuit_breaker.record_success() # The backend answered
+                exception_type = type(e)
+                error_info, reason = self._classify(e, error_record)
+                logger.debug(f"Caught {exception_type.__name__} (reason: {reason})")
+
+                if isinstance(e, APIStatusError) and not is_retryable_status_code(e.status_code):
+                    self.metrics.n_of_failed_calls += 1
+                    logger.exception(
+                        f"Caught APIStatusError (non-retryable: {e.status_code}). "
+                        "Not configured for retry on this status code type. Re-raising."
+                    )
+                    raise e
+
+                if not error_info:
                     # Unhandled general exception
+                    self.metrics.n_of_failed_calls += 1
                     logger.critical(
-                        f"Caught an unhandled exception: {exception_type.__name__}. "
+                        f"Caught an unhandled exception: {exception_type.__name__} ({reason}). "
                         "No allowances defined for this error type. "
                         "Execution stopped."
                     )
-                    raise e 
+                    raise e
+
+                error_info.increment_occurrence()
+                logger.debug(f"Has allowance remaining: {error_info.has_allowance_remaining()}")
+                if not error_info.has_allowance_remaining():
+                    self.metrics.n_of_failed_calls += 1
+                    logger.error(
+                        f"Caught {exception_type.__name__} ({reason}). "
+                        f"Maximum allowances ({error_info.n_of_allowances}) exceeded. "
+                        "No more retries."
+                    )
+                    raise e
+
+                n_of_retries += 1
+                delay = retry_policy.compute_delay(attempt=n_of_retries, exception=e, previous_delay=previous_delay)
+                if self.deadline is not None and time.monotonic() - starting_time + delay > self.deadline:
+                    self.metrics.n_of_deadline_exceeded += 1
+                    self.metrics.n_of_failed_calls += 1
+                    logger.error(
+                        f"Caught {exception_type.__name__} ({reason}). "
+                        f"Retrying in {round(delay, 2)}s would exceed the {self.deadline}s deadline. "
+                        "No more retries."
+                    )
+                    raise e
+
+                logger.warning(
+                    f"Caught {exception_type.__name__} ({reason}): {e}. "
+                    f"Occurrences: {error_info.n_of_occurrences}, "
+                    f"Allowances: {error_info.n_of_allowances}. Retrying in {round(delay, 2)}s..."
+                )
+                self.metrics.record_retry(reason=reason, delay=delay)
+                previous_delay = delay
+                await asyncio.sleep(delay)
 
 # key: error, value: numer of reattempts
 my_error_allowances = {
-    APIStatusError: 3, # For 5xx APIStatusErrors,
+    APIStatusError: 3, # For 5xx, 408 and 429 APIStatusErrors,
+    APIConnectionError: 3, # Network errors and timeouts (APITimeoutError)
     json.decoder.JSONDecodeError: 2 # For when the model could parse correctly
 }
 
-exception_controller_executor_instance = ExceptionRetryController(my_error_allowances)
+retries_config = CONFIG_DICT.get("retries", {})
+
+exception_controller_executor_instance = ExceptionRetryController(
+    my_error_allowances,
+    retry_policy=build_retry_policy(policy_name=retries_config.get("policy", "exponential"),
+                                    base_delay=retries_config.get("base_delay", 1.0),
+                                    max_delay=retries_config.get("max_delay", 30.0),
+                                    honor_retry_after=retries_config.get("honor_retry_after", True)),
+    deadline=retries_config.get("deadline"),
+)
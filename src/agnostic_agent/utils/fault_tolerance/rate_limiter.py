@@ -0,0 +1,143 @@
+"""Client-side rate limiting (requests and tokens per minute) shared by every agent of the process."""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket():
+    """Classic token bucket refilled continuously up to its capacity.
+
+    The level may go negative: usage reported after the fact is charged even if it
+    exceeds what was reserved, and later requests wait until the debt is repaid.
+
+    Attributes:
+        capacity: maximum number of tokens the bucket holds (the burst size)
+        refill_rate: tokens added per second
+    """
+    def __init__(self, capacity: float, refill_rate: float) -> None:
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.level = capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def time_until_available(self, amount: float) -> float:
+        """Returns the seconds to wait before amount tokens are available (0 if they already are)."""
+        self._refill()
+        amount = min(amount, self.capacity) # Oversized requests only wait for a full bucket
+        missing = amount - self.level
+        return max(0.0, missing / self.refill_rate)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Gives back tokens (negative amounts charge extra ones)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter():
+    """Requests-per-minute and tokens-per-minute budgets for a single backend and model.
+
+    Attributes:
+        requests_per_minute: maximum requests per minute. None disables the limit
+        tokens_per_minute: maximum tokens (prompt + completion) per minute. None disables the limit
+        total_wait_time: seconds callers spent waiting for budget
+    """
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+        self._lock = threading.Lock() # Never held across an await, so it's safe across event loops
+        self.total_wait_time = 0.0
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """Waits until there is budget for one request of estimated_tokens, then reserves it."""
+        while True:
+            with self._lock:
+                wait_time = 0.0
+                if self._request_bucket:
+                    wait_time = max(wait_time, self._request_bucket.time_until_available(1))
+                if self._token_bucket:
+                    wait_time = max(wait_time, self._token_bucket.time_until_available(estimated_tokens))
+                if wait_time <= 0:
+                    if self._request_bucket:
+                        self._request_bucket.consume(1)
+                    if self._token_bucket:
+                        self._token_bucket.consume(estimated_tokens)
+                    return
+            logger.debug(f"(🚦) Rate limit budget exhausted. Waiting {round(wait_time, 2)}s")
+            self.total_wait_time += wait_time
+            await asyncio.sleep(wait_time)
+
+    def release(self, estimated_tokens: int) -> None:
+        """Gives back the tokens reserved for a request that failed or reported no usage."""
+        if self._token_bucket is None:
+            return
+        with self._lock:
+            self._token_bucket.refund(estimated_tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Corrects the reserved token budget with the usage reported by the provider."""
+        if self._token_bucket is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._token_bucket.refund(estimated_tokens - actual_tokens)
+
+
+class RateLimiterRegistry():
+    """Hands out one RateLimiter per (backend, model), configured from the rate_limits section of config.yaml.
+
+    Model-specific settings override backend settings, which override the defaults. A
+    (backend, model) pair with no limits at all gets no limiter.
+    """
+    def __init__(self, rate_limits_config: Optional[Dict[str, Any]] = None) -> None:
+        self.config = rate_limits_config or {}
+        self._limiters: Dict[Tuple[str, str], Optional[RateLimiter]] = {}
+        self._lock = threading.Lock()
+
+    def _resolve_limits(self, backend: str, model: str) -> Dict[str, Any]:
+        backend_config = (self.config.get("backends") or {}).get(backend) or {}
+        model_config = (backend_config.get("models") or {}).get(model) or {}
+        limits = {}
+        for level_config in (self.config.get("default") or {}, backend_config, model_config):
+            # null means "not set at this level", so it never overrides a broader setting
+            limits.update({key: value for key, value in level_config.items() if key != "models" and value is not None})
+        return limits
+
+    def get(self, backend: str, model: str) -> Optional[RateLimiter]:
+        """Returns the shared limiter for a backend and model, or None if it isn't limited."""
+        key = (backend, model)
+        with self._lock:
+            if key not in self._limiters:
+                limits = self._resolve_limits(backend=backend, model=model)
+                requests_per_minute = limits.get("requests_per_minute")
+                tokens_per_minute = limits.get("tokens_per_minute")
+                self._limiters[key] = RateLimiter(requests_per_minute=requests_per_minute,
+                                                  tokens_per_minute=tokens_per_minute) \
+                    if requests_per_minute or tokens_per_minute else None
+            return self._limiters[key]
+
+    def configure(self, backend: str, model: str, requests_per_minute: Optional[float] = None,
+                  tokens_per_minute: Optional[float] = None) -> RateLimiter:
+        """Sets (or replaces) the limiter of a backend and model programmatically."""
+        with self._lock:
+            limiter = RateLimiter(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+            self._limiters[(backend, model)] = limiter
+            return limiter
+
+
+rate_limiter_registry = RateLimiterRegistry(CONFIG_DICT.get("rate_limits"))
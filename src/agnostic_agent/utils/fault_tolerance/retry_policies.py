@@ -0,0 +1,122 @@
+"""Policies deciding how long to back off before retrying a failed call."""
+import email.utils
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+def retry_after_seconds(exception: Exception) -> Optional[float]:
+    """Extracts the delay requested by the server through Retry-After headers, if any.
+
+    Supports `retry-after-ms`, and `retry-after` as either seconds or an HTTP date.
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_date = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_date.timestamp() - time.time())
+
+
+class RetryPolicy(ABC):
+    """Computes the delay before the next attempt of a failed call."""
+    @abstractmethod
+    def compute_delay(self, attempt: int, exception: Exception, previous_delay: float = 0.0) -> float:
+        """Returns the seconds to wait before retrying.
+
+        Args:
+            attempt: number of the retry about to happen (1 for the first retry)
+            exception: the error that made the last attempt fail
+            previous_delay: delay used before the previous retry (0 for the first retry)
+        """
+        pass
+
+
+class FixedDelayPolicy(RetryPolicy):
+    """Waits the same amount of time before every retry."""
+    def __init__(self, delay: float = 3.0) -> None:
+        self.delay = delay
+
+    def compute_delay(self, attempt: int, exception: Exception, previous_delay: float = 0.0) -> float:
+        return self.delay
+
+
+class ExponentialBackoffPolicy(RetryPolicy):
+    """Doubles (by default) the delay on every retry, with optional "full jitter".
+
+    With jitter the delay is drawn uniformly from [0, backoff], which spreads out clients
+    that failed at the same time instead of having them retry in lockstep.
+    """
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 30.0, multiplier: float = 2.0, jitter: bool = True) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def compute_delay(self, attempt: int, exception: Exception, previous_delay: float = 0.0) -> float:
+        backoff = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class DecorrelatedJitterPolicy(RetryPolicy):
+    """"Decorrelated jitter" backoff: each delay is drawn from [base_delay, 3 * previous_delay]."""
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 30.0) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def compute_delay(self, attempt: int, exception: Exception, previous_delay: float = 0.0) -> float:
+        upper_bound = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper_bound))
+
+
+class RetryAfterPolicy(RetryPolicy):
+    """Honors the server's Retry-After header when present, otherwise defers to another policy.
+
+    Attributes:
+        fallback: policy used when the error carries no Retry-After information
+        max_retry_after: upper bound on the delay requested by the server
+    """
+    def __init__(self, fallback: Optional[RetryPolicy] = None, max_retry_after: float = 120.0) -> None:
+        self.fallback = fallback or ExponentialBackoffPolicy()
+        self.max_retry_after = max_retry_after
+
+    def compute_delay(self, attempt: int, exception: Exception, previous_delay: float = 0.0) -> float:
+        requested_delay = retry_after_seconds(exception)
+        if requested_delay is not None:
+            return min(requested_delay, self.max_retry_after)
+        return self.fallback.compute_delay(attempt=attempt, exception=exception, previous_delay=previous_delay)
+
+
+def build_retry_policy(policy_name: str = "exponential",
+                       base_delay: float = 1.0,
+                       max_delay: float = 30.0,
+                       honor_retry_after: bool = True) -> RetryPolicy:
+    """Builds a policy from its config.yaml description."""
+    if policy_name == "fixed":
+        policy = FixedDelayPolicy(delay=base_delay)
+    elif policy_name == "exponential":
+        policy = ExponentialBackoffPolicy(base_delay=base_delay, max_delay=max_delay)
+    elif policy_name == "decorrelated_jitter":
+        policy = DecorrelatedJitterPolicy(base_delay=base_delay, max_delay=max_delay)
+    else:
+        raise ValueError(f"Unknown retry policy: {policy_name}")
+    return RetryAfterPolicy(fallback=policy) if honor_retry_after else policy
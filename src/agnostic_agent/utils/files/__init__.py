@@ -0,0 +1,5 @@
+from .encoding import (AttachmentMemoryBudget, attachment_memory_budget, data_uri_mime_type,
+                       data_uri_prefix, encode_bytes_base64, encode_file_base64)
+from .images import ImagePreprocessor, image_preprocessor_instance
+from .mime import detect_mime_type
+from .pdf import PDFTextExtractor, pdf_text_extractor_instance
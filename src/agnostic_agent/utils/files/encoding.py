@@ -0,0 +1,152 @@
+"""Chunked base64 encoding of attachments under a process-wide memory budget."""
+import asyncio
+import base64
+import hashlib
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 3 * 1024 * 1024 # Multiple of 3, so every chunk encodes without padding
+
+
+def encoded_length(n_of_bytes: int) -> int:
+    """Length of the base64 encoding of n_of_bytes bytes."""
+    return 4 * ((n_of_bytes + 2) // 3)
+
+
+def data_uri_prefix(mime_type: Optional[str]) -> str:
+    """Header of a base64 data URI. Unknown types are sent as generic binary data."""
+    return f"data:{mime_type or 'application/octet-stream'};base64,"
+
+
+def data_uri_mime_type(data_uri: str) -> Optional[str]:
+    """MIME type declared by a data URI built with data_uri_prefix (None if it was unknown)."""
+    mime_type = data_uri[len("data:"):data_uri.index(";")]
+    return None if mime_type == "application/octet-stream" else mime_type
+
+
+def _new_buffer(prefix: str, n_of_bytes: int) -> bytearray:
+    """Preallocates the prefix plus the base64 encoding of n_of_bytes bytes."""
+    header = prefix.encode("ascii")
+    buffer = bytearray(len(header) + encoded_length(n_of_bytes))
+    buffer[:len(header)] = header
+    return buffer
+
+
+def _write_base64(buffer: bytearray, position: int, chunk: bytes) -> int:
+    """Encodes a chunk into the buffer at position. Returns the position after it."""
+    encoded_chunk = base64.b64encode(chunk)
+    buffer[position:position + len(encoded_chunk)] = encoded_chunk
+    return position + len(encoded_chunk)
+
+
+async def encode_file_base64(file_path: str,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             prefix: str = "") -> Tuple[str, str]:
+    """Reads a file in fixed-size chunks and base64-encodes it into a single preallocated buffer.
+
+    Only one raw chunk is held at a time, instead of the whole file plus its encoded bytes
+    plus the decoded string. The prefix (e.g. a data URI header) is written into the same
+    buffer, so the payload is decoded to a string exactly once.
+
+    Returns:
+        The sha256 of the file's bytes and the prefix followed by their base64 encoding
+    """
+    if chunk_size % 3:
+        raise ValueError(f"chunk_size must be a multiple of 3, got {chunk_size}")
+    digest = hashlib.sha256()
+    buffer = _new_buffer(prefix, await aiofiles.os.path.getsize(file_path))
+    position = len(prefix)
+    async with aiofiles.open(file_path, "rb") as f:
+        while True:
+            chunk = await f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            position = _write_base64(buffer, position, chunk)
+    if position != len(buffer): # The file changed size while being read
+        del buffer[position:]
+    return digest.hexdigest(), buffer.decode("ascii")
+
+
+def encode_bytes_base64(content: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, prefix: str = "") -> str:
+    """Same as encode_file_base64, for bytes already in memory. Returns the prefix followed by their encoding."""
+    if chunk_size % 3:
+        raise ValueError(f"chunk_size must be a multiple of 3, got {chunk_size}")
+    buffer = _new_buffer(prefix, len(content))
+    position = len(prefix)
+    view = memoryview(content)
+    for start in range(0, len(content), chunk_size):
+        position = _write_base64(buffer, position, view[start:start + chunk_size])
+    return buffer.decode("ascii")
+
+
+class AttachmentMemoryBudget():
+    """Caps the memory used by attachments being encoded at the same time, across every prompt of the process.
+
+    Callers reserve an estimate of the memory they are about to use and wait while the
+    budget is exhausted. Requests bigger than the whole budget wait until nothing else is
+    reserved, so they still go through one at a time.
+
+    Attributes:
+        max_bytes: budget in bytes. None disables it
+        waits: number of reservations that had to wait
+    """
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self.waits = 0
+        self._lock = threading.Lock() # Never held across an await, so it's safe across event loops
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    async def acquire(self, n_of_bytes: int) -> int:
+        """Waits until n_of_bytes fit in the budget and reserves them. Returns the amount reserved."""
+        if self.max_bytes is None:
+            return 0
+        n_of_bytes = min(n_of_bytes, self.max_bytes)
+        has_waited = False
+        while True:
+            with self._lock:
+                if self.in_use + n_of_bytes <= self.max_bytes:
+                    self.in_use += n_of_bytes
+                    return n_of_bytes
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            if not has_waited:
+                has_waited = True
+                self.waits += 1
+                logger.debug(f"(📎) Attachment memory budget exhausted ({self.in_use}/{self.max_bytes} bytes). Waiting")
+            await waiter
+
+    def release(self, n_of_bytes: int) -> None:
+        with self._lock:
+            self.in_use -= n_of_bytes
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters: # Everyone re-checks the budget
+            loop.call_soon_threadsafe(self._wake, waiter)
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def reserve(self, n_of_bytes: int) -> AsyncIterator[None]:
+        reserved = await self.acquire(n_of_bytes)
+        try:
+            yield
+        finally:
+            if reserved:
+                self.release(reserved)
+
+
+attachment_memory_budget = AttachmentMemoryBudget(CONFIG_DICT.get("attachments", {}).get("memory_budget_bytes"))
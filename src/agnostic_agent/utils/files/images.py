@@ -0,0 +1,112 @@
+"""Optional downscaling and recompression of image attachments before they are uploaded (needs Pillow)."""
+import importlib.util
+import io
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+from ..core.schemas import ExecutionMode
+from ..execution import tool_executor_instance
+
+logger = logging.getLogger(__name__)
+
+PREPROCESSABLE_MIME_TYPES = {"image/png", "image/jpeg", "image/webp", "image/bmp", "image/tiff"} # GIFs may be animated
+OUTPUT_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def preprocess_image(content: bytes,
+                     max_dimension: int,
+                     output_format: str,
+                     quality: int,
+                     strip_exif: bool) -> Tuple[bytes, str]:
+    """Resizes an image so its longest side is at most max_dimension and recompresses it.
+
+    Module-level so it can run in a process pool.
+
+    Returns:
+        The new image bytes and their MIME type
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(content)) as original:
+        exif = original.info.get("exif")
+        image = ImageOps.exif_transpose(original) # Orientation is applied before EXIF is dropped
+        if max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension))
+        if output_format == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        save_kwargs: Dict[str, Any] = {"quality": quality}
+        if exif and not strip_exif:
+            save_kwargs["exif"] = exif
+        output = io.BytesIO()
+        image.save(output, format=output_format.upper(), **save_kwargs)
+    return output.getvalue(), OUTPUT_FORMATS[output_format]
+
+
+class ImagePreprocessor():
+    """Shrinks image attachments to cut upload size and vision tokens.
+
+    Runs in the shared tool executor so the event loop is never blocked decoding images.
+    Without Pillow installed (pip install "agnostic_agent[images]") images are sent as-is.
+
+    Attributes:
+        max_dimension: maximum width and height in pixels
+        output_format: "webp" or "jpeg"
+        quality: encoder quality (1-100)
+        strip_exif: if True, EXIF metadata (camera, GPS...) is removed
+        execution_mode: tool executor pool the work is submitted to
+    """
+    def __init__(self,
+                 max_dimension: int = 2048,
+                 output_format: str = "webp",
+                 quality: int = 85,
+                 strip_exif: bool = True,
+                 execution_mode: Union[ExecutionMode, str] = ExecutionMode.THREAD) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported image output format: {output_format}. Use one of {sorted(OUTPUT_FORMATS)}")
+        self.max_dimension = max_dimension
+        self.output_format = output_format
+        self.quality = quality
+        self.strip_exif = strip_exif
+        self.execution_mode = ExecutionMode(execution_mode)
+        self.available = importlib.util.find_spec("PIL") is not None
+        if not self.available:
+            logger.warning("Image preprocessing is enabled but Pillow is not installed. Images will be sent unchanged")
+
+    @classmethod
+    def from_config(cls, images_config: Optional[Dict[str, Any]]) -> Optional["ImagePreprocessor"]:
+        """Builds the preprocessor from the attachments.images section of config.yaml, or None if disabled."""
+        config = dict(images_config or {})
+        if not config.pop("enabled", False):
+            return None
+        return cls(**config)
+
+    @property
+    def variant(self) -> str:
+        """Identifies the output of this configuration, so cached results of other settings aren't reused."""
+        return f"{self.output_format}-q{self.quality}-{self.max_dimension}px{'-noexif' if self.strip_exif else ''}"
+
+    def can_process(self, mime_type: Optional[str]) -> bool:
+        return self.available and mime_type in PREPROCESSABLE_MIME_TYPES
+
+    async def process(self, content: bytes, mime_type: str) -> Tuple[bytes, str]:
+        """Returns the preprocessed image and its MIME type (the original ones if it can't be processed)."""
+        if not self.can_process(mime_type):
+            return content, mime_type
+        try:
+            processed, processed_mime_type = await tool_executor_instance.run(preprocess_image,
+                                                                              kwargs={"content": content,
+                                                                                      "max_dimension": self.max_dimension,
+                                                                                      "output_format": self.output_format,
+                                                                                      "quality": self.quality,
+                                                                                      "strip_exif": self.strip_exif},
+                                                                              execution_mode=self.execution_mode)
+        except Exception as e:
+            logger.warning(f"(📎) Image preprocessing failed, sending the original image: {e}")
+            return content, mime_type
+        logger.debug(f"(📎) Image preprocessed: {len(content)} -> {len(processed)} bytes ({processed_mime_type})")
+        return processed, processed_mime_type
+
+
+image_preprocessor_instance = ImagePreprocessor.from_config(CONFIG_DICT.get("attachments", {}).get("images"))
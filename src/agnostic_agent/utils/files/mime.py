@@ -0,0 +1,30 @@
+"""MIME type detection from the first bytes of a file, instead of trusting its extension."""
+from typing import Optional
+
+MIME_SNIFF_BYTES = 16 # Enough for every signature below
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"%PDF-", "application/pdf"),
+)
+
+
+def detect_mime_type(header: bytes) -> Optional[str]:
+    """Returns the MIME type matching a file's first bytes, or None if it isn't recognized."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in _SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+
+def read_mime_type(file_path: str) -> Optional[str]:
+    with open(file_path, "rb") as f:
+        return detect_mime_type(f.read(MIME_SNIFF_BYTES))
@@ -0,0 +1,129 @@
+"""Local PDF text extraction (needs pypdf), page-parallel in the shared process pool."""
+import asyncio
+import importlib.util
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from agnostic_agent.config.config import CONFIG_DICT
+
+from ..core.schemas import ExecutionMode
+from ..execution import tool_executor_instance
+
+logger = logging.getLogger(__name__)
+
+PAGE_SELECTION_PATTERN = re.compile(r"^(?P<path>.+)#pages=(?P<pages>[\d,\- ]+)$")
+
+
+def split_page_selection(file_path: str) -> Tuple[str, Optional[str]]:
+    """Splits "report.pdf#pages=1-3,7" into the path and the page selection ("1-3,7")."""
+    match = PAGE_SELECTION_PATTERN.match(file_path)
+    if not match:
+        return file_path, None
+    return match.group("path"), match.group("pages")
+
+
+def parse_page_selection(pages: Optional[str], n_of_pages: int) -> List[int]:
+    """Turns a 1-based selection like "1-3,7" into 0-based page indexes. None selects every page.
+
+    Raises:
+        ValueError: if the selection is malformed or out of range
+    """
+    if pages is None:
+        return list(range(n_of_pages))
+    indexes = []
+    for part in pages.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        first_page, last_page = int(first), int(last or first)
+        if not 1 <= first_page <= last_page <= n_of_pages:
+            raise ValueError(f"Invalid page selection '{part}' for a document of {n_of_pages} pages")
+        indexes.extend(range(first_page - 1, last_page))
+    return indexes
+
+
+def count_pages(file_path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pages_text(file_path: str, page_indexes: Sequence[int]) -> List[Tuple[int, str]]:
+    """Extracts the text of some pages. Module-level so it can run in a process pool.
+
+    Returns:
+        (page index, text) pairs
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    return [(page_index, reader.pages[page_index].extract_text() or "") for page_index in page_indexes]
+
+
+class PDFTextExtractor():
+    """Extracts the text layer of PDFs locally, so text documents are sent as text instead of uploaded whole.
+
+    Pages are split in batches extracted in parallel by the shared tool executor (process
+    pool by default, since extraction is CPU-bound). Without pypdf installed (pip install
+    "agnostic_agent[pdf]") extraction raises ImportError.
+
+    Attributes:
+        pages_per_task: pages extracted by each executor task
+        execution_mode: tool executor pool the work is submitted to
+    """
+    def __init__(self,
+                 pages_per_task: int = 8,
+                 execution_mode: Union[ExecutionMode, str] = ExecutionMode.PROCESS) -> None:
+        self.pages_per_task = pages_per_task
+        self.execution_mode = ExecutionMode(execution_mode)
+
+    @classmethod
+    def from_config(cls, pdf_config: Optional[Dict[str, Any]]) -> "PDFTextExtractor":
+        config = pdf_config or {}
+        return cls(pages_per_task=config.get("pages_per_task", 8),
+                   execution_mode=config.get("execution_mode", ExecutionMode.PROCESS))
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec("pypdf") is not None
+
+    def _submit(self, func, **kwargs) -> asyncio.Future:
+        return tool_executor_instance.submit_async(func, kwargs=kwargs, execution_mode=self.execution_mode)
+
+    async def iter_pages(self, file_path: str, pages: Optional[str] = None) -> AsyncIterator[Tuple[int, str]]:
+        """Yields (1-based page number, text) in page order, as soon as each batch is extracted.
+
+        Args:
+            file_path: the PDF
+            pages: 1-based selection like "1-3,7". None extracts every page
+        """
+        if not self.available:
+            raise ImportError('PDF text extraction needs pypdf. Install it with: pip install "agnostic_agent[pdf]"')
+        n_of_pages = await self._submit(count_pages, file_path=file_path)
+        page_indexes = parse_page_selection(pages, n_of_pages)
+        batches = [page_indexes[i:i + self.pages_per_task] for i in range(0, len(page_indexes), self.pages_per_task)]
+        running_batches = [self._submit(extract_pages_text, file_path=file_path, page_indexes=batch) for batch in batches]
+        try:
+            for running_batch in running_batches: # All batches run in parallel, results come out in order
+                for page_index, text in await running_batch:
+                    yield page_index + 1, text
+        finally:
+            for running_batch in running_batches:
+                running_batch.cancel()
+
+    async def iter_text_parts(self,
+                              file_path: str,
+                              file_name: str,
+                              pages: Optional[str] = None) -> AsyncIterator[Dict[str, str]]:
+        """Yields one text content part per page with text, in page order, as soon as each batch is extracted.
+
+        Nothing is yielded if the PDF has no text layer (e.g. scanned).
+        """
+        n_of_parts = 0
+        async for page_number, text in self.iter_pages(file_path, pages=pages):
+            if text.strip():
+                n_of_parts += 1
+                yield {"type": "text", "text": f"[{file_name} - page {page_number}]\n{text}"}
+        logger.debug(f"(📎) Extracted the text of {n_of_parts} pages from {file_name}")
+
+
+pdf_text_extractor_instance = PDFTextExtractor.from_config(CONFIG_DICT.get("attachments", {}).get("pdf"))
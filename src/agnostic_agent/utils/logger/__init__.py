@@ -1 +1,2 @@
-from .logger import Logger, add_context_to_log
\ No newline at end of file
+from .logger import Logger, add_context_to_log
+from .redaction import LogRepr, redact_attachments
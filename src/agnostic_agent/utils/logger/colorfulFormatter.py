@@ -1,7 +1,7 @@
-
+import importlib
+import importlib.util
 import json
-
-from pythonjsonlogger import jsonlogger
+import logging
 
 
 # ANSI color codes
@@ -45,9 +45,34 @@ class Colors:
     ITALIC = '\033[3m'
     UNDERLINE = '\033[4m'
 
+# Attributes every LogRecord has. Anything else was added through add_context_to_log or extra=
+RESERVED_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+
+
+def context_items(record: logging.LogRecord):
+    """Yields the context fields (key, value) of a record."""
+    for key, value in record.__dict__.items():
+        if key not in RESERVED_ATTRS:
+            yield key, value
+
+
+def format_message(formatter: logging.Formatter, record: logging.LogRecord) -> str:
+    """Returns the record's message with its traceback, if any."""
+    message = record.getMessage()
+    if record.exc_info:
+        if not record.exc_text:
+            record.exc_text = formatter.formatException(record.exc_info)
+    if record.exc_text:
+        message = f"{message}\n{record.exc_text}"
+    return message
+
+
 # Custom colorful formatter
-class ColoredJSONFormatter(jsonlogger.JsonFormatter):
-    """A JSON formatter that adds colors to the output"""
+class ColoredJSONFormatter(logging.Formatter):
+    """A formatter that prints the time, level, logger, message and context fields of a record in colors.
+
+    The line is built straight from the LogRecord, without serializing it to JSON first.
+    """
     
     LEVEL_COLORS = {
         'DEBUG': Colors.BRIGHT_BLACK,
@@ -64,47 +89,61 @@ class ColoredJSONFormatter(jsonlogger.JsonFormatter):
         'ERROR': '❌',
         'CRITICAL': '🔥',
     }
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Level column (color, emoji and padding) rendered once per level
+        self.level_columns = {level: f"[{color}{self.LEVEL_EMOJIS.get(level, '')} {level:8}{Colors.RESET}]"
+                              for level, color in self.LEVEL_COLORS.items()}
     
     def format(self, record):
-        # Get the base JSON string
-        json_str = super().format(record)
-        
-        # Parse back to dict for pretty printing
-        log_dict = json.loads(json_str)
-        
-        # Create a more visual format
-        formatted_parts = []
-        
-        # Time with dim color
-        time_str = log_dict.get('time', '')
-        formatted_parts.append(f"{Colors.DIM}[{time_str}]{Colors.RESET}")
-        
-        # Level with color, emoji, and padding
-        level = log_dict.get('level', '')
-        color = self.LEVEL_COLORS.get(level, Colors.WHITE)
-        emoji = self.LEVEL_EMOJIS.get(level, '')
-        level_colored = f"{color}{emoji} {level:8}{Colors.RESET}"
-        formatted_parts.append(f"[{level_colored}]")
-        
-        # Logger name with cyan color
-        name = log_dict.get('name', '')
-        name_colored = f"{Colors.CYAN}{name}{Colors.RESET}"
-        formatted_parts.append(f"({name_colored})")
-        
-        # Message with bold
-        message = log_dict.get('message', '')
-        message_colored = f"{Colors.ITALIC}{message}{Colors.RESET}"
-        formatted_parts.append(message_colored)
-        
+        level = record.levelname
+        level_column = self.level_columns.get(level) or f"[{Colors.WHITE} {level:8}{Colors.RESET}]"
+        line = (f"{Colors.DIM}[{self.formatTime(record)}]{Colors.RESET} {level_column} "
+                f"({Colors.CYAN}{record.name}{Colors.RESET}) "
+                f"{Colors.ITALIC}{format_message(self, record)}{Colors.RESET}")
+
         # Add context fields with different colors
-        context_parts = []
-        for key, value in log_dict.items():
-            if key not in ['time', 'level', 'name', 'message']:
-                colored_key = f"{Colors.BRIGHT_MAGENTA}{key}{Colors.RESET}"
-                colored_value = f"{Colors.BRIGHT_GREEN}{value}{Colors.RESET}"
-                context_parts.append(f"{colored_key}={colored_value}")
-        
+        context_parts = [f"{Colors.BRIGHT_MAGENTA}{key}{Colors.RESET}={Colors.BRIGHT_GREEN}{value}{Colors.RESET}"
+                         for key, value in context_items(record)]
         if context_parts:
-            formatted_parts.append(f"[{', '.join(context_parts)}]")
-        
-        return " ".join(formatted_parts)
\ No newline at end of file
+            line = f"{line} [{', '.join(context_parts)}]"
+        return line
+
+
+class PlainTextFormatter(logging.Formatter):
+    """The colored line without colors, for file sinks."""
+    def format(self, record):
+        line = f"[{self.formatTime(record)}] [{record.levelname:8}] ({record.name}) {format_message(self, record)}"
+        context_parts = [f"{key}={value}" for key, value in context_items(record)]
+        if context_parts:
+            line = f"{line} [{', '.join(context_parts)}]"
+        return line
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line: time, level, name, message and context fields.
+
+    Uses orjson when it is installed (pip install "agnostic_agent[json-logs]"), the standard
+    json module otherwise. Values that aren't JSON serializable are written as strings.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.uses_orjson = importlib.util.find_spec("orjson") is not None
+        self._orjson = importlib.import_module("orjson") if self.uses_orjson else None # Imported only when JSON lines are used
+        self._dumps = self._orjson_dumps if self.uses_orjson else self._json_dumps
+
+    def _orjson_dumps(self, log_dict) -> str:
+        return self._orjson.dumps(log_dict, default=str).decode("utf-8")
+
+    @staticmethod
+    def _json_dumps(log_dict) -> str:
+        return json.dumps(log_dict, default=str, ensure_ascii=False)
+
+    def format(self, record):
+        log_dict = {"time": self.formatTime(record),
+                    "level": record.levelname,
+                    "name": record.name,
+                    "message": format_message(self, record)}
+        log_dict.update(context_items(record))
+        return self._dumps(log_dict)
@@ -2,43 +2,48 @@ import atexit
 import contextvars
 import logging
 import logging.handlers
+import os
 import queue
-import re
 import sys
+import threading
+from collections import Counter
 from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
 
-from pythonjsonlogger import jsonlogger
+from .colorfulFormatter import (
+    ColoredJSONFormatter,
+    JSONLinesFormatter,
+    PlainTextFormatter,
+)
+from .redaction import DEFAULT_MAX_REPR_CHARS, LogRepr, redact_rendered_attachments
 
-from .colorfulFormatter import ColoredJSONFormatter
+PRIMITIVE_TYPES = (int, float, bool, type(None), LogRepr)
 
 
 class FileUploadFilter(logging.Filter):
     """A custom logging filter to redact base64 file data from log records.
 
-    This filter inspects the log message for a pattern indicating an embedded file.
-    If the pattern is found, the base64 data is replaced with a placeholder
-    instead of suppressing the entire log record.
+    Structured arguments of %-style records (message lists, responses...) and long strings
+    are wrapped so that, when the record is formatted, embedded files are replaced with a
+    placeholder by walking the structure and the rendered text is capped. Nothing is rendered for records
+    dropped by level.
+
+    Messages and string arguments that were rendered before logging (f-strings) can't be
+    walked: only those containing "data:" go through a regex redacting the files in them.
     """
 
-    def __init__(self, pattern_to_find: str = "'type': 'file', 'file':"):
+    def __init__(self, max_repr_chars: Optional[int] = DEFAULT_MAX_REPR_CHARS):
         """Initializes the filter.
 
         Args:
-            pattern_to_find (str): The specific string pattern to search for in log messages
-                                   to identify records that need redaction.
+            max_repr_chars (int, optional): Maximum length of each rendered argument. None disables the cap.
         """
         super().__init__()
-        # Regex to find 'file_data': 'data:...' and replace the base64 part
-        self.file_data_regex = re.compile(r"('file_data':\s*')data:[^']+'")
-        # Regex to find 'url': 'data:image/...' and replace the base64 part
-        self.image_url_regex = re.compile(r"('url':\s*')data:image[^']+'")
-
+        self.max_repr_chars = max_repr_chars
 
     def filter(self, record: logging.LogRecord) -> bool:
-        """Checks a log record and redacts file data if present.
-
-        The record is modified in-place to replace the base64 content with a
-        placeholder.
+        """Wraps the record's structured arguments for redaction.
 
         Args:
             record (logging.LogRecord): The log record to be checked and modified.
@@ -46,84 +51,216 @@ class FileUploadFilter(logging.Filter):
         Returns:
             bool: Always returns True, as records are modified, not suppressed.
         """
-        message = record.getMessage()
-        original_message = message
-
-        # Apply redaction for file_data pattern
-        message = self.file_data_regex.sub(r"\1[...FILE DATA REDACTED...]'", message)
+        if isinstance(record.msg, str) and "data:" in record.msg:
+            record.msg = redact_rendered_attachments(record.msg)
+        if isinstance(record.args, tuple) and record.args:
+            record.args = tuple(self._wrap(arg) for arg in record.args)
+        return True  # Always allow the record to be logged
 
-        # Apply redaction for image_url pattern
-        message = self.image_url_regex.sub(r"\1[...IMAGE DATA REDACTED...]'", message)
+    def _wrap(self, arg):
+        if isinstance(arg, str):
+            if "data:" in arg:
+                arg = redact_rendered_attachments(arg)
+            return arg if self.max_repr_chars is None or len(arg) <= self.max_repr_chars else LogRepr(arg, max_chars=self.max_repr_chars)
+        if isinstance(arg, PRIMITIVE_TYPES):
+            return arg
+        return LogRepr(arg, max_chars=self.max_repr_chars)
 
-        # If any redaction occurred, update the record
-        if message != original_message:
-            record.msg = message
-            record.args = ()  # The message is now a complete string, so clear args.
+    
+class OverflowPolicy(str, Enum):
+    """What the queue handler does with records once the log queue is full."""
+    DROP_OLDEST = "drop_oldest" # The oldest queued record makes room for the new one
+    DROP_DEBUG_FIRST = "drop_debug_first" # Queued DEBUG records are dropped first, then new DEBUG records, then the oldest
+    SAMPLE = "sample" # Only 1 in sample_every overflowing records is kept (replacing the oldest)
 
-            if hasattr(record, 'message'):
-                delattr(record, 'message')
 
-        return True  # Always allow the record to be logged
-
-    
 class ContextAwareQueueHandler(logging.handlers.QueueHandler):
-    """Injects dynamic fields before enqueing
+    """Injects dynamic fields before enqueing, and never blocks on a full queue.
+
+    When the queue is full, records are dropped following the overflow policy and counted
+    per level in dropped_records, so a slow sink can't make memory grow without limit.
     """
+    def __init__(self,
+                 queue_: queue.Queue,
+                 overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_DEBUG_FIRST,
+                 sample_every: int = 10) -> None:
+        super().__init__(queue_)
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.sample_every = sample_every
+        self.dropped_records: Counter = Counter()
+        self._n_of_overflows = 0
+        self._overflow_lock = threading.Lock()
+
     def prepare(self, record):
         context = LOG_CONTEXT.get()
         for key, value in context.items():
             setattr(record, key, value)
         return super().prepare(record)
 
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._overflow_lock:
+                self._handle_overflow(record)
+
+    def _handle_overflow(self, record: logging.LogRecord) -> None:
+        if self.overflow_policy == OverflowPolicy.SAMPLE:
+            self._n_of_overflows += 1
+            if self._n_of_overflows % self.sample_every:
+                self._drop(record)
+                return
+        elif self.overflow_policy == OverflowPolicy.DROP_DEBUG_FIRST:
+            if not self._remove_queued(lambda queued: queued.levelno <= logging.DEBUG):
+                if record.levelno <= logging.DEBUG:
+                    self._drop(record)
+                    return
+                self._remove_queued(lambda queued: True)
+            self._put_or_drop(record)
+            return
+        self._remove_queued(lambda queued: True)
+        self._put_or_drop(record)
+
+    def _remove_queued(self, predicate) -> bool:
+        """Removes the oldest queued record matching the predicate. Returns False if there is none."""
+        with self.queue.mutex:
+            for index, queued in enumerate(self.queue.queue):
+                if queued is not None and predicate(queued): # None is the listener's stop sentinel
+                    del self.queue.queue[index]
+                    self.queue.unfinished_tasks -= 1
+                    self.queue.not_full.notify()
+                    self._drop(queued)
+                    return True
+        return False
+
+    def _put_or_drop(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full: # Refilled by other threads in the meantime
+            self._drop(record)
+
+    def _drop(self, record: logging.LogRecord) -> None:
+        self.dropped_records[record.levelname] += 1
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    """Waits for room in a full queue to enqueue its stop sentinel, instead of failing."""
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
 class Logger():
-    def __init__(self, colorful_output=True) -> None:
+    def __init__(self,
+                 colorful_output=True,
+                 level: Union[int, str] = logging.DEBUG,
+                 max_repr_chars: Optional[int] = DEFAULT_MAX_REPR_CHARS,
+                 console: bool = True,
+                 file_path: Optional[str] = None,
+                 json_lines_path: Optional[str] = None,
+                 max_file_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5,
+                 queue_size: int = 10_000,
+                 overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_DEBUG_FIRST,
+                 sample_every: int = 10) -> None:
+        """Sets up the logging of the whole process: records are queued and written by a listener thread.
+
+        Args:
+            colorful_output (bool): Colored lines on stdout if True, JSON lines otherwise.
+            level (int | str): Level of the root logger, e.g. "INFO".
+            max_repr_chars (int, optional): Maximum length of each rendered log argument. None disables the cap.
+            console (bool): If True, records are written to stdout.
+            file_path (str, optional): Rotating file receiving plain text lines.
+            json_lines_path (str, optional): Rotating file receiving every record as a JSON line.
+            max_file_bytes (int): Size at which file sinks are rotated.
+            backup_count (int): Number of rotated files kept per file sink.
+            queue_size (int): Maximum number of records waiting for the sinks. 0 makes the queue unbounded.
+            overflow_policy (OverflowPolicy): What happens to records once the queue is full.
+            sample_every (int): With the "sample" policy, 1 in sample_every overflowing records is kept.
+        """
         self.colorful_output = colorful_output
-        self.queue_handler = self.__set_up_queue_handler()
+        self.max_repr_chars = max_repr_chars
+        self.console = console
+        self.file_path = file_path
+        self.json_lines_path = json_lines_path
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.queue_handler = self.__set_up_queue_handler(queue_size=queue_size,
+                                                         overflow_policy=overflow_policy,
+                                                         sample_every=sample_every)
         self.root_logger = logging.getLogger()
-        self.root_logger.setLevel(logging.DEBUG)
+        self.root_logger.setLevel(level.upper() if isinstance(level, str) else level)
         self.root_logger.addHandler(self.queue_handler)
 
         atexit.register(self.shutdown)
+
+    @classmethod
+    def from_config(cls, logging_config: Optional[Dict[str, Any]]) -> "Logger":
+        """Builds the logger from the logging section of config.yaml."""
+        config = logging_config or {}
+        file_sink = config.get("file") or {}
+        json_lines_sink = config.get("json_lines") or {}
+        return cls(colorful_output=config.get("console", "colored") == "colored",
+                   level=config.get("level", "INFO"),
+                   max_repr_chars=config.get("max_repr_chars", DEFAULT_MAX_REPR_CHARS),
+                   console=config.get("console", "colored") is not None,
+                   file_path=file_sink.get("path"),
+                   json_lines_path=json_lines_sink.get("path"),
+                   max_file_bytes=config.get("max_file_bytes", 10 * 1024 * 1024),
+                   backup_count=config.get("backup_count", 5),
+                   queue_size=config.get("queue_size", 10_000),
+                   overflow_policy=config.get("overflow_policy", OverflowPolicy.DROP_DEBUG_FIRST),
+                   sample_every=config.get("sample_every", 10))
+
+    @property
+    def dropped_records(self) -> Counter:
+        """Number of records dropped because the queue was full, per level name."""
+        return self.queue_handler.dropped_records
                 
-    def __set_up_queue_handler(self):
-        log_queue = queue.Queue(-1)
-        console_handler = self.__bind_handlers()
-        self.listener = logging.handlers.QueueListener(log_queue, console_handler)
+    def __set_up_queue_handler(self, queue_size: int, overflow_policy: Union[OverflowPolicy, str], sample_every: int):
+        log_queue = queue.Queue(queue_size)
+        handlers = self.__bind_handlers()
+        self.listener = LogQueueListener(log_queue, *handlers)
         self.listener.start()
         
-        queue_handler = ContextAwareQueueHandler(log_queue)
+        queue_handler = ContextAwareQueueHandler(log_queue, overflow_policy=overflow_policy, sample_every=sample_every)
+        queue_handler.addFilter(FileUploadFilter(max_repr_chars=self.max_repr_chars)) # Before the record is formatted by the queue handler
         return queue_handler
 
-    def __bind_handlers(self) -> logging.Handler:
-        stream_handler = logging.StreamHandler(stream=sys.stdout)
-        formatter = self.__bind_formatter()
-        stream_handler.setFormatter(formatter)
-        log_filter = FileUploadFilter()
-        stream_handler.addFilter(log_filter)
-        return stream_handler
+    def __bind_handlers(self) -> List[logging.Handler]:
+        handlers = []
+        if self.console:
+            stream_handler = logging.StreamHandler(stream=sys.stdout)
+            stream_handler.setFormatter(self.__bind_formatter())
+            handlers.append(stream_handler)
+        if self.file_path:
+            handlers.append(self.__rotating_file_handler(self.file_path, formatter=PlainTextFormatter()))
+        if self.json_lines_path:
+            handlers.append(self.__rotating_file_handler(self.json_lines_path, formatter=JSONLinesFormatter()))
+        return handlers
+
+    def __rotating_file_handler(self, path: str, formatter: logging.Formatter) -> logging.Handler:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(path,
+                                                            maxBytes=self.max_file_bytes,
+                                                            backupCount=self.backup_count,
+                                                            encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        return file_handler
     
     def __bind_formatter(self):
         if not self.colorful_output:
-            formatter = jsonlogger.JsonFormatter(
-                "%(asctime)s %(name)s %(levelname)s %(message)s",
-                rename_fields={"levelname": "level", "asctime": "time"},
-            )
-            return formatter
-        else:
-            formatter = ColoredJSONFormatter(
-                "%(asctime)s %(name)s %(levelname)s %(message)s",
-                rename_fields={"levelname": "level", "asctime": "time"},
-            )
-        
-            return formatter
+            return JSONLinesFormatter()
+        return ColoredJSONFormatter()
     
     def shutdown(self):
         """Stops the QueueListener and flushes any remaining logs.
         """
         if self.listener:
+            if self.dropped_records:
+                logging.warning(f"{sum(self.dropped_records.values())} log records were dropped because the log queue was full: {dict(self.dropped_records)}")
             logging.info("Shutting down logging listener...")
             self.listener.stop()
-            logging.info("Logging listener stopped.")
+            self.listener = None
         # Remove the queue handler from the root logger to prevent further logging attempts
         if self.queue_handler in self.root_logger.handlers:
             self.root_logger.removeHandler(self.queue_handler)
@@ -0,0 +1,65 @@
+"""Structural redaction and size-capped rendering of log arguments."""
+import re
+from typing import Any
+
+DEFAULT_MAX_REPR_CHARS = 4_000
+DATA_URI_KEYS = {"file_data", "url"}
+
+# Fallback for messages that were already rendered (f-strings, str() of messages)
+FILE_DATA_REGEX = re.compile(r"('file_data':\s*')data:[^']+'")
+IMAGE_URL_REGEX = re.compile(r"('url':\s*')data:image[^']+'")
+
+
+def redact_attachments(value: Any) -> Any:
+    """Returns a copy of messages (or any dict/list structure) with embedded base64 files replaced by a placeholder.
+
+    Walks the structure instead of searching the rendered text, so it costs the same
+    whatever the size of the attachments. Containers without attachments are returned as-is.
+    """
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            if key in DATA_URI_KEYS and isinstance(item, str) and item.startswith("data:"):
+                header, _, data = item.partition(",")
+                redacted[key] = f"{header},[...{len(data)} chars of FILE DATA REDACTED...]"
+            else:
+                redacted[key] = redact_attachments(item)
+        return redacted
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact_attachments(item) for item in value)
+    return value
+
+
+def redact_rendered_attachments(text: str) -> str:
+    """Replaces the base64 files embedded in already rendered messages with a placeholder.
+
+    A regex over the whole text, so callers only run it on text containing "data:".
+    """
+    text = FILE_DATA_REGEX.sub(r"\1[...FILE DATA REDACTED...]'", text)
+    return IMAGE_URL_REGEX.sub(r"\1[...IMAGE DATA REDACTED...]'", text)
+
+
+def capped_repr(value: Any, max_chars: int = DEFAULT_MAX_REPR_CHARS) -> str:
+    """Renders a redacted value, cut to max_chars."""
+    text = str(redact_attachments(value))
+    if max_chars is not None and len(text) > max_chars:
+        return f"{text[:max_chars]}... [{len(text) - max_chars} more chars]"
+    return text
+
+
+class LogRepr():
+    """Defers redacting and rendering a log argument until the record is actually emitted.
+
+    Usage:
+        logger.debug("Message is: %s", LogRepr(messages))
+    """
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int = DEFAULT_MAX_REPR_CHARS) -> None:
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return capped_repr(self.value, max_chars=self.max_chars)
+
+    __repr__ = __str__
@@ -0,0 +1,760 @@
+"""Pipelines of agent prompts and Python functions, run as a DAG in parallel."""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+import types
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, ConfigDict
+
+from agnostic_agent.utils import TTLCache, add_context_to_log, tool_executor_instance
+from agnostic_agent.utils.core.schemas import (
+    ExecutionMode,
+    LLMResponse,
+    StreamEventType,
+    TokenUsage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StepStatus(str, Enum):
+    PENDING = "pending"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # A dependency failed or was skipped
+
+
+class WorkflowEventType(str, Enum):
+    STEP_STARTED = "step_started"
+    TEXT = "text"  # Text delta of a streamed agent step
+    STEP_FINISHED = "step_finished"
+    STEP_FAILED = "step_failed"
+    STEP_SKIPPED = "step_skipped"
+    FINAL = "final"  # End of the run, carries the WorkflowResult
+
+
+class WorkflowStep(BaseModel):
+    """A node of a Workflow: an agent prompt or a Python function.
+
+    It is fed with the outputs of its dependencies.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    func: Optional[Callable[..., Any]] = None
+    agent: Optional[Any] = None  # LLMAgent, or anything with its prompt/stream methods
+    message: Optional[Union[str, Callable[..., str]]] = None
+    depends_on: List[str] = []
+    stream_from: List[str] = []
+    stream: bool = False
+    cache: bool = True
+    execution: ExecutionMode = ExecutionMode.THREAD
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """What the step does, so its cached results aren't reused once it changes."""
+        if self.func is not None:
+            return {"func": _callable_fingerprint(self.func)}
+        backend = getattr(
+            self.agent, "llm_backend", self.agent
+        )  # LLMAgent keeps its instructions in its provider
+        response_schema = getattr(backend, "response_schema", None)
+        return {
+            "message": (
+                self.message
+                if isinstance(self.message, str)
+                else _callable_fingerprint(self.message)
+            ),
+            "agent_name": getattr(self.agent, "agent_name", None),
+            "model_name": getattr(self.agent, "model_name", None),
+            "sys_instructions": getattr(backend, "sys_instructions", None),
+            "response_schema": (
+                _qualified_name(response_schema) if response_schema else None
+            ),
+            "settings": getattr(backend, "settings", None),
+            "tools": sorted(getattr(backend, "tools_to_use", None) or {}),
+        }
+
+
+def _qualified_name(obj: Any) -> str:
+    qualname = getattr(obj, "__qualname__", type(obj).__qualname__)
+    return f"{getattr(obj, '__module__', '')}.{qualname}"
+
+
+def _code_fingerprint(code: Any) -> str:
+    """Hashes a code object's bytecode and constants (nested functions included).
+
+    Its address is left out, so the hash is the same for every function built from it.
+    """
+    digest = hashlib.sha256(code.co_code)
+    for constant in code.co_consts:
+        digest.update(
+            _code_fingerprint(constant).encode()
+            if hasattr(constant, "co_code")
+            else repr(constant).encode()
+        )
+    digest.update(repr(code.co_names).encode())
+    return digest.hexdigest()
+
+
+def _callable_fingerprint(func: Any, _seen: Optional[set] = None) -> Any:
+    """Identifies a function by its name, code, defaults and closure values.
+
+    Two lambdas, or two closures returned by the same factory, only share cached
+    results if they would compute the same thing. Functions captured in closures are
+    fingerprinted the same way, immutable values by their content and any other object
+    by its identity (so state they mutate, like a list of calls, doesn't change the
+    fingerprint).
+    """
+    _seen = _seen if _seen is not None else set()
+    if id(func) in _seen:  # Recursive closures
+        return _qualified_name(func)
+    _seen.add(id(func))
+    if isinstance(func, functools.partial):
+        return {
+            "partial": _callable_fingerprint(func.func, _seen),
+            "args": func.args,
+            "kwargs": func.keywords,
+        }
+    code = getattr(func, "__code__", None)
+    if code is None:  # Builtins and classes by name, callable objects by identity
+        return (
+            _qualified_name(func)
+            if hasattr(func, "__qualname__")
+            else f"{_qualified_name(type(func))}@{id(func)}"
+        )
+    closure = []
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # Not assigned yet
+            value = None
+        closure.append(_closure_value_fingerprint(value, _seen))
+    return {
+        "name": _qualified_name(func),
+        "code": _code_fingerprint(code),
+        "defaults": [
+            getattr(func, "__defaults__", None),
+            getattr(func, "__kwdefaults__", None),
+        ],
+        "closure": closure,
+        "self": (
+            _closure_value_fingerprint(func.__self__, _seen)
+            if isinstance(func, types.MethodType)
+            else None
+        ),
+    }
+
+
+def _closure_value_fingerprint(value: Any, _seen: set) -> Any:
+    if isinstance(value, (str, int, float, bool, bytes, type(None), Enum, BaseModel)):
+        return value
+    if isinstance(value, type):
+        return _qualified_name(value)
+    if isinstance(value, (tuple, frozenset)):
+        return [_closure_value_fingerprint(item, _seen) for item in value]
+    if callable(value):
+        return _callable_fingerprint(value, _seen)
+    return f"{_qualified_name(type(value))}@{id(value)}"
+
+
+class StepResult(BaseModel):
+    """Outcome and timings of a step. Times are seconds since the run started."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    status: StepStatus = StepStatus.PENDING
+    output: Any = None
+    response: Optional[LLMResponse] = None  # Full response of agent steps
+    error: Optional[BaseException] = None
+    cached: bool = False
+    ready_at: float = 0.0  # Dependencies were done
+    started_at: float = 0.0  # Got a concurrency slot
+    finished_at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == StepStatus.SUCCEEDED
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+    @property
+    def queued_time(self) -> float:
+        """Time spent waiting for a concurrency slot once ready."""
+        return self.started_at - self.ready_at
+
+
+class WorkflowResult(BaseModel):
+    """Outputs, per-step results and timing breakdown of a workflow run.
+
+    Attributes:
+        outputs: output of every successful step, by step name
+        steps: result of every step, by step name
+        critical_path: the chain of steps that determined the wall time, first to last
+        wall_time: seconds the run took
+        token_usage: tokens used by agent steps, excluding cached ones
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    outputs: Dict[str, Any] = {}
+    steps: Dict[str, StepResult] = {}
+    critical_path: List[str] = []
+    wall_time: float = 0.0
+    token_usage: TokenUsage = TokenUsage()
+
+    def __getitem__(self, step_name: str) -> Any:
+        return self.outputs[step_name]
+
+    @property
+    def critical_path_time(self) -> float:
+        """Seconds spent running (or queued for) the steps of the critical path."""
+        return sum(
+            self.steps[name].finished_at - self.steps[name].ready_at
+            for name in self.critical_path
+        )
+
+    def critical_path_breakdown(self) -> List[Dict[str, Any]]:
+        """Per step of the critical path: duration, time queued and if it was cached."""
+        return [
+            {
+                "step": name,
+                "duration": self.steps[name].duration,
+                "queued_time": self.steps[name].queued_time,
+                "cached": self.steps[name].cached,
+            }
+            for name in self.critical_path
+        ]
+
+
+class WorkflowEvent(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    type: WorkflowEventType
+    step: Optional[str] = None
+    content: Optional[str] = None
+    step_result: Optional[StepResult] = None
+    result: Optional[WorkflowResult] = None
+
+
+def step_cache_key(inputs: Dict[str, Any]) -> str:
+    """Hashes the inputs of a step into a stable key.
+
+    Pydantic models are hashed by their content.
+    """
+    serialized = json.dumps(
+        inputs,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=lambda value: (
+            value.model_dump(mode="json")
+            if isinstance(value, BaseModel)
+            else str(value)
+        ),
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class _TextChannel:
+    """Text deltas of a streamed step.
+
+    Every consumer gets all of them, however late it starts iterating.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[str] = []
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._condition = asyncio.Condition()
+
+    async def send(self, chunk: str) -> None:
+        async with self._condition:
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+
+    async def close(self, error: Optional[BaseException] = None) -> None:
+        async with self._condition:
+            self._closed = True
+            self._error = error
+            self._condition.notify_all()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: position < len(self._chunks) or self._closed
+                )
+                chunks = self._chunks[position:]
+                closed, error = self._closed, self._error
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+            if closed and position == len(self._chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class Workflow:
+    """A DAG of steps, each an agent prompt or a Python function, run in parallel.
+
+    Steps receive the outputs of their dependencies as keyword arguments, named after
+    them. Workflow inputs are passed to run() and are depended on like steps. A step
+    starts as soon as its dependencies are done, so independent branches run
+    concurrently, with at most max_concurrency steps running at once. Dependencies must
+    be declared before the steps using them, which keeps the graph acyclic.
+
+    The output of an agent step is its parsed_response, or its text if it has no
+    response_schema. An async function step can consume the text of agent steps as it
+    is generated by listing them in stream_from: it then starts once they have started
+    and receives async iterators of text deltas instead of their outputs.
+
+    Usage:
+        workflow = Workflow(inputs=["text"], cache=TTLCache(ttl=600))
+        workflow.add_step("summary", agent=summarizer,
+                          message="Summarize: {text}", depends_on=["text"])
+        workflow.add_step("language", agent=detector,
+                          message="Language of: {text}", depends_on=["text"])
+        workflow.add_step("report", func=build_report,
+                          depends_on=["summary", "language"])
+        result = await workflow.run(text=text)
+        result["report"]
+
+    Attributes:
+        name: name of the workflow, for logging
+        inputs: names of the values passed to run()
+        steps: the steps, by name, in the order they were added
+        max_concurrency: maximum number of steps running at once
+        cache: results of steps, keyed on the workflow and step names, the step's
+            definition (func, or agent and message) and a hash of its inputs. Can be
+            shared by several workflows. None disables caching
+    """
+
+    def __init__(
+        self,
+        name: str = "workflow",
+        inputs: Iterable[str] = (),
+        max_concurrency: int = 8,
+        cache: Optional[TTLCache] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.name = name
+        self.inputs = list(inputs)
+        self.steps: Dict[str, WorkflowStep] = {}
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+
+    def add_step(
+        self,
+        name: str,
+        func: Optional[Callable[..., Any]] = None,
+        agent: Optional[Any] = None,
+        message: Optional[Union[str, Callable[..., str]]] = None,
+        depends_on: Iterable[str] = (),
+        stream_from: Iterable[str] = (),
+        stream: bool = False,
+        cache: bool = True,
+        execution: Union[ExecutionMode, str] = ExecutionMode.THREAD,
+    ) -> "Workflow":
+        """Adds a step. Returns the workflow, so calls can be chained.
+
+        Args:
+            name: name of the step, which is also the keyword its output is passed as
+            func: a sync or async function called with the outputs of depends_on
+            agent: an LLMAgent prompted with message, instead of func
+            message: the agent's prompt. A format string filled with the outputs of
+                depends_on, or a function of them
+            depends_on: names of the inputs and steps this step needs
+            stream_from: agent steps (among depends_on) whose text deltas an async func
+                consumes as they are generated
+            stream: if True, the text deltas of this agent step are yielded by
+                Workflow.stream()
+            cache: if False, the result of this step is never cached. Steps with
+                stream_from are never cached
+            execution: where a sync func runs. Defaults to a worker thread
+
+        Raises:
+            ValueError: if the step is invalid or depends on something not declared yet
+        """
+        depends_on, stream_from = list(depends_on), list(stream_from)
+        if name in self.steps or name in self.inputs:
+            raise ValueError(f"'{name}' is already defined in workflow '{self.name}'")
+        if (func is None) == (agent is None):
+            raise ValueError(f"Step '{name}' needs either a func or an agent")
+        if agent is not None and message is None:
+            raise ValueError(f"Agent step '{name}' needs a message")
+        unknown = [
+            dependency
+            for dependency in depends_on
+            if dependency not in self.steps and dependency not in self.inputs
+        ]
+        if unknown:
+            raise ValueError(
+                f"Step '{name}' depends on {unknown}, "
+                "which aren't inputs or previous steps"
+            )
+        if stream_from:
+            if not asyncio.iscoroutinefunction(func):
+                raise ValueError(
+                    f"Step '{name}' streams its inputs, so it must be an async function"
+                )
+            for dependency in stream_from:
+                if (
+                    dependency not in depends_on
+                    or dependency not in self.steps
+                    or self.steps[dependency].agent is None
+                ):
+                    raise ValueError(
+                        f"Step '{name}' can only stream from agent steps it depends "
+                        f"on, not '{dependency}'"
+                    )
+
+        self.steps[name] = WorkflowStep(
+            name=name,
+            func=func,
+            agent=agent,
+            message=message,
+            depends_on=depends_on,
+            stream_from=stream_from,
+            stream=stream,
+            cache=cache,
+            execution=ExecutionMode(execution),
+        )
+        return self
+
+    def stream(
+        self, return_exceptions: bool = False, **inputs
+    ) -> AsyncIterator[WorkflowEvent]:
+        """Runs the workflow, yielding step events as they happen.
+
+        The text deltas of streamed agent steps are yielded too. The last event is of
+        type WorkflowEventType.FINAL and carries the WorkflowResult.
+
+        Args:
+            return_exceptions: if True, a failed step only skips the steps depending on
+                it. Otherwise the run is cancelled and its error raised
+            **inputs: a value for each of the workflow's inputs
+        """
+        missing = [name for name in self.inputs if name not in inputs]
+        unexpected = [name for name in inputs if name not in self.inputs]
+        if missing or unexpected:
+            raise ValueError(
+                f"Workflow '{self.name}' expects inputs {self.inputs}. "
+                f"Missing: {missing}, unexpected: {unexpected}"
+            )
+        return _WorkflowRun(
+            workflow=self, inputs=inputs, return_exceptions=return_exceptions
+        ).events()
+
+    async def run(self, return_exceptions: bool = False, **inputs) -> WorkflowResult:
+        """Runs the workflow and returns its result. See stream() for the arguments."""
+        result = None
+        async for event in self.stream(return_exceptions=return_exceptions, **inputs):
+            if event.type == WorkflowEventType.FINAL:
+                result = event.result
+        return result
+
+
+class _WorkflowRun:
+    """State of a single run, so a Workflow can be run several times concurrently."""
+
+    def __init__(
+        self, workflow: Workflow, inputs: Dict[str, Any], return_exceptions: bool
+    ) -> None:
+        self.workflow = workflow
+        self.return_exceptions = return_exceptions
+        self.values: Dict[str, Any] = dict(inputs)
+        self.results = {name: StepResult(name=name) for name in workflow.steps}
+        self._started = {name: asyncio.Event() for name in workflow.steps}
+        self._done = {name: asyncio.Event() for name in workflow.steps}
+        streamed = {
+            dependency
+            for step in workflow.steps.values()
+            for dependency in step.stream_from
+        }
+        self._channels = {
+            name: _TextChannel()
+            for name, step in workflow.steps.items()
+            if step.stream or name in streamed
+        }
+        self._slots = asyncio.Semaphore(workflow.max_concurrency)
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._starting_time = 0.0
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._starting_time
+
+    async def events(self) -> AsyncIterator[WorkflowEvent]:
+        self._starting_time = time.perf_counter()
+        logger.info(
+            f"(🧭) Running workflow '{self.workflow.name}' "
+            f"with {len(self.workflow.steps)} steps"
+        )
+        tasks = [
+            asyncio.create_task(self._run_step(step))
+            for step in self.workflow.steps.values()
+        ]
+        pending_steps = len(tasks)
+        try:
+            while pending_steps:
+                event = await self._events.get()
+                if event.type in (
+                    WorkflowEventType.STEP_FINISHED,
+                    WorkflowEventType.STEP_FAILED,
+                    WorkflowEventType.STEP_SKIPPED,
+                ):
+                    pending_steps -= 1
+                yield event
+                if (
+                    event.type == WorkflowEventType.STEP_FAILED
+                    and not self.return_exceptions
+                ):
+                    raise event.step_result.error
+            yield WorkflowEvent(
+                type=WorkflowEventType.FINAL, result=self._build_result()
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_step(self, step: WorkflowStep) -> None:
+        result = self.results[step.name]
+        with add_context_to_log(workflow=self.workflow.name, step=step.name):
+            for dependency in step.depends_on:
+                if dependency in self.results:
+                    await (
+                        self._started if dependency in step.stream_from else self._done
+                    )[dependency].wait()
+            blocking = [
+                dependency
+                for dependency in step.depends_on
+                if dependency in self.results
+                and self.results[dependency].status
+                in (StepStatus.FAILED, StepStatus.SKIPPED)
+            ]
+            result.ready_at = self._now()
+            if blocking:
+                logger.warning(
+                    f"(🧭) Skipping step '{step.name}': {blocking} didn't succeed"
+                )
+                result.status = StepStatus.SKIPPED
+                result.started_at = result.ready_at
+                await self._finish(step, WorkflowEventType.STEP_SKIPPED)
+                return
+
+            async with self._slots:
+                result.started_at = self._now()
+                self._started[step.name].set()
+                self._events.put_nowait(
+                    WorkflowEvent(type=WorkflowEventType.STEP_STARTED, step=step.name)
+                )
+                try:
+                    result.output, result.response, result.cached = await self._execute(
+                        step
+                    )
+                except Exception as e:
+                    logger.error(f"(🧭) Step '{step.name}' failed: {e}")
+                    result.status, result.error = StepStatus.FAILED, e
+                    await self._finish(step, WorkflowEventType.STEP_FAILED)
+                    return
+            self.values[step.name] = result.output
+            result.status = StepStatus.SUCCEEDED
+            await self._finish(step, WorkflowEventType.STEP_FINISHED)
+
+    async def _finish(self, step: WorkflowStep, event_type: WorkflowEventType) -> None:
+        result = self.results[step.name]
+        result.finished_at = self._now()
+        channel = self._channels.get(step.name)
+        if channel is not None:
+            await channel.close(
+                error=result.error if result.status != StepStatus.SUCCEEDED else None
+            )
+        self._started[step.name].set()
+        self._done[step.name].set()
+        self._events.put_nowait(
+            WorkflowEvent(type=event_type, step=step.name, step_result=result)
+        )
+
+    async def _execute(
+        self, step: WorkflowStep
+    ) -> Tuple[Any, Optional[LLMResponse], bool]:
+        """Runs a step, through the cache if possible.
+
+        Returns:
+            Its output, its agent response and whether it was cached
+        """
+        kwargs = {
+            name: self.values[name]
+            for name in step.depends_on
+            if name not in step.stream_from
+        }
+        if step.agent is not None:
+            message = (
+                step.message.format(**kwargs)
+                if isinstance(step.message, str)
+                else step.message(**kwargs)
+            )
+            run = functools.partial(self._prompt_agent, step, message)
+        else:
+            kwargs.update(
+                {name: self._channels[name].__aiter__() for name in step.stream_from}
+            )
+            run = functools.partial(self._call_function, step, kwargs)
+
+        cache = self.workflow.cache
+        if cache is None or not step.cache or step.stream_from:
+            output, response = await run()
+            return output, response, False
+
+        ran = False
+
+        async def run_and_flag() -> Tuple[Any, Optional[LLMResponse]]:
+            nonlocal ran
+            ran = True
+            return await run()
+
+        output, response = await cache.get_or_run(
+            f"{self.workflow.name}.{step.name}",
+            step_cache_key({"step": step.fingerprint(), "inputs": kwargs}),
+            run_and_flag,
+        )
+        if not ran:
+            logger.info(f"(🗃️) Step '{step.name}' served from the workflow cache")
+            channel = self._channels.get(step.name)
+            if channel is not None:  # Consumers still get the text, all at once
+                text = (
+                    response.final_text_response
+                    if response is not None
+                    else str(output)
+                )
+                await channel.send(text)
+                self._events.put_nowait(
+                    WorkflowEvent(
+                        type=WorkflowEventType.TEXT, step=step.name, content=text
+                    )
+                )
+        return output, response, not ran
+
+    async def _prompt_agent(
+        self, step: WorkflowStep, message: str
+    ) -> Tuple[Any, LLMResponse]:
+        channel = self._channels.get(step.name)
+        if channel is None:
+            response = await step.agent.prompt(message=message)
+        else:
+            response = None
+            async for event in step.agent.stream(message=message):
+                if event.type == StreamEventType.TEXT:
+                    await channel.send(event.content)
+                    self._events.put_nowait(
+                        WorkflowEvent(
+                            type=WorkflowEventType.TEXT,
+                            step=step.name,
+                            content=event.content,
+                        )
+                    )
+                elif event.type == StreamEventType.FINAL:
+                    response = event.response
+        output = (
+            response.parsed_response
+            if response.parsed_response is not None
+            else response.final_text_response
+        )
+        return output, response
+
+    async def _call_function(
+        self, step: WorkflowStep, kwargs: Dict[str, Any]
+    ) -> Tuple[Any, None]:
+        if asyncio.iscoroutinefunction(step.func):
+            return await step.func(**kwargs), None
+        return (
+            await tool_executor_instance.run(
+                step.func, kwargs=kwargs, execution_mode=step.execution
+            ),
+            None,
+        )
+
+    def _critical_path(self) -> List[str]:
+        """Walks back from the last step to finish, through its latest dependency."""
+        finished = [
+            result
+            for result in self.results.values()
+            if result.status != StepStatus.PENDING
+        ]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda result: result.finished_at).name]
+        while True:
+            step = self.workflow.steps[path[-1]]
+            # Streamed dependencies gate a step when they start, others when they finish
+            gates = [
+                (
+                    (
+                        self.results[name].started_at
+                        if name in step.stream_from
+                        else self.results[name].finished_at
+                    ),
+                    name,
+                )
+                for name in step.depends_on
+                if name in self.results
+            ]
+            if not gates:
+                break
+            path.append(max(gates)[1])
+        return path[::-1]
+
+    def _build_result(self) -> WorkflowResult:
+        token_usage = TokenUsage()
+        for result in self.results.values():
+            if (
+                result.response is not None
+                and result.response.usage
+                and not result.cached
+            ):
+                token_usage.add(result.response.usage)
+        workflow_result = WorkflowResult(
+            outputs={
+                name: result.output
+                for name, result in self.results.items()
+                if result.ok
+            },
+            steps=self.results,
+            critical_path=self._critical_path(),
+            wall_time=self._now(),
+            token_usage=token_usage,
+        )
+        breakdown = " → ".join(
+            f"{step['step']} {round(step['duration'], 2)}s"
+            + (" (cached)" if step["cached"] else "")
+            for step in workflow_result.critical_path_breakdown()
+        )
+        logger.info(
+            f"(🧭) Workflow '{self.workflow.name}' "
+            f"finished in {round(workflow_result.wall_time, 2)}s. "
+            f"Tokens: {token_usage.total_tokens}. Critical path: {breakdown}"
+        )
+        return workflow_result
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel
+
+from agnostic_agent import CONFIG_DICT, BaseLLMProvider, LLMAgent
+from agnostic_agent.utils import ExtraResponseSettings, tool
+
+
+class Keyword(BaseModel):
+    keyword: str
+
+@tool(schema=Keyword)
+def echo_keyword(keyword: str) -> str:
+    """Returns the keyword"""
+    return keyword
+
+
+def text_completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+
+
+def make_agent(**kwargs) -> LLMAgent:
+    agent = LLMAgent(llm_backend="ollama", agent_name="Template", model_name="fake",
+                     sys_instructions="Summarize the text", **kwargs)
+    agent.llm_backend.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(side_effect=lambda **_: text_completion("Done"))
+    )))
+    return agent
+
+
+def sent_messages(agent: LLMAgent, call: int = -1):
+    return agent.llm_backend.client.chat.completions.create.call_args_list[call].kwargs["messages"]
+
+
+def test_clone_reuses_the_configured_backend(mocker):
+    template = make_agent(tools=["echo_keyword"])
+    resolve = mocker.spy(LLMAgent, "_resolve_llm_backend_object")
+
+    worker = template.clone(agent_name="Worker")
+
+    resolve.assert_not_called()
+    assert worker.agent_name == worker.llm_backend.agent_name == "Worker"
+    assert template.agent_name == template.llm_backend.agent_name == "Template"
+    assert worker.llm_backend is not template.llm_backend
+    assert worker.llm_backend.client is template.llm_backend.client
+    assert worker.llm_backend.toolkit is template.llm_backend.toolkit
+    assert worker.llm_backend.settings is template.llm_backend.settings
+
+
+def test_clone_recomputes_what_overrides_affect(mocker):
+    mocker.patch.dict(CONFIG_DICT["context_window"], {"enabled": True})
+    template = make_agent(tools=["echo_keyword"])
+
+    worker = template.clone(response_schema=Keyword, tools=[], model_name="other")
+
+    assert worker.llm_backend.settings["response_format"]["json_schema"]["name"] == "Keyword"
+    assert "response_format" not in template.llm_backend.settings
+    assert worker.llm_backend.tools_to_use == {}
+    assert "echo_keyword" in template.llm_backend.tools_to_use
+    assert worker.model_name == "other"
+    assert worker.llm_backend.context_window is not template.llm_backend.context_window
+
+
+def test_clone_rejects_unknown_overrides():
+    with pytest.raises(TypeError):
+        make_agent().clone(llm_backend="openrouter")
+
+
+@pytest.mark.asyncio
+async def test_clones_track_their_own_usage():
+    template = make_agent()
+    worker = template.clone(agent_name="Worker")
+
+    await worker.prompt(message="Some text")
+
+    assert worker.llm_backend.cumulative_token_usage.total_tokens == 6
+    assert template.llm_backend.cumulative_token_usage is None
+
+
+@pytest.mark.asyncio
+async def test_prompt_overrides_apply_to_one_call_only():
+    agent = make_agent(extra_response_settings=ExtraResponseSettings(temperature=0.2))
+
+    await agent.prompt(message="Some text",
+                       sys_instructions="Return a single keyword",
+                       extra_response_settings=ExtraResponseSettings(temperature=0.9))
+    await agent.prompt(message="Some text")
+
+    create = agent.llm_backend.client.chat.completions.create
+    assert sent_messages(agent, 0)[0] == {"role": "developer", "content": "Return a single keyword"}
+    assert create.call_args_list[0].kwargs["temperature"] == 0.9
+    assert sent_messages(agent, 1)[0] == {"role": "developer", "content": "Summarize the text"}
+    assert create.call_args_list[1].kwargs["temperature"] == 0.2
+    assert agent.llm_backend.sys_instructions == "Summarize the text"
+    assert agent.llm_backend.cumulative_token_usage.total_tokens == 12
+
+
+def test_backends_must_implement_streaming_and_cloning():
+    assert {"stream_model_response", "clone"} <= BaseLLMProvider.__abstractmethods__
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_overrides_clone_the_backend_once(mocker):
+    agent = make_agent()
+    clone = mocker.spy(type(agent.llm_backend), "clone")
+
+    for _ in range(3):
+        await agent.prompt(message="Some text", sys_instructions="Return a single keyword")
+    await agent.prompt(message="Some text", extra_response_settings=ExtraResponseSettings(temperature=0.9))
+    await agent.prompt(message="Some text", extra_response_settings=ExtraResponseSettings(temperature=0.9))
+
+    assert clone.call_count == 2
+    assert sent_messages(agent, 2)[0] == {"role": "developer", "content": "Return a single keyword"}
+    assert agent.llm_backend.client.chat.completions.create.call_args_list[4].kwargs["temperature"] == 0.9
+    assert agent.llm_backend.cumulative_token_usage.total_tokens == 30
@@ -0,0 +1,71 @@
+import asyncio
+import base64
+import hashlib
+import os
+
+import pytest
+
+from agnostic_agent.utils import AttachmentMemoryBudget
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils.files import encode_bytes_base64, encode_file_base64
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 100, 1_000])
+async def test_chunked_encoding_matches_one_shot_encoding(tmp_path, size):
+    content = os.urandom(size)
+    file_path = tmp_path / "blob.bin"
+    file_path.write_bytes(content)
+
+    content_hash, encoded = await encode_file_base64(str(file_path), chunk_size=33)
+
+    assert encoded == base64.b64encode(content).decode("utf-8")
+    assert content_hash == hashlib.sha256(content).hexdigest()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [0, 1, 100])
+async def test_data_uri_prefix_is_encoded_into_the_same_buffer(tmp_path, size):
+    content = os.urandom(size)
+    file_path = tmp_path / "blob.bin"
+    file_path.write_bytes(content)
+    expected = "data:image/png;base64," + base64.b64encode(content).decode("utf-8")
+
+    _, data_uri = await encode_file_base64(str(file_path), chunk_size=33, prefix="data:image/png;base64,")
+
+    assert data_uri == expected
+    assert encode_bytes_base64(content, chunk_size=33, prefix="data:image/png;base64,") == expected
+
+@pytest.mark.asyncio
+async def test_unrecognized_bytes_are_sent_with_the_extension_type(tmp_path):
+    file_path = tmp_path / "photo.jpg"
+    file_path.write_bytes(b"not really a jpeg")
+    provider = OpenAIProvider(agent_name="Reader", model_name="fake", api_key="fake", base_url="http://localhost")
+    provider.image_preprocessor = None
+
+    [structure] = await provider._process_single_file(str(file_path))
+
+    assert structure["image_url"]["url"] == "data:image/jpeg;base64," + base64.b64encode(b"not really a jpeg").decode("utf-8")
+
+@pytest.mark.asyncio
+async def test_chunk_size_must_be_a_multiple_of_three(tmp_path):
+    file_path = tmp_path / "blob.bin"
+    file_path.write_bytes(b"abc")
+    with pytest.raises(ValueError):
+        await encode_file_base64(str(file_path), chunk_size=10)
+
+@pytest.mark.asyncio
+async def test_budget_makes_large_attachments_wait():
+    budget = AttachmentMemoryBudget(max_bytes=100)
+    order = []
+
+    async def encode(name, n_of_bytes, duration):
+        async with budget.reserve(n_of_bytes):
+            order.append(f"{name} started")
+            await asyncio.sleep(duration)
+            order.append(f"{name} done")
+
+    await asyncio.gather(encode("first", 80, 0.02), encode("second", 500, 0)) # Oversized: waits for the whole budget
+
+    assert order == ["first started", "first done", "second started", "second done"]
+    assert budget.in_use == 0
+    assert budget.waits == 1
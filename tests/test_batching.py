@@ -0,0 +1,81 @@
+import asyncio
+import random
+from unittest.mock import AsyncMock
+
+import pytest
+
+from agnostic_agent.utils import PromptBatch, TokenUsage
+from agnostic_agent.utils.core.schemas import LLMResponse
+
+
+class FakeAgent:
+    """Records the peak number of concurrent prompts."""
+    def __init__(self, failures_before_success: int = 0) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures_before_success = failures_before_success
+        self.attempts = {}
+
+    async def prompt(self, message: str, files_path=None) -> LLMResponse:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(random.uniform(0, 0.01))
+            self.attempts[message] = self.attempts.get(message, 0) + 1
+            if message == "boom" or self.attempts[message] <= self.failures_before_success:
+                raise RuntimeError(f"Failed on {message}")
+            return LLMResponse(final_text_response=message.upper(), usage=TokenUsage(total_tokens=2))
+        finally:
+            self.in_flight -= 1
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_summary_aggregated():
+    agent = FakeAgent()
+    batch = PromptBatch(prompt_func=agent.prompt, messages=(f"doc {n}" for n in range(50)), max_concurrency=5)
+    results = [result async for result in batch]
+
+    assert len(results) == 50
+    assert agent.max_in_flight <= 5
+    assert batch.summary.n_succeeded == 50
+    assert batch.summary.token_usage.total_tokens == 100
+    assert batch.summary.max_latency >= batch.summary.p50_latency > 0
+
+@pytest.mark.asyncio
+async def test_ordered_results_follow_input_order():
+    agent = FakeAgent()
+    batch = PromptBatch(prompt_func=agent.prompt, messages=[str(n) for n in range(20)], max_concurrency=4, ordered=True)
+    assert [result.index async for result in batch] == list(range(20))
+
+@pytest.mark.asyncio
+async def test_ordered_results_behind_a_slow_item_are_bounded():
+    started = []
+
+    async def prompt(message: str, files_path=None) -> LLMResponse:
+        started.append(message)
+        await asyncio.sleep(0.05 if message == "0" else 0)
+        return LLMResponse(final_text_response=message)
+
+    batch = PromptBatch(prompt_func=prompt, messages=[str(n) for n in range(20)], max_concurrency=3, ordered=True)
+    results = aiter(batch)
+    first = await anext(results)
+
+    assert first.index == 0
+    assert len(started) == 3 # Nothing else started while the slow head held back 2 buffered results
+    assert [result.index async for result in results] == list(range(1, 20))
+
+@pytest.mark.asyncio
+async def test_failures_are_returned_or_raised():
+    agent = FakeAgent()
+    results = await PromptBatch(prompt_func=agent.prompt, messages=["a", "boom", "b"], return_exceptions=True).collect()
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+
+    with pytest.raises(RuntimeError, match="Failed on boom"):
+        await PromptBatch(prompt_func=agent.prompt, messages=["a", "boom", "b"]).collect()
+
+@pytest.mark.asyncio
+async def test_items_are_retried(mocker):
+    mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    agent = FakeAgent(failures_before_success=2)
+    results = await PromptBatch(prompt_func=agent.prompt, messages=["a", "b"], retries=2).collect()
+    assert all(result.ok and result.attempts == 3 for result in results)
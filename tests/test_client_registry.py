@@ -0,0 +1,37 @@
+import asyncio
+
+from agnostic_agent.llm_backends import AsyncClientRegistry, OpenAIProvider
+
+
+def test_clients_are_shared_per_endpoint_and_key():
+    registry = AsyncClientRegistry()
+
+    async def get_clients():
+        shared = registry.get_client(base_url="http://localhost/v1", api_key="key-a")
+        assert registry.get_client(base_url="http://localhost/v1", api_key="key-a") is shared
+        assert registry.get_client(base_url="http://localhost/v1", api_key="key-b") is not shared
+        assert registry.get_client(base_url="http://other/v1", api_key="key-a") is not shared
+        return shared
+
+    first_loop_client = asyncio.run(get_clients())
+    second_loop_client = asyncio.run(get_clients())
+    assert first_loop_client is not second_loop_client # Connections can't outlive their event loop
+
+def test_aclose_releases_clients_of_running_loop():
+    registry = AsyncClientRegistry()
+
+    async def use_and_close():
+        client = registry.get_client(base_url="http://localhost/v1", api_key="key")
+        await registry.aclose()
+        assert client.is_closed()
+        assert len(registry) == 0
+
+    asyncio.run(use_and_close())
+
+def test_providers_reuse_the_shared_client():
+    async def build_providers():
+        providers = [OpenAIProvider(agent_name=f"SubAgent{n}", model_name="fake", api_key="key",
+                                    base_url="http://localhost/v1") for n in range(3)]
+        assert len({id(provider.client) for provider in providers}) == 1
+
+    asyncio.run(build_providers())
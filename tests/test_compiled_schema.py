@@ -0,0 +1,63 @@
+import gc
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import compile_schema, tool
+from agnostic_agent.utils.core.compiled_schema import _compiled_models
+
+
+class Ingredient(BaseModel):
+    name: str
+    grams: Optional[int] = None
+
+
+class Recipe(BaseModel):
+    title: str
+    ingredients: List[Ingredient]
+
+
+class LookupSchema(BaseModel):
+    query: str
+
+@tool(schema=LookupSchema)
+def compiled_lookup(query: str) -> str:
+    """Looks up a recipe"""
+    return query
+
+
+def test_strict_schema_closes_every_object():
+    strict_schema = compile_schema(Recipe).strict_json_schema
+
+    assert strict_schema["additionalProperties"] is False
+    assert strict_schema["required"] == ["title", "ingredients"]
+    ingredient = strict_schema["$defs"]["Ingredient"]
+    assert ingredient["additionalProperties"] is False
+    assert ingredient["required"] == ["name", "grams"]
+    assert "additionalProperties" not in Recipe.model_json_schema() # The model's own schema is left untouched
+
+def test_agents_share_compiled_schemas():
+    agents = [OpenAIProvider(agent_name=f"Agent {i}", model_name="fake", api_key="fake", base_url="http://localhost",
+                             response_schema=Recipe, tools=["compiled_lookup"])
+              for i in range(2)]
+
+    first, second = (agent.toolkit.schematize()[0] for agent in agents)
+    assert first is second
+    assert first["function"]["parameters"] == LookupSchema.model_json_schema()
+    assert agents[0].settings["response_format"]["json_schema"]["schema"] is compile_schema(Recipe).strict_json_schema
+
+def test_structured_output_is_validated_with_the_compiled_validator():
+    recipe = compile_schema(Recipe).validator.validate_python({"title": "Salad", "ingredients": [{"name": "tomato"}]})
+
+    assert recipe == Recipe(title="Salad", ingredients=[Ingredient(name="tomato")])
+
+def test_compiled_schemas_go_away_with_their_model():
+    Temporary = type("Temporary", (BaseModel,), {"__annotations__": {"value": int}})
+    compile_schema(Temporary)
+    n_of_schemas = len(_compiled_models)
+
+    del Temporary
+    gc.collect()
+
+    assert len(_compiled_models) == n_of_schemas - 1
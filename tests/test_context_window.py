@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from agnostic_agent.utils import ContextWindowManager
+from agnostic_agent.utils.core.tokens import estimate_message_tokens
+
+
+def tool_round(n: int, output_size: int = 400):
+    """An assistant message calling a tool and the tool's result."""
+    return [
+        {"role": "assistant", "content": None,
+         "tool_calls": [{"id": f"call_{n}", "type": "function", "function": {"name": "search", "arguments": "{}"}}]},
+        {"role": "tool", "tool_call_id": f"call_{n}", "name": "search", "content": "x" * output_size},
+    ]
+
+def conversation(n_of_rounds: int, output_size: int = 400):
+    messages = [{"role": "developer", "content": "Rules"}, {"role": "user", "content": "Research this"}]
+    for n in range(n_of_rounds):
+        messages.extend(tool_round(n, output_size))
+    return messages
+
+def total_tokens(messages):
+    return sum(estimate_message_tokens(message) for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_messages_under_budget_are_untouched():
+    messages = conversation(2)
+    manager = ContextWindowManager(max_prompt_tokens=10_000)
+    assert await manager.fit(messages) is messages
+    assert manager.n_of_compactions == 0
+
+@pytest.mark.asyncio
+async def test_large_tool_outputs_are_truncated_first():
+    messages = conversation(2, output_size=8_000)
+    manager = ContextWindowManager(max_prompt_tokens=1_500, max_tool_output_tokens=100)
+
+    fitted = await manager.fit(messages)
+
+    assert total_tokens(fitted) <= 1_500
+    assert len(fitted) == len(messages) # Nothing had to be dropped
+    assert "characters truncated" in fitted[3]["content"]
+    assert len(messages[3]["content"]) == 8_000 # The caller's messages are left as they were
+
+@pytest.mark.asyncio
+async def test_old_rounds_are_dropped_together_keeping_the_latest():
+    messages = conversation(6)
+    manager = ContextWindowManager(max_prompt_tokens=350, strategies=["drop_old_turns"])
+
+    fitted = await manager.fit(messages)
+
+    assert total_tokens(fitted) <= 350
+    assert fitted[:2] == messages[:2] # Instructions and the user request are kept
+    assert fitted[-2:] == messages[-2:] # So is the latest round
+    tool_call_ids = {call["id"] for message in fitted for call in message.get("tool_calls") or []}
+    assert {message["tool_call_id"] for message in fitted if message["role"] == "tool"} == tool_call_ids
+
+@pytest.mark.asyncio
+async def test_summaries_replace_old_rounds_and_are_reused():
+    summarizer = SimpleNamespace(prompt=AsyncMock(return_value=SimpleNamespace(final_text_response="Searched 5 times")))
+    manager = ContextWindowManager(max_prompt_tokens=400,
+                                   strategies=["summarize"],
+                                   max_tool_output_tokens=20,
+                                   summarizer_agent=summarizer)
+    messages = conversation(6)
+
+    fitted = await manager.fit(messages)
+    assert any("Searched 5 times" in str(message["content"]) for message in fitted)
+    assert fitted[-2:] == messages[-2:]
+
+    await manager.fit(messages) # Same history: the summary is reused
+    assert summarizer.prompt.call_count == 1
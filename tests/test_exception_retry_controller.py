@@ -3,10 +3,15 @@ from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
-from openai import APIStatusError
+from openai import APIConnectionError, APIStatusError, APITimeoutError
 
+from agnostic_agent.utils.fault_tolerance.circuit_breaker import (CircuitBreaker,
+                                                                 CircuitOpenError,
+                                                                 CircuitState)
 from agnostic_agent.utils.fault_tolerance.exception_retry_controller import \
     ExceptionRetryController
+from agnostic_agent.utils.fault_tolerance.retry_policies import (
+    DecorrelatedJitterPolicy, ExponentialBackoffPolicy, FixedDelayPolicy, RetryAfterPolicy)
 
 
 # Helper function to create a dummy httpx.Request for APIStatusError
@@ -63,7 +68,7 @@ async def test_value_error_retries_then_success(clean_controller, mocker):
     assert mock_func.call_count == 3  # 2 retries + 1 success = 3 calls
     assert clean_controller.total_interactions == 3
     # Check that occurrences were recorded correctly
-    assert clean_controller.error_record[ValueError].n_of_occurrences == 2
+    assert clean_controller.metrics.retries_by_reason == {"ValueError": 2}
     assert mock_sleep.call_count == 2 # Sleep should be called for each retry
 
 @pytest.mark.asyncio
@@ -83,7 +88,8 @@ async def test_value_error_allowances_exceeded(clean_controller, mocker):
 
     assert mock_func.call_count == 3
     assert clean_controller.total_interactions == 3
-    assert clean_controller.error_record[ValueError].n_of_occurrences == 3
+    assert clean_controller.metrics.n_of_retries == 2
+    assert clean_controller.metrics.n_of_failed_calls == 1
     assert mock_sleep.call_count == 2 # Sleep should be called for the first two retries
 
 @pytest.mark.asyncio
@@ -105,7 +111,7 @@ async def test_api_status_error_5xx_retries_then_success(clean_controller, mocke
     assert result == "API Call Success!"
     assert mock_func.call_count == 4 # 3 retries + 1 success = 4 calls
     assert clean_controller.total_interactions == 4
-    assert clean_controller.error_record[APIStatusError].n_of_occurrences == 3
+    assert clean_controller.metrics.n_of_retries == 3
     assert mock_sleep.call_count == 3 # Sleep should be called for each of the 3 retries
 
 @pytest.mark.asyncio
@@ -126,7 +132,8 @@ async def test_api_status_error_5xx_allowances_exceeded(clean_controller, mocker
 
     assert mock_func.call_count == 4
     assert clean_controller.total_interactions == 4
-    assert clean_controller.error_record[APIStatusError].n_of_occurrences == 4
+    assert clean_controller.metrics.n_of_retries == 3
+    assert clean_controller.metrics.n_of_failed_calls == 1
     assert mock_sleep.call_count == 3
 
 @pytest.mark.asyncio
@@ -144,10 +151,28 @@ async def test_api_status_error_non_5xx_no_retry(clean_controller, mocker):
 
     assert mock_func.call_count == 1
     assert clean_controller.total_interactions == 1
-    # The APIStatusError allowance counter should not increment for non-5xx errors
-    assert clean_controller.error_record[APIStatusError].n_of_occurrences == 0
+    # Non-retryable status codes never consume retries
+    assert clean_controller.metrics.n_of_retries == 0
     assert mock_sleep.call_count == 0
 
+@pytest.mark.asyncio
+async def test_api_status_error_429_is_retried(clean_controller, mocker):
+    """
+    Tests that a 429 (provider throttling) is retried like a 5xx APIStatusError.
+    """
+    mock_sleep = mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    mock_func = AsyncMock(side_effect=[
+        create_mock_api_error(429, "Too Many Requests"),
+        "Throttled Call Success!"
+    ])
+
+    result = await clean_controller.execute_with_retries(mock_func, time_to_wait_between_retries=0.01)
+
+    assert result == "Throttled Call Success!"
+    assert mock_func.call_count == 2
+    assert clean_controller.metrics.retries_by_reason == {"http_429": 1}
+    assert mock_sleep.call_count == 1
+
 @pytest.mark.asyncio
 async def test_unhandled_exception_no_retry(clean_controller, mocker):
     """
@@ -182,8 +207,8 @@ async def test_exception_with_zero_allowance(mocker):
 
     assert mock_func.call_count == 1
     assert controller_zero_allowance.total_interactions == 1
-    # Occurrences should still be incremented even if allowance is 0
-    assert controller_zero_allowance.error_record[ValueError].n_of_occurrences == 1
+    assert controller_zero_allowance.metrics.n_of_retries == 0
+    assert controller_zero_allowance.metrics.n_of_failed_calls == 1
     assert mock_sleep.call_count == 0 # No sleep if no allowances for retry
 
 @pytest.mark.asyncio
@@ -204,5 +229,168 @@ async def test_api_status_error_not_in_allowances_config(mocker):
     assert mock_func.call_count == 1
     assert controller_no_api_allowance.total_interactions == 1
     assert mock_sleep.call_count == 0
-    # Ensure APIStatusError is not present in the error_record if it wasn't initially configured
-    assert APIStatusError not in controller_no_api_allowance.error_record
\ No newline at end of file
+    assert APIStatusError not in controller_no_api_allowance.error_allowances
+
+
+@pytest.mark.asyncio
+async def test_retry_after_header_is_honored(mocker):
+    """
+    Tests that the delay requested through Retry-After is used instead of the policy's backoff.
+    """
+    controller = ExceptionRetryController({APIStatusError: 1},
+                                          retry_policy=RetryAfterPolicy(fallback=FixedDelayPolicy(delay=99)))
+    mock_sleep = mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    throttled = create_mock_api_error(429, "Slow down")
+    throttled.response.headers["retry-after"] = "7"
+    mock_func = AsyncMock(side_effect=[throttled, "Done"])
+
+    assert await controller.execute_with_retries(mock_func) == "Done"
+    mock_sleep.assert_called_once_with(7.0)
+    assert controller.metrics.total_backoff_time == 7.0
+    assert controller.metrics.retries_by_reason == {"http_429": 1}
+
+@pytest.mark.asyncio
+async def test_connection_errors_use_closest_allowance(mocker):
+    """
+    Tests that timeouts are retried under the APIConnectionError allowance.
+    """
+    controller = ExceptionRetryController({APIConnectionError: 1})
+    mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    dummy_request = httpx.Request("GET", "http://example.com/api")
+    mock_func = AsyncMock(side_effect=[APITimeoutError(request=dummy_request), "Done"])
+
+    assert await controller.execute_with_retries(mock_func, time_to_wait_between_retries=0.01) == "Done"
+    assert controller.metrics.retries_by_reason == {"timeout": 1}
+
+@pytest.mark.asyncio
+async def test_deadline_stops_retries(mocker):
+    """
+    Tests that no retry is attempted if its backoff would exceed the deadline.
+    """
+    controller = ExceptionRetryController({ValueError: 5},
+                                          retry_policy=ExponentialBackoffPolicy(base_delay=4, jitter=False),
+                                          deadline=15)
+    mock_sleep = mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    mock_func = AsyncMock(side_effect=[ValueError("1"), ValueError("2"), ValueError("3"), "Never reached"])
+
+    with pytest.raises(ValueError, match="3"):
+        await controller.execute_with_retries(mock_func) # Backoffs of 4s and 8s fit, 16s doesn't
+
+    assert mock_sleep.call_count == 2
+    assert controller.metrics.n_of_deadline_exceeded == 1
+
+def test_exponential_backoff_is_capped():
+    policy = ExponentialBackoffPolicy(base_delay=1, max_delay=5, jitter=False)
+    assert [policy.compute_delay(attempt=n, exception=ValueError()) for n in range(1, 6)] == [1, 2, 4, 5, 5]
+
+def test_decorrelated_jitter_stays_in_bounds():
+    policy = DecorrelatedJitterPolicy(base_delay=1, max_delay=10)
+    previous_delay = 0.0
+    for attempt in range(1, 50):
+        delay = policy.compute_delay(attempt=attempt, exception=ValueError(), previous_delay=previous_delay)
+        assert 1 <= delay <= min(10, max(1, previous_delay * 3))
+        previous_delay = delay
+
+
+@pytest.mark.asyncio
+async def test_allowances_reset_between_calls(clean_controller, mocker):
+    """
+    Tests that retries consumed by one call don't reduce the allowances of the next one.
+    """
+    mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    for _ in range(3):
+        mock_func = AsyncMock(side_effect=[ValueError("A"), ValueError("B"), "Done"])
+        assert await clean_controller.execute_with_retries(mock_func) == "Done"
+
+    assert clean_controller.metrics.n_of_calls == 3
+    assert clean_controller.metrics.n_of_retries == 6
+    assert clean_controller.metrics.n_of_failed_calls == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_transitions():
+    """
+    Tests closed -> open after the threshold, half-open after the recovery timeout,
+    and closed again after a successful probe.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("backend", failure_threshold=2, recovery_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call() # The probe goes through...
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call() # ...but only one at a time
+
+    breaker.record_failure() # Failed probe opens the circuit again
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.n_of_rejected_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(clean_controller, mocker):
+    """
+    Tests that backend failures open the circuit and that later calls are rejected
+    without reaching the backend, while 4xx errors don't count as backend failures.
+    """
+    mocker.patch("asyncio.sleep", new_callable=AsyncMock)
+    breaker = CircuitBreaker("backend", failure_threshold=2, recovery_timeout=60, clock=FakeClock())
+
+    bad_request = AsyncMock(side_effect=create_mock_api_error(400, "Bad Request"))
+    with pytest.raises(APIStatusError):
+        await clean_controller.execute_with_retries(bad_request, circuit_breaker=breaker)
+    assert breaker.state == CircuitState.CLOSED
+
+    outage = AsyncMock(side_effect=create_mock_api_error(503, "Service Unavailable"))
+    with pytest.raises(CircuitOpenError):
+        await clean_controller.execute_with_retries(outage, circuit_breaker=breaker)
+    assert outage.call_count == 2 # Third attempt is rejected by the open circuit
+
+    healthy = AsyncMock(return_value="Done")
+    with pytest.raises(CircuitOpenError):
+        await clean_controller.execute_with_retries(healthy, circuit_breaker=breaker)
+    healthy.assert_not_called()
+    assert clean_controller.metrics.n_of_circuit_rejections == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_gives_its_slot_back(clean_controller):
+    """
+    Tests that a half-open probe cancelled before it got an answer doesn't keep
+    the circuit half-open and rejecting every later call.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("backend", failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+
+    async def hanging_call():
+        await asyncio.sleep(60)
+    probe = asyncio.create_task(clean_controller.execute_with_retries(hanging_call, circuit_breaker=breaker))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    healthy = AsyncMock(return_value="Done")
+    assert await clean_controller.execute_with_retries(healthy, circuit_breaker=breaker) == "Done"
+    assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,83 @@
+import base64
+import os
+import threading
+
+import pytest
+
+from agnostic_agent.utils import EncodedFileCache, InMemoryLRUBackend, SQLiteBackend
+
+
+@pytest.mark.asyncio
+async def test_unchanged_file_is_encoded_once(tmp_path, mocker):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF-1.4 fake document")
+    cache = EncodedFileCache()
+    read_and_encode = mocker.spy(cache, "_read_and_encode")
+
+    first, mime_type = await cache.get_data_uri(str(file_path))
+    second, cached_mime_type = await cache.get_data_uri(str(file_path))
+
+    assert first == second == "data:application/pdf;base64," + base64.b64encode(b"%PDF-1.4 fake document").decode("utf-8")
+    assert mime_type == cached_mime_type == "application/pdf"
+    assert read_and_encode.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_modified_file_is_encoded_again(tmp_path):
+    file_path = tmp_path / "image.png"
+    file_path.write_bytes(b"first version")
+    cache = EncodedFileCache()
+    await cache.get_data_uri(str(file_path))
+
+    file_path.write_bytes(b"second version, longer")
+    os.utime(file_path, ns=(1, 1))
+
+    encoded, _ = await cache.get_data_uri(str(file_path))
+    assert encoded == "data:application/octet-stream;base64," + base64.b64encode(b"second version, longer").decode("utf-8")
+    assert cache.misses == 2
+
+@pytest.mark.asyncio
+async def test_identical_files_share_their_encoding(tmp_path):
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"same bytes")
+    cache = EncodedFileCache()
+
+    await cache.get_data_uri(str(tmp_path / "a.pdf"))
+    await cache.get_data_uri(str(tmp_path / "b.pdf"))
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_disk_backend_survives_a_new_cache(tmp_path, mocker):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"persisted")
+    disk_path = str(tmp_path / "attachments.sqlite3")
+    await EncodedFileCache(disk_backend=SQLiteBackend(path=disk_path)).get_data_uri(str(file_path))
+
+    restarted = EncodedFileCache(memory_backend=InMemoryLRUBackend(), disk_backend=SQLiteBackend(path=disk_path))
+    read_and_encode = mocker.spy(restarted, "_read_and_encode")
+    encoded, _ = await restarted.get_data_uri(str(file_path))
+    assert encoded == "data:application/octet-stream;base64," + base64.b64encode(b"persisted").decode("utf-8")
+    assert read_and_encode.call_count == 0
+
+@pytest.mark.asyncio
+async def test_blocking_file_access_runs_off_the_event_loop(tmp_path, mocker):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF-1.4 fake document")
+    disk_path = str(tmp_path / "attachments.sqlite3")
+    cache = EncodedFileCache(disk_backend=SQLiteBackend(path=disk_path))
+    loop_thread = threading.get_ident()
+    threads = []
+    stat, delete = os.stat, cache.disk_backend.delete
+    mocker.patch("agnostic_agent.utils.caching.file_cache.os.stat",
+                 side_effect=lambda *args, **kwargs: threads.append(threading.get_ident()) or stat(*args, **kwargs))
+    mocker.patch.object(cache.disk_backend, "delete",
+                        side_effect=lambda key: threads.append(threading.get_ident()) or delete(key))
+
+    await cache.get_data_uri(str(file_path))
+    await cache.invalidate(str(file_path))
+    await cache.get_data_uri(str(file_path))
+
+    assert threads and loop_thread not in threads
+    assert cache.misses == 1 and cache.hits == 1 # The invalidated path was looked up again
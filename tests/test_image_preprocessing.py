@@ -0,0 +1,63 @@
+import base64
+import io
+
+import pytest
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import EncodedFileCache, ImagePreprocessor
+from agnostic_agent.utils.files import detect_mime_type
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+JPEG_HEADER = b"\xff\xd8\xff\xe0"
+
+
+@pytest.mark.parametrize("header, mime_type", [
+    (PNG_HEADER, "image/png"),
+    (JPEG_HEADER, "image/jpeg"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-1.7", "application/pdf"),
+    (b"plain text", None),
+])
+def test_mime_type_is_detected_from_magic_bytes(header, mime_type):
+    assert detect_mime_type(header) == mime_type
+
+@pytest.mark.asyncio
+async def test_detected_mime_type_wins_over_the_extension(tmp_path):
+    file_path = tmp_path / "photo.png" # Actually a JPEG
+    file_path.write_bytes(JPEG_HEADER + b"rest of the image")
+    provider = OpenAIProvider(agent_name="Viewer", model_name="fake", api_key="fake", base_url="http://localhost")
+    provider.image_preprocessor = None
+
+    [structure] = await provider._process_single_file(str(file_path))
+
+    assert structure["image_url"]["url"].startswith("data:image/jpeg;base64,")
+
+@pytest.mark.asyncio
+async def test_images_are_sent_unchanged_without_pillow(tmp_path):
+    file_path = tmp_path / "image.png"
+    file_path.write_bytes(PNG_HEADER + b"pixels")
+    preprocessor = ImagePreprocessor()
+    preprocessor.available = False
+
+    encoded, mime_type = await EncodedFileCache().get_data_uri(str(file_path), preprocessor=preprocessor)
+
+    assert encoded == "data:image/png;base64," + base64.b64encode(PNG_HEADER + b"pixels").decode("ascii")
+    assert mime_type == "image/png"
+
+@pytest.mark.asyncio
+async def test_large_images_are_downscaled_and_recompressed(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    file_path = tmp_path / "large.png"
+    Image.new("RGB", (4000, 1000), color=(120, 30, 200)).save(file_path, format="PNG")
+    cache = EncodedFileCache()
+    preprocessor = ImagePreprocessor(max_dimension=1000, output_format="jpeg", quality=80)
+
+    encoded, mime_type = await cache.get_data_uri(str(file_path), preprocessor=preprocessor)
+    original, _ = await cache.get_data_uri(str(file_path)) # Cached separately from the preprocessed variant
+
+    assert mime_type == "image/jpeg"
+    assert encoded.startswith("data:image/jpeg;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(encoded.partition(",")[2]))) as processed:
+        assert processed.size == (1000, 250)
+    assert base64.b64decode(original.partition(",")[2]) == file_path.read_bytes()
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import agnostic_agent
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+def test_package_import_has_no_side_effects():
+    output = run_python("import logging, sys, threading, agnostic_agent;"
+                        "print('openai' in sys.modules, threading.active_count(), logging.getLogger().handlers)")
+
+    assert output == "False 1 []"
+
+def test_attributes_are_imported_on_first_access():
+    assert run_python("import sys, agnostic_agent; agnostic_agent.Session; print('openai' in sys.modules)") == "False"
+    assert agnostic_agent.LLMAgent.__name__ == "LLMAgent"
+
+def test_init_logging_is_idempotent():
+    output = run_python("import logging, agnostic_agent;"
+                        "first = agnostic_agent.init_logging(); second = agnostic_agent.init_logging();"
+                        "print(first is second, len(logging.getLogger().handlers))")
+
+    assert "True 1" in output.splitlines()
@@ -0,0 +1,65 @@
+import logging
+
+from agnostic_agent.utils.logger import LogRepr, redact_attachments
+from agnostic_agent.utils.logger.logger import FileUploadFilter
+
+ENCODED = "QUJD" * 1_000
+
+
+def attachment_messages():
+    return [{"role": "user", "content": [
+        {"type": "text", "text": "Describe these files"},
+        {"type": "file", "file": {"filename": "doc.pdf", "file_data": f"data:application/pdf;base64,{ENCODED}"}},
+        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{ENCODED}"}},
+    ]}]
+
+
+def test_attachments_are_redacted_without_touching_the_original():
+    messages = attachment_messages()
+
+    redacted = redact_attachments(messages)
+
+    content = redacted[0]["content"]
+    assert content[1]["file"]["file_data"] == "data:application/pdf;base64,[...4000 chars of FILE DATA REDACTED...]"
+    assert content[2]["image_url"]["url"].startswith("data:image/png;base64,[...")
+    assert content[0] == {"type": "text", "text": "Describe these files"}
+    assert messages == attachment_messages()
+
+def test_log_repr_is_capped():
+    assert str(LogRepr("x" * 50, max_chars=10)) == "xxxxxxxxxx... [40 more chars]"
+
+def test_filter_redacts_structured_arguments():
+    record = logging.LogRecord("test", logging.DEBUG, __file__, 1, "Message is: %s", (attachment_messages(),), None)
+
+    FileUploadFilter(max_repr_chars=None).filter(record)
+
+    message = record.getMessage()
+    assert ENCODED not in message
+    assert "FILE DATA REDACTED" in message
+
+def test_arguments_are_not_rendered_below_the_level():
+    class Expensive:
+        renders = 0
+
+        def __str__(self):
+            Expensive.renders += 1
+            return "expensive"
+
+    logger = logging.getLogger("test_log_redaction.quiet")
+    logger.setLevel(logging.INFO)
+    logger.debug("Message is: %s", Expensive())
+
+    assert Expensive.renders == 0
+
+def test_filter_redacts_messages_rendered_before_logging():
+    messages = attachment_messages()
+    record = logging.LogRecord("test", logging.DEBUG, __file__, 1, f"Message is: {messages}", None, None)
+    argument_record = logging.LogRecord("test", logging.DEBUG, __file__, 1, "Message is: %s", (str(messages),), None)
+
+    FileUploadFilter(max_repr_chars=None).filter(record)
+    FileUploadFilter(max_repr_chars=None).filter(argument_record)
+
+    for message in (record.getMessage(), argument_record.getMessage()):
+        assert ENCODED not in message
+        assert "FILE DATA REDACTED" in message and "IMAGE DATA REDACTED" in message
+        assert "Describe these files" in message
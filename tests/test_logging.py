@@ -0,0 +1,79 @@
+import json
+import logging
+import queue
+import sys
+
+from agnostic_agent.utils.logger.colorfulFormatter import ColoredJSONFormatter, JSONLinesFormatter
+from agnostic_agent.utils.logger.logger import ContextAwareQueueHandler
+
+
+def build_record(message="Completed tool call: %s", args=("get_weather",)):
+    record = logging.LogRecord("agnostic_agent.test", logging.INFO, __file__, 1, message, args, None)
+    record.agent_name = "Weather agent"
+    return record
+
+def test_colored_line_is_built_from_the_record():
+    line = ColoredJSONFormatter().format(build_record())
+
+    assert "agnostic_agent.test" in line
+    assert "Completed tool call: get_weather" in line
+    assert "agent_name" in line and "Weather agent" in line
+    assert "INFO" in line
+
+def test_json_lines_keep_context_fields():
+    record = build_record()
+    record.attempt = object() # Not JSON serializable
+
+    log_dict = json.loads(JSONLinesFormatter().format(record))
+
+    assert log_dict["level"] == "INFO"
+    assert log_dict["name"] == "agnostic_agent.test"
+    assert log_dict["message"] == "Completed tool call: get_weather"
+    assert log_dict["agent_name"] == "Weather agent"
+    assert log_dict["attempt"].startswith("<object object")
+    assert set(log_dict) == {"time", "level", "name", "message", "agent_name", "attempt"}
+
+def test_tracebacks_are_part_of_the_message():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("agnostic_agent.test", logging.ERROR, __file__, 1, "Failed", None, sys.exc_info())
+
+    log_dict = json.loads(JSONLinesFormatter().format(record))
+
+    assert log_dict["message"].startswith("Failed\nTraceback")
+    assert "ValueError: boom" in log_dict["message"]
+
+def fill(handler, levels):
+    for level in levels:
+        handler.enqueue(logging.LogRecord("agnostic_agent.test", level, __file__, 1, logging.getLevelName(level), None, None))
+
+def queued_levels(log_queue):
+    return [record.levelno for record in log_queue.queue]
+
+def test_drop_debug_first_keeps_important_records():
+    log_queue = queue.Queue(3)
+    handler = ContextAwareQueueHandler(log_queue, overflow_policy="drop_debug_first")
+
+    fill(handler, [logging.INFO, logging.DEBUG, logging.INFO, logging.WARNING, logging.DEBUG, logging.ERROR])
+
+    assert queued_levels(log_queue) == [logging.INFO, logging.WARNING, logging.ERROR]
+    assert handler.dropped_records == {"DEBUG": 2, "INFO": 1}
+
+def test_drop_oldest_keeps_the_latest_records():
+    log_queue = queue.Queue(2)
+    handler = ContextAwareQueueHandler(log_queue, overflow_policy="drop_oldest")
+
+    fill(handler, [logging.ERROR, logging.INFO, logging.DEBUG])
+
+    assert queued_levels(log_queue) == [logging.INFO, logging.DEBUG]
+    assert sum(handler.dropped_records.values()) == 1
+
+def test_sample_keeps_one_in_n_overflowing_records():
+    log_queue = queue.Queue(1)
+    handler = ContextAwareQueueHandler(log_queue, overflow_policy="sample", sample_every=5)
+
+    fill(handler, [logging.INFO] * 11) # 1 queued + 10 overflowing, 2 of them kept
+
+    assert log_queue.qsize() == 1
+    assert handler.dropped_records == {"INFO": 10} # 8 sampled out + 2 replaced
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import AttachmentMode, PDFTextExtractor
+from agnostic_agent.utils.files.pdf import parse_page_selection, split_page_selection
+
+
+def write_pdf(path, pages_text):
+    """Writes a minimal PDF with one line of text per page (empty strings give pages without text)."""
+    n_of_pages = len(pages_text)
+    font_id = 3 + 2 * n_of_pages
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(n_of_pages))
+               + b"] /Count %d >>" % n_of_pages]
+    for i, text in enumerate(pages_text):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode() if text else b""
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font_id))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    content, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref_offset = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    path.write_bytes(content)
+
+
+@pytest.mark.parametrize("file_path, expected", [
+    ("report.pdf#pages=1-3,7", ("report.pdf", "1-3,7")),
+    ("report.pdf", ("report.pdf", None)),
+    ("notes#draft.pdf", ("notes#draft.pdf", None)),
+])
+def test_page_selection_is_split_from_the_path(file_path, expected):
+    assert split_page_selection(file_path) == expected
+
+def test_page_selection_is_parsed_to_indexes():
+    assert parse_page_selection("1-3, 7", n_of_pages=10) == [0, 1, 2, 6]
+    assert parse_page_selection(None, n_of_pages=3) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        parse_page_selection("4-12", n_of_pages=10)
+
+@pytest.mark.asyncio
+async def test_pages_are_extracted_in_order_across_batches(tmp_path):
+    pytest.importorskip("pypdf")
+    file_path = tmp_path / "report.pdf"
+    write_pdf(file_path, [f"Page number {i}" for i in range(1, 6)])
+    extractor = PDFTextExtractor(pages_per_task=2, execution_mode="thread")
+
+    pages = [(page_number, text) async for page_number, text in extractor.iter_pages(str(file_path), pages="2-5")]
+
+    assert [page_number for page_number, _ in pages] == [2, 3, 4, 5]
+    assert all(f"Page number {page_number}" in text for page_number, text in pages)
+
+@pytest.mark.asyncio
+async def test_text_parts_are_yielded_page_by_page(tmp_path):
+    pytest.importorskip("pypdf")
+    file_path = tmp_path / "report.pdf"
+    write_pdf(file_path, ["Quarterly revenue grew", "", "Costs were flat"])
+    extractor = PDFTextExtractor(pages_per_task=1, execution_mode="thread")
+
+    parts = extractor.iter_text_parts(str(file_path), file_name="report.pdf")
+
+    assert await anext(parts) == {"type": "text", "text": "[report.pdf - page 1]\nQuarterly revenue grew"}
+    assert [part["text"] async for part in parts] == ["[report.pdf - page 3]\nCosts were flat"] # Empty pages are skipped
+
+@pytest.mark.asyncio
+async def test_extract_text_mode_sends_pdfs_as_text(tmp_path, mocker):
+    pytest.importorskip("pypdf")
+    file_path = tmp_path / "report.pdf"
+    write_pdf(file_path, ["Quarterly revenue grew", "Costs were flat"])
+    mocker.patch("agnostic_agent.llm_backends.providers.openai_provider.pdf_text_extractor_instance",
+                 PDFTextExtractor(execution_mode="thread"))
+    provider = OpenAIProvider(agent_name="Reader", model_name="fake", api_key="fake", base_url="http://localhost",
+                              attachment_mode=AttachmentMode.EXTRACT_TEXT)
+
+    parts = await provider._process_single_file(f"{file_path}#pages=2")
+
+    assert parts == [{"type": "text", "text": "[report.pdf - page 2]\nCosts were flat"}]
+
+@pytest.mark.asyncio
+async def test_auto_mode_uploads_pdfs_without_a_text_layer(tmp_path, mocker):
+    pytest.importorskip("pypdf")
+    file_path = tmp_path / "scanned.pdf"
+    write_pdf(file_path, ["", ""])
+    mocker.patch("agnostic_agent.llm_backends.providers.openai_provider.pdf_text_extractor_instance",
+                 PDFTextExtractor(execution_mode="thread"))
+    provider = OpenAIProvider(agent_name="Reader", model_name="fake", api_key="fake", base_url="http://localhost",
+                              attachment_mode="auto")
+
+    [structure] = await provider._process_single_file(str(file_path))
+
+    assert structure["type"] == "file"
+
+@pytest.mark.asyncio
+async def test_mime_type_is_sniffed_off_the_event_loop(tmp_path, mocker):
+    file_path = tmp_path / "notes.txt"
+    file_path.write_bytes(b"Plain text")
+    threads = []
+    mocker.patch("agnostic_agent.llm_backends.providers.openai_provider.read_mime_type",
+                 side_effect=lambda file_path: threads.append(threading.get_ident()))
+    provider = OpenAIProvider(agent_name="Reader", model_name="fake", api_key="fake", base_url="http://localhost",
+                              attachment_mode="auto")
+
+    await provider._process_single_file(str(file_path))
+
+    assert threads and threading.get_ident() not in threads
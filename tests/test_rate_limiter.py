@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils.fault_tolerance.rate_limiter import (RateLimiter,
+                                                               RateLimiterRegistry,
+                                                               TokenBucket,
+                                                               rate_limiter_registry)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr("agnostic_agent.utils.fault_tolerance.rate_limiter.time.monotonic", fake_clock)
+    return fake_clock
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(capacity=60, refill_rate=1)
+    bucket.consume(60)
+    assert bucket.time_until_available(10) == pytest.approx(10)
+    clock.now = 10
+    assert bucket.time_until_available(10) == 0
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+    clock.now = 1000
+    bucket.refund(50)
+    assert bucket.level == 10
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_request_budget(clock, mocker):
+    async def advance_clock(seconds):
+        clock.now += seconds
+
+    mock_sleep = mocker.patch("asyncio.sleep", new=AsyncMock(side_effect=advance_clock))
+    limiter = RateLimiter(requests_per_minute=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    assert mock_sleep.call_count == 0
+    await limiter.acquire() # Third request in the same minute must wait ~30s for one slot
+    assert limiter.total_wait_time == pytest.approx(30)
+
+@pytest.mark.asyncio
+async def test_reconcile_charges_actual_usage(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    await limiter.acquire(estimated_tokens=100)
+    limiter.reconcile(estimated_tokens=100, actual_tokens=700) # Provider reported way more than estimated
+    assert limiter._token_bucket.level == pytest.approx(-100) # 600 - 100 reserved - 600 extra
+    assert limiter._token_bucket.time_until_available(100) == pytest.approx(20)
+
+def test_registry_resolves_most_specific_limits():
+    registry = RateLimiterRegistry({
+        "default": {"requests_per_minute": 100, "tokens_per_minute": None},
+        "backends": {
+            "openrouter": {"tokens_per_minute": 50_000, "models": {"big-model": {"requests_per_minute": 5}}},
+            "ollama": {"requests_per_minute": None}, # null doesn't override the default
+        }
+    })
+    big_model = registry.get(backend="openrouter", model="big-model")
+    assert (big_model.requests_per_minute, big_model.tokens_per_minute) == (5, 50_000)
+    assert registry.get(backend="openrouter", model="big-model") is big_model # Shared across agents
+    assert registry.get(backend="ollama", model="qwen3:8b").requests_per_minute == 100
+    assert RateLimiterRegistry({}).get(backend="ollama", model="qwen3:8b") is None
+
+def rate_limited_provider(model_name: str, create) -> OpenAIProvider:
+    provider = OpenAIProvider(agent_name="Limited", model_name=model_name, api_key="fake", base_url="http://localhost")
+    provider.context_window = None
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return provider
+
+@pytest.mark.asyncio
+async def test_failed_requests_give_their_tokens_back(clock):
+    limiter = rate_limiter_registry.configure(backend="openai", model="failing-model", tokens_per_minute=10_000)
+    provider = rate_limited_provider("failing-model", AsyncMock(side_effect=RuntimeError("Overloaded")))
+
+    for _ in range(3): # Like retries of the same request
+        with pytest.raises(RuntimeError):
+            await provider._generate_completition(messages=[{"role": "user", "content": "Hi " * 500}])
+
+    assert limiter._token_bucket.level == pytest.approx(10_000)
+
+@pytest.mark.asyncio
+async def test_streams_closed_early_give_their_tokens_back(clock):
+    async def chunks():
+        for _ in range(3):
+            yield SimpleNamespace(usage=None, choices=[])
+    limiter = rate_limiter_registry.configure(backend="openai", model="streaming-model", tokens_per_minute=10_000)
+    provider = rate_limited_provider("streaming-model", AsyncMock(side_effect=lambda **_: chunks()))
+
+    stream = await provider._generate_completition(messages=[{"role": "user", "content": "Hi " * 500}], stream=True)
+    assert limiter._token_bucket.level < 10_000
+    await stream.__anext__()
+    await stream.aclose() # The consumer stopped before usage was reported
+
+    assert limiter._token_bucket.level == pytest.approx(10_000)
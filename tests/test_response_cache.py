@@ -0,0 +1,76 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import InMemoryLRUBackend, ResponseCache, SQLiteBackend
+from agnostic_agent.utils.core.schemas import LLMResponse
+
+
+class Capital(BaseModel):
+    city: str
+
+def completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+    })
+
+def test_key_is_stable_across_dict_ordering():
+    first = ResponseCache.build_key({"model": "m", "settings": {"temperature": 0.5, "max_tokens": 10}})
+    second = ResponseCache.build_key({"settings": {"max_tokens": 10, "temperature": 0.5}, "model": "m"})
+    assert first == second
+    assert first != ResponseCache.build_key({"model": "other", "settings": {"temperature": 0.5, "max_tokens": 10}})
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryLRUBackend(max_entries=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a") # "b" becomes the least recently used
+    backend.set("c", "3")
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.evictions == 1
+
+def test_in_memory_backend_expires_entries(monkeypatch):
+    backend = InMemoryLRUBackend(ttl=10)
+    monkeypatch.setattr("time.time", lambda: 1000.0)
+    backend.set("a", "1")
+    monkeypatch.setattr("time.time", lambda: 1011.0)
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+def test_sqlite_backend_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "cache" / "responses.sqlite")
+    backend = SQLiteBackend(path=path, max_entries=2)
+    for key in ["a", "b", "c"]:
+        backend.set(key, key.upper())
+    assert len(backend) == 2
+    backend.close()
+
+    reopened = SQLiteBackend(path=path, max_entries=2)
+    assert reopened.get("c") == "C"
+    assert reopened.get("a") is None
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_llm_and_rebuilds_parsed_response(tmp_path):
+    cache = ResponseCache(backend=SQLiteBackend(path=str(tmp_path / "responses.sqlite")))
+    provider = OpenAIProvider(agent_name="Cached", model_name="fake", api_key="fake", base_url="http://localhost",
+                              response_schema=Capital, response_cache=cache)
+    create = AsyncMock(return_value=completion(json.dumps({"city": "Paris"})))
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    first = await provider.get_model_response(message="Capital of France?")
+    second = await provider.get_model_response(message="Capital of France?")
+    await provider.get_model_response(message="Capital of Spain?")
+
+    assert create.call_count == 2
+    assert isinstance(second, LLMResponse) and second.cached
+    assert second.parsed_response == first.parsed_response == Capital(city="Paris")
+    assert second.usage.total_tokens == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
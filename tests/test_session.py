@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import Session
+
+
+def completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+    })
+
+def make_provider(*responses) -> OpenAIProvider:
+    provider = OpenAIProvider(agent_name="Chatty",
+                              model_name="fake",
+                              api_key="fake",
+                              base_url="http://localhost",
+                              sys_instructions="Be brief")
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(side_effect=list(responses))
+    )))
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_session_keeps_history_with_a_stable_prefix():
+    provider = make_provider(completion("Hi!"), completion("You said hello"))
+    session = Session()
+
+    await provider.get_model_response(message="Hello", session=session)
+    await provider.get_model_response(message="What did I say?", session=session)
+
+    first_call, second_call = [call.kwargs["messages"] for call in provider.client.chat.completions.create.call_args_list]
+    assert second_call[:len(first_call)] == first_call # Previous turn is an unchanged prefix
+    assert [message["role"] for message in second_call] == ["developer", "developer", "user", "assistant", "user"]
+    assert [message["role"] for message in session.messages][-2:] == ["user", "assistant"]
+    assert session.messages[-1]["content"] == "You said hello"
+    assert len(session.prefix) == 2
+
+@pytest.mark.asyncio
+async def test_failed_prompt_leaves_session_untouched():
+    provider = make_provider(completion("Hi!"), RuntimeError("Backend down"))
+    session = Session()
+    await provider.get_model_response(message="Hello", session=session)
+    history = session.messages
+
+    with pytest.raises(RuntimeError):
+        await provider.get_model_response(message="Again", session=session)
+    assert session.messages == history
+
+def test_session_is_append_only():
+    session = Session()
+    session.set_prefix([{"role": "developer", "content": "Rules"}])
+    with pytest.raises(RuntimeError):
+        session.set_prefix([{"role": "developer", "content": "Other rules"}])
+    with pytest.raises(RuntimeError):
+        session.extend([{"role": "user", "content": "Late"}], expected_length=0) # Another turn got in first
+    session.extend([{"role": "user", "content": "Hi"}], expected_length=1)
+    assert len(session) == 2
+
+def test_session_round_trips_through_disk(tmp_path):
+    session = Session(prompt_caching_hints=True)
+    session.set_prefix([{"role": "developer", "content": "Rules"}])
+    session.append({"role": "user", "content": "Hi"})
+    path = tmp_path / "session.json"
+    session.save(str(path))
+
+    resumed = Session.load(str(path))
+    assert resumed.session_id == session.session_id
+    assert resumed.messages == session.messages
+    assert resumed.prefix == session.prefix
+    assert resumed.prefix[-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+from pydantic import BaseModel
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import StreamEventType, tool
+from agnostic_agent.utils.core.streaming import ToolCallAssembler
+
+
+def fragment(index, arguments, call_id=None, name=None):
+    """Builds a ChoiceDeltaToolCall-like fragment."""
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+def chunk(content=None, tool_calls=None, usage=None):
+    """Builds a ChatCompletionChunk with a single choice."""
+    choices = [] if usage else [{
+        "index": 0,
+        "delta": {"content": content, "tool_calls": tool_calls},
+        "finish_reason": None
+    }]
+    return ChatCompletionChunk.model_validate({
+        "id": "chunk", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+        "choices": choices, "usage": usage
+    })
+
+async def as_stream(chunks):
+    for c in chunks:
+        yield c
+
+
+class StreamedEchoSchema(BaseModel):
+    text: str
+
+@tool(schema=StreamedEchoSchema, execution="inline")
+def streamed_echo(text: str) -> dict:
+    """Echoes the given text"""
+    return {"echo": text}
+
+
+def test_assembler_completes_call_once_arguments_parse():
+    assembler = ToolCallAssembler()
+    assert assembler.add([fragment(0, '{"text": "he', call_id="call_a", name="streamed_echo")]) == []
+    completed = assembler.add([fragment(0, 'llo"}')])
+    assert [call.name for call in completed] == ["streamed_echo"]
+    assert json.loads(completed[0].arguments) == {"text": "hello"}
+    assert assembler.flush() == []
+
+def test_assembler_completes_previous_call_when_next_index_starts():
+    assembler = ToolCallAssembler()
+    assembler.add([fragment(0, '{"text": "a"', call_id="call_a", name="streamed_echo")]) # Never closed
+    completed = assembler.add([fragment(1, '{', call_id="call_b", name="streamed_echo")])
+    assert [call.id for call in completed] == ["call_a"]
+    assert [call.id for call in assembler.flush()] == ["call_b"]
+    assert [call["id"] for call in assembler.to_message_dicts()] == ["call_a", "call_b"]
+
+@pytest.mark.asyncio
+async def test_stream_executes_tools_and_yields_final_response():
+    provider = OpenAIProvider(agent_name="Streamer",
+                              model_name="fake",
+                              api_key="fake",
+                              base_url="http://localhost",
+                              tools=["streamed_echo"])
+    first_round = [
+        chunk(tool_calls=[{"index": 0, "id": "call_a", "type": "function",
+                           "function": {"name": "streamed_echo", "arguments": '{"text": '}}]),
+        chunk(tool_calls=[{"index": 0, "function": {"arguments": '"hi"}'}}]),
+        chunk(usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}),
+    ]
+    second_round = [chunk(content="Echoed: "), chunk(content="hi")]
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(side_effect=[as_stream(first_round), as_stream(second_round)])
+    )))
+
+    events = [event async for event in provider.stream_model_response(message="Echo hi")]
+    event_types = [event.type for event in events]
+
+    assert event_types.index(StreamEventType.TOOL_CALL) < event_types.index(StreamEventType.TOOL_RESULT)
+    tool_result = next(event for event in events if event.type == StreamEventType.TOOL_RESULT)
+    assert json.loads(tool_result.content) == {"echo": "hi"}
+    assert "".join(event.content for event in events if event.type == StreamEventType.TEXT) == "Echoed: hi"
+    assert events[-1].type == StreamEventType.FINAL
+    assert events[-1].response.final_text_response == "Echoed: hi"
+
+    second_call_messages = provider.client.chat.completions.create.call_args_list[1].kwargs["messages"]
+    assert second_call_messages[-1] == {"role": "tool", "tool_call_id": "call_a", "name": "streamed_echo",
+                                        "content": json.dumps({"echo": "hi"})}
@@ -0,0 +1,106 @@
+import asyncio
+import pickle
+
+import pytest
+from pydantic import BaseModel
+
+from agnostic_agent.utils import TTLCache, tool, tool_registry
+from agnostic_agent.utils.core.function_calling.openai import RegisteredTool
+
+
+class PriceSchema(BaseModel):
+    ingredient: str
+    quantity: int = 1
+
+@tool(schema=PriceSchema, execution="thread", cache=TTLCache(ttl=60))
+def cached_ingredient_price(ingredient: str, quantity: int) -> dict:
+    """Returns the price of an ingredient"""
+    return {"ingredient": ingredient, "price": 2.5 * quantity}
+
+
+class FakeClock():
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_results_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    runs = []
+
+    async def run():
+        runs.append(clock.now)
+        return "result"
+
+    await cache.get_or_run("tool", "key", run)
+    clock.now = 5
+    await cache.get_or_run("tool", "key", run)
+    clock.now = 16
+    await cache.get_or_run("tool", "key", run)
+
+    assert runs == [0, 16]
+    assert cache.stats("tool")["hits"] == 1
+    assert cache.evictions == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_run_once():
+    cache = TTLCache()
+    runs = []
+
+    async def run():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(cache.get_or_run("tool", "key", run) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert len(runs) == 1
+    assert cache.stats("tool") | {"hit_ratio": None} == {"hits": 0, "misses": 1, "coalesced": 4, "hit_ratio": None,
+                                                        "evictions": 0, "entries": 1}
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    cache = TTLCache()
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def succeed():
+        return "result"
+
+    with pytest.raises(ValueError):
+        await cache.get_or_run("tool", "key", fail)
+    assert await cache.get_or_run("tool", "key", succeed) == "result"
+
+@pytest.mark.asyncio
+async def test_followers_of_a_cancelled_call_run_the_tool_themselves():
+    cache = TTLCache()
+    runs = []
+
+    async def run():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    leader = asyncio.create_task(cache.get_or_run("tool", "key", run))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_run("tool", "key", run))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "result"
+    assert leader.cancelled() and not follower.cancelled()
+    assert len(runs) == 2
+    assert cache.stats("tool")["coalesced"] == 0
+
+def test_cached_sync_tools_can_still_run_in_worker_processes():
+    registered_tool = RegisteredTool(tool_registry["cached_ingredient_price"])
+
+    executable = pickle.loads(pickle.dumps(registered_tool.get_executable()))
+
+    assert executable(ingredient="tomato")["price"] == 2.5
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import TTLCache, tool, tool_cache_stats, tool_registry
+
+
+def tool_call_completion(*calls) -> ChatCompletion:
+    """A completion requesting the given (tool_name, arguments) calls."""
+    tool_calls = [{"id": f"call_{i}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+                  for i, (name, arguments) in enumerate(calls)]
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "tool_calls",
+                     "message": {"role": "assistant", "content": None, "tool_calls": tool_calls}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+
+def text_completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+
+
+class SleepSchema(BaseModel):
+    seconds: float
+
+@tool(schema=SleepSchema)
+async def loop_sleep(seconds: float) -> str:
+    """Sleeps for the given number of seconds"""
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}"
+
+@tool(schema=SleepSchema, execution="thread")
+def blocking_sleep(seconds: float) -> str:
+    """Sleeps for the given number of seconds, blocking its thread"""
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+PRICE_CALLS = []
+
+class PriceSchema(BaseModel):
+    ingredient: str
+    quantity: int = 1
+
+@tool(schema=PriceSchema, execution="thread", cache=TTLCache(ttl=60))
+def counted_ingredient_price(ingredient: str, quantity: int) -> dict:
+    """Returns the price of an ingredient"""
+    PRICE_CALLS.append(ingredient)
+    return {"ingredient": ingredient, "price": 2.5 * quantity}
+
+
+def make_provider(responses, tools=("loop_sleep",)) -> OpenAIProvider:
+    provider = OpenAIProvider(agent_name="Looper",
+                              model_name="fake",
+                              api_key="fake",
+                              base_url="http://localhost",
+                              tools=list(tools))
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(side_effect=responses)
+    )))
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_many_rounds_run_without_recursion():
+    n_of_rounds = 1_200 # Deeper than the default recursion limit
+    provider = make_provider([])
+    provider._generate_completition = AsyncMock( # Skips per-request logging of the ever growing history
+        side_effect=[tool_call_completion(("loop_sleep", {"seconds": 0}))] * n_of_rounds + [text_completion("Done")]
+    )
+    provider.interactions_limit = n_of_rounds
+
+    response = await provider.get_model_response(message="Sleep a lot")
+
+    assert response.final_text_response == "Done"
+    assert response.number_of_interactions == n_of_rounds
+
+@pytest.mark.asyncio
+async def test_results_are_appended_as_tools_finish_and_timings_are_split():
+    provider = make_provider([
+        tool_call_completion(("loop_sleep", {"seconds": 0.05}), ("loop_sleep", {"seconds": 0})),
+        text_completion("Done"),
+    ])
+
+    response = await provider.get_model_response(message="Sleep twice")
+
+    second_request = provider.client.chat.completions.create.call_args_list[1].kwargs["messages"]
+    tool_results = [message["content"] for message in second_request if message["role"] == "tool"]
+    assert tool_results == ["slept 0.0", "slept 0.05"] # The fast tool is not held back by the slow one
+    assert response.tool_time >= 0.05
+    assert response.model_time >= 0
+
+@pytest.mark.asyncio
+async def test_round_timeout_cancels_slow_tools():
+    provider = make_provider([
+        tool_call_completion(("loop_sleep", {"seconds": 10}), ("loop_sleep", {"seconds": 0})),
+        text_completion("Done without the slow tool"),
+    ])
+    provider.tool_round_timeout = 0.05
+
+    response = await provider.get_model_response(message="Sleep")
+
+    second_request = provider.client.chat.completions.create.call_args_list[1].kwargs["messages"]
+    tool_results = {message["tool_call_id"]: message["content"] for message in second_request if message["role"] == "tool"}
+    assert tool_results["call_1"] == "slept 0.0"
+    assert "timed out" in tool_results["call_0"]
+    assert response.tool_time < 1
+
+@pytest.mark.asyncio
+async def test_sync_tools_of_concurrent_agents_overlap_without_blocking_the_loop():
+    n_of_agents, tool_seconds = 4, 0.2
+    providers = [make_provider([tool_call_completion(("blocking_sleep", {"seconds": tool_seconds})), text_completion("Done")],
+                               tools=["blocking_sleep"])
+                 for _ in range(n_of_agents)]
+    heartbeat_gaps = []
+
+    async def heartbeat():
+        while True:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            heartbeat_gaps.append(time.perf_counter() - tick)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(provider.get_model_response(message="Sleep") for provider in providers))
+    elapsed = time.perf_counter() - start
+    heartbeat_task.cancel()
+
+    assert all(response.final_text_response == "Done" for response in responses)
+    assert elapsed < n_of_agents * tool_seconds * 0.75 # Serialized tools would take n_of_agents * tool_seconds
+    assert max(heartbeat_gaps) < tool_seconds # The loop kept running while the tools slept
+
+@pytest.mark.asyncio
+async def test_identical_tool_calls_run_once_within_and_across_prompts():
+    PRICE_CALLS.clear()
+    tool_registry["counted_ingredient_price"].cache.clear()
+    same_call = ("counted_ingredient_price", {"ingredient": "cheese"})
+    provider = make_provider([
+        tool_call_completion(same_call, ("counted_ingredient_price", {"ingredient": "cheese", "quantity": 1})),
+        text_completion("Cheese costs 2.5"),
+        tool_call_completion(same_call),
+        text_completion("Still 2.5"),
+    ], tools=["counted_ingredient_price"])
+
+    await provider.get_model_response(message="Price of cheese?")
+    await provider.get_model_response(message="And now?")
+
+    assert PRICE_CALLS == ["cheese"]
+    stats = tool_cache_stats()["counted_ingredient_price"]
+    assert stats["misses"] == 1
+    assert stats["coalesced"] + stats["hits"] == 2
+
+@pytest.mark.asyncio
+async def test_tools_cancelled_from_outside_are_answered_with_an_error():
+    provider = make_provider([])
+    cancelled_elsewhere = asyncio.get_running_loop().create_future()
+    cancelled_elsewhere.cancel() # Like a pending executor future cancelled by shutdown(cancel_futures=True)
+    finished = asyncio.get_running_loop().create_future()
+    finished.set_result("slept 0")
+
+    tool_messages = [message async for message in provider._iter_tool_results({cancelled_elsewhere: ("blocking_sleep", "call_0"),
+                                                                               finished: ("blocking_sleep", "call_1")})]
+
+    contents = {message["tool_call_id"]: message["content"] for message in tool_messages}
+    assert "cancelled" in contents["call_0"]
+    assert contents["call_1"] == "slept 0"
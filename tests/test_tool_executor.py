@@ -0,0 +1,85 @@
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from pydantic import BaseModel
+
+from agnostic_agent.utils import ExecutionMode, tool, tool_registry
+from agnostic_agent.utils.core.function_calling.openai import RegisteredTool
+from agnostic_agent.utils.execution.tool_executor import ToolExecutor
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+def current_pid() -> int:
+    return os.getpid()
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+def fail() -> None:
+    raise RuntimeError("Tool blew up")
+
+
+@pytest.fixture
+def executor():
+    """Provides a small, isolated ToolExecutor that is shut down after each test."""
+    tool_executor = ToolExecutor(default_mode=ExecutionMode.THREAD, process_pool_size=2, thread_pool_size=2)
+    yield tool_executor
+    tool_executor.shutdown()
+
+def test_inline_runs_in_caller_thread(executor):
+    future = executor.submit(current_thread_name, execution_mode=ExecutionMode.INLINE)
+    assert future.done()
+    assert future.result() == threading.current_thread().name
+
+def test_inline_captures_exceptions(executor):
+    future = executor.submit(fail, execution_mode="inline")
+    with pytest.raises(RuntimeError, match="Tool blew up"):
+        future.result()
+
+def test_thread_pool_is_reused(executor):
+    assert executor.submit(add, kwargs={"a": 1, "b": 2}).result() == 3
+    first_pool = executor.get_pool(ExecutionMode.THREAD)
+    assert executor.submit(current_thread_name).result().startswith("agnostic_agent_tool")
+    assert executor.get_pool(ExecutionMode.THREAD) is first_pool
+
+def test_process_pool_workers_stay_warm(executor):
+    executor.warm_up(ExecutionMode.PROCESS)
+    pids = {executor.submit(current_pid, execution_mode="process").result() for _ in range(10)}
+    assert os.getpid() not in pids
+    assert len(pids) <= 2 # Never more than process_pool_size distinct workers
+
+def test_shutdown_allows_transparent_restart(executor):
+    pool = executor.get_pool(ExecutionMode.THREAD)
+    executor.shutdown()
+    assert executor.submit(add, kwargs={"a": 2, "b": 2}).result() == 4
+    assert executor.get_pool(ExecutionMode.THREAD) is not pool
+
+def test_tool_decorator_records_execution_mode():
+    class AddSchema(BaseModel):
+        a: int
+        b: int
+
+    @tool(schema=AddSchema, execution="thread")
+    def add_numbers_in_thread(a: int, b: int) -> int:
+        return a + b
+
+    registered_tool = RegisteredTool(tool_registry["add_numbers_in_thread"])
+    assert registered_tool.execution_mode == ExecutionMode.THREAD
+
+def test_max_workers_are_resolved_per_pool(executor):
+    executor.get_pool(ExecutionMode.THREAD)
+    assert executor.max_workers == {ExecutionMode.THREAD: 2}
+    executor.shutdown()
+    assert executor.max_workers == {}
+
+def test_broken_process_pool_is_shut_down_and_rebuilt(executor, mocker):
+    broken_pool = mocker.Mock(submit=mocker.Mock(side_effect=BrokenProcessPool()))
+    executor._process_pool = broken_pool
+
+    assert executor.submit(add, kwargs={"a": 1, "b": 1}, execution_mode="process").result() == 2
+    broken_pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert executor.get_pool(ExecutionMode.PROCESS) is not broken_pool
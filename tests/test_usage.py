@@ -0,0 +1,61 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from agnostic_agent.llm_backends import OpenAIProvider
+from agnostic_agent.utils import TokenUsage, UsageLedger
+from agnostic_agent.utils.core.usage import UsageAggregator
+
+
+def completion(content: str, total_tokens: int) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "completion", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": total_tokens - 1, "completion_tokens": 1, "total_tokens": total_tokens}
+    })
+
+def test_ledger_records_completions_and_interactions():
+    ledger = UsageLedger(agent_name="Agent", model_name="fake")
+    ledger.record_completion(TokenUsage(prompt_tokens=3, completion_tokens=2, total_tokens=5))
+    ledger.record_completion(None) # Providers may omit usage
+    assert ledger.record_interaction() == 1
+    assert ledger.token_usage.total_tokens == 5
+    assert ledger.number_of_completions == 2
+
+def test_aggregator_is_thread_safe():
+    aggregator = UsageAggregator()
+
+    def merge_many():
+        for _ in range(1000):
+            ledger = UsageLedger(agent_name="Agent", model_name="fake")
+            ledger.record_completion(TokenUsage(total_tokens=1))
+            aggregator.merge(ledger)
+
+    threads = [threading.Thread(target=merge_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert aggregator.total().total_tokens == 8000
+    assert aggregator.summary()["number_of_prompts"] == 8000
+    assert aggregator.per_agent()["Agent"].total_tokens == 8000
+
+@pytest.mark.asyncio
+async def test_concurrent_prompts_do_not_share_usage():
+    provider = OpenAIProvider(agent_name="Concurrent", model_name="fake", api_key="fake", base_url="http://localhost")
+
+    async def create(messages, **kwargs):
+        text = messages[-2]["content"][0]["text"] # User message, before developer instructions
+        await asyncio.sleep(0.01)
+        return completion(content=text, total_tokens=int(text))
+
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    responses = await asyncio.gather(*(provider.get_model_response(message=str(n)) for n in range(10, 20)))
+
+    assert [response.usage.total_tokens for response in responses] == list(range(10, 20))
+    assert provider.cumulative_token_usage.total_tokens == sum(range(10, 20))
+    assert OpenAIProvider.cumulative_token_usage is None # Nothing leaks into the class
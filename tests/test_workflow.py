@@ -0,0 +1,273 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from agnostic_agent import Workflow, WorkflowEventType
+from agnostic_agent.utils import StreamEvent, StreamEventType, TokenUsage, TTLCache
+from agnostic_agent.utils.core.schemas import LLMResponse
+
+
+class Language(BaseModel):
+    language: str
+
+
+class FakeAgent:
+    """Answers every prompt with the given text, after a delay, streaming it by word."""
+
+    def __init__(self, answer: str, delay: float = 0.0, parsed_response=None) -> None:
+        self.answer = answer
+        self.delay = delay
+        self.parsed_response = parsed_response
+        self.messages = []
+
+    def _response(self) -> LLMResponse:
+        return LLMResponse(
+            final_text_response=self.answer,
+            parsed_response=self.parsed_response,
+            usage=TokenUsage(prompt_tokens=5, completion_tokens=1, total_tokens=6),
+        )
+
+    async def prompt(self, message: str) -> LLMResponse:
+        self.messages.append(message)
+        await asyncio.sleep(self.delay)
+        return self._response()
+
+    async def stream(self, message: str):
+        self.messages.append(message)
+        for word in self.answer.split(" "):
+            await asyncio.sleep(self.delay)
+            yield StreamEvent(type=StreamEventType.TEXT, content=word + " ")
+        yield StreamEvent(type=StreamEventType.FINAL, response=self._response())
+
+
+def sleeper(seconds: float, value: str):
+    async def step(**_):
+        await asyncio.sleep(seconds)
+        return value
+
+    return step
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    workflow = Workflow(inputs=["text"])
+    workflow.add_step("short", func=sleeper(0.05, "short"), depends_on=["text"])
+    workflow.add_step("long", func=sleeper(0.15, "long"), depends_on=["text"])
+    workflow.add_step(
+        "joined",
+        func=lambda short, long: f"{short}+{long}",
+        depends_on=["short", "long"],
+    )
+
+    starting_time = time.perf_counter()
+    result = await workflow.run(text="Some text")
+    elapsed = time.perf_counter() - starting_time
+
+    assert result["joined"] == "short+long"
+    assert elapsed < 0.19  # Not 0.05 + 0.15 in sequence
+    assert result.critical_path == ["long", "joined"]
+    assert [step["step"] for step in result.critical_path_breakdown()] == [
+        "long",
+        "joined",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_limits_running_steps():
+    workflow = Workflow(max_concurrency=1)
+    workflow.add_step("first", func=sleeper(0.05, "first"))
+    workflow.add_step("second", func=sleeper(0.05, "second"))
+
+    result = await workflow.run()
+
+    first, second = sorted(result.steps.values(), key=lambda step: step.started_at)
+    assert second.started_at >= first.finished_at
+    assert second.queued_time > 0.04
+
+
+@pytest.mark.asyncio
+async def test_agent_steps_receive_formatted_messages():
+    summarizer = FakeAgent("A summary")
+    detector = FakeAgent(
+        '{"language": "Spanish"}', parsed_response=Language(language="Spanish")
+    )
+    workflow = Workflow(inputs=["text"])
+    workflow.add_step(
+        "summary", agent=summarizer, message="Summarize: {text}", depends_on=["text"]
+    )
+    workflow.add_step(
+        "language",
+        agent=detector,
+        message=lambda summary: f"Language of: {summary}",
+        depends_on=["summary"],
+    )
+
+    result = await workflow.run(text="Hola")
+
+    assert summarizer.messages == ["Summarize: Hola"]
+    assert detector.messages == ["Language of: A summary"]
+    assert result["language"] == Language(language="Spanish")
+    assert result.steps["summary"].response.final_text_response == "A summary"
+    assert result.token_usage.total_tokens == 12
+
+
+@pytest.mark.asyncio
+async def test_step_results_are_cached_by_input_hash():
+    calls = []
+
+    def count_words(text: str) -> int:
+        calls.append(text)
+        return len(text.split())
+
+    agent = FakeAgent("A summary")
+    workflow = Workflow(inputs=["text"], cache=TTLCache(ttl=60))
+    workflow.add_step("n_of_words", func=count_words, depends_on=["text"])
+    workflow.add_step(
+        "summary", agent=agent, message="Summarize: {text}", depends_on=["text"]
+    )
+
+    first = await workflow.run(text="one two three")
+    second = await workflow.run(text="one two three")
+    third = await workflow.run(text="one two")
+
+    assert calls == ["one two three", "one two"]
+    assert len(agent.messages) == 2
+    assert second["n_of_words"] == 3 and third["n_of_words"] == 2
+    assert not first.steps["summary"].cached and second.steps["summary"].cached
+    assert second.token_usage.total_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_not_shared_by_different_steps():
+    cache = TTLCache(ttl=60)
+    summarizer, translator = FakeAgent("A summary"), FakeAgent("A translation")
+    summarizer.agent_name, translator.agent_name = "Summarizer", "Translator"
+
+    first = Workflow(name="first", inputs=["text"], cache=cache)
+    first.add_step(
+        "summary", agent=summarizer, message="Summarize: {text}", depends_on=["text"]
+    )
+    second = Workflow(name="second", inputs=["text"], cache=cache)
+    second.add_step(
+        "summary", agent=translator, message="Translate: {text}", depends_on=["text"]
+    )
+    edited = Workflow(name="first", inputs=["text"], cache=cache)
+    edited.add_step(
+        "summary",
+        agent=summarizer,
+        message="Summarize briefly: {text}",
+        depends_on=["text"],
+    )
+
+    assert (await first.run(text="Hola"))["summary"] == "A summary"
+    assert (await second.run(text="Hola"))["summary"] == "A translation"
+    assert not (await edited.run(text="Hola")).steps["summary"].cached
+    assert (await first.run(text="Hola")).steps["summary"].cached
+    assert summarizer.messages == ["Summarize: Hola", "Summarize briefly: Hola"]
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_keyed_by_what_functions_compute():
+    cache = TTLCache(ttl=60)
+
+    async def run(func):
+        workflow = Workflow(name="keyed", inputs=["text"], cache=cache)
+        workflow.add_step("result", func=func, depends_on=["text"])
+        return (await workflow.run(text="Hola"))["result"]
+
+    assert await run(sleeper(0, "first")) == "first"
+    assert (
+        await run(sleeper(0, "second")) == "second"
+    )  # Same factory, different closure
+    assert await run(lambda text: text.upper()) == "HOLA"
+    assert await run(lambda text: text.lower()) == "hola"
+
+
+@pytest.mark.asyncio
+async def test_cached_agent_results_are_keyed_by_settings_and_tools():
+    cache = TTLCache(ttl=60)
+    agent = FakeAgent("A summary")
+    agent.llm_backend = SimpleNamespace(
+        settings={"temperature": 0.2}, tools_to_use={"search": None}
+    )
+
+    async def run():
+        workflow = Workflow(name="keyed", inputs=["text"], cache=cache)
+        workflow.add_step(
+            "summary", agent=agent, message="Summarize: {text}", depends_on=["text"]
+        )
+        return (await workflow.run(text="Hola")).steps["summary"].cached
+
+    assert not await run()
+    assert await run()
+    agent.llm_backend.settings = {"temperature": 0.9}
+    assert not await run()
+    agent.llm_backend.tools_to_use = {}
+    assert not await run()
+
+
+@pytest.mark.asyncio
+async def test_downstream_steps_consume_text_as_it_streams():
+    producer = FakeAgent("one two three four", delay=0.03)
+    received = []
+
+    async def consume(summary):
+        async for chunk in summary:
+            received.append((chunk, time.perf_counter()))
+        return "".join(chunk for chunk, _ in received)
+
+    workflow = Workflow(inputs=["text"])
+    workflow.add_step(
+        "summary", agent=producer, message="Summarize: {text}", depends_on=["text"]
+    )
+    workflow.add_step(
+        "consumer", func=consume, depends_on=["summary"], stream_from=["summary"]
+    )
+
+    events = [event async for event in workflow.stream(text="Some text")]
+    finished_at = time.perf_counter()
+
+    result = events[-1].result
+    assert result["consumer"] == "one two three four "
+    assert (
+        received[0][1] < finished_at - 0.05
+    )  # The first chunk arrived long before the producer finished
+    assert [
+        event.content for event in events if event.type == WorkflowEventType.TEXT
+    ] == ["one ", "two ", "three ", "four "]
+    assert result.steps["consumer"].started_at < result.steps["summary"].finished_at
+
+
+@pytest.mark.asyncio
+async def test_failed_step_skips_its_dependents():
+    def fail():
+        raise RuntimeError("boom")
+
+    workflow = Workflow()
+    workflow.add_step("broken", func=fail)
+    workflow.add_step("dependent", func=lambda broken: broken, depends_on=["broken"])
+    workflow.add_step("independent", func=sleeper(0.01, "fine"))
+
+    result = await workflow.run(return_exceptions=True)
+
+    assert result.steps["broken"].status == "failed"
+    assert result.steps["dependent"].status == "skipped"
+    assert result.outputs == {"independent": "fine"}
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await workflow.run()
+
+
+def test_invalid_workflows_are_rejected():
+    workflow = Workflow(inputs=["text"])
+    with pytest.raises(ValueError):
+        workflow.add_step("summary", func=len, depends_on=["missing"])
+    with pytest.raises(ValueError):
+        workflow.add_step("text", func=len)
+    with pytest.raises(ValueError):
+        workflow.add_step("summary", agent=FakeAgent("A summary"))
+    with pytest.raises(ValueError):
+        workflow.stream()